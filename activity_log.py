@@ -0,0 +1,228 @@
+"""
+Log persistente e estruturado de atividade
+
+Cada evento (atividade executada, usuário ativo, transições de agendamento,
+amostras de conectividade, mensagens do log) vira uma linha JSON. A thread
+da GUI apenas coloca o registro em uma fila; um QueueListener grava em
+disco em segundo plano, com rotação por tamanho ou por horário e compressão
+gzip opcional dos segmentos rotacionados.
+
+Salvar o log passa a ser exportar um intervalo de tempo deste arquivo.
+"""
+
+import glob
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import threading
+from datetime import datetime
+
+ACTIVITY_LOG_FILENAME = "activity.jsonl"
+ACTIVITY_LOG_MAX_BYTES = 5 * 1024 * 1024
+ACTIVITY_LOG_BACKUPS = 20
+ACTIVITY_LOG_FLUSH_TIMEOUT_S = 2.0
+
+# Tipos de evento
+EVENT_MESSAGE = "message"
+EVENT_ACTIVITY = "activity_executed"
+EVENT_USER_ACTIVE = "user_active_skip"
+EVENT_SCHEDULE = "schedule_transition"
+EVENT_CONNECTIVITY = "connectivity_sample"
+
+
+def default_log_dir():
+    """Pasta padrão dos logs (LOCALAPPDATA no Windows, home nos demais)"""
+    base = os.getenv("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "KeepAliveRDP", "logs")
+
+
+class JsonLineFormatter(logging.Formatter):
+    """Formata o registro como uma linha JSON"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "event": getattr(record, "event", EVENT_MESSAGE),
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _BarrierHandler(logging.Handler):
+    """Sinaliza o Event do registro-barreira: tudo antes dele já foi gravado"""
+
+    def emit(self, record):
+        barrier = getattr(record, "barrier", None)
+        if barrier is not None:
+            barrier.set()
+
+
+def _not_barrier(record):
+    return not hasattr(record, "barrier")
+
+
+def _gzip_namer(name):
+    return name + ".gz"
+
+
+def _gzip_rotator(source, dest):
+    """Comprime o segmento rotacionado e remove o original"""
+    with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+class ActivityLog:
+    """Log estruturado com escrita assíncrona e rotação"""
+
+    def __init__(self):
+        self.log_dir = None
+        self.path = None
+        self.logger = logging.getLogger("keepalive.activity")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self._queue = queue.SimpleQueue()
+        self._listener = None
+
+    @property
+    def running(self):
+        return self._listener is not None
+
+    def start(
+        self,
+        log_dir=None,
+        max_bytes=ACTIVITY_LOG_MAX_BYTES,
+        backup_count=ACTIVITY_LOG_BACKUPS,
+        when=None,
+        compress=True,
+    ):
+        """Inicia o gravador em segundo plano
+
+        when: None rotaciona por tamanho; "midnight", "H" etc. por horário
+        """
+        if self._listener is not None:
+            return True
+        try:
+            self.log_dir = log_dir or default_log_dir()
+            os.makedirs(self.log_dir, exist_ok=True)
+            self.path = os.path.join(self.log_dir, ACTIVITY_LOG_FILENAME)
+
+            if when:
+                file_handler = logging.handlers.TimedRotatingFileHandler(
+                    self.path, when=when, backupCount=backup_count, encoding="utf-8"
+                )
+            else:
+                file_handler = logging.handlers.RotatingFileHandler(
+                    self.path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+                )
+            if compress:
+                file_handler.namer = _gzip_namer
+                file_handler.rotator = _gzip_rotator
+            file_handler.setFormatter(JsonLineFormatter())
+            file_handler.addFilter(_not_barrier)
+
+            self.logger.handlers.clear()
+            self.logger.addHandler(logging.handlers.QueueHandler(self._queue))
+            self._listener = logging.handlers.QueueListener(
+                self._queue, file_handler, _BarrierHandler(), respect_handler_level=False
+            )
+            self._listener.start()
+            return True
+        except Exception as e:
+            logging.warning(f"Log de atividade indisponível: {str(e)}")
+            self._listener = None
+            return False
+
+    def record(self, event, message="", **fields):
+        """Enfileira um evento (nunca bloqueia em disco)"""
+        if self._listener is None:
+            return
+        self.logger.info(message, extra={"event": event, "fields": fields})
+
+    def stop(self):
+        """Esvazia a fila e fecha os arquivos"""
+        if self._listener is None:
+            return
+        listener, self._listener = self._listener, None
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+        self.logger.handlers.clear()
+
+    def flush(self, timeout=ACTIVITY_LOG_FLUSH_TIMEOUT_S):
+        """Espera o gravador alcançar o que já está na fila (sem reiniciar); False se expirou"""
+        if self._listener is None:
+            return True
+        barrier = threading.Event()
+        self._queue.put(logging.makeLogRecord({"barrier": barrier}))
+        return barrier.wait(timeout)
+
+    def segment_files(self):
+        """Arquivos do log (rotacionados + atual), do mais antigo ao mais novo"""
+        if not self.path:
+            return []
+        files = [f for f in glob.glob(self.path + "*") if os.path.isfile(f)]
+
+        def age_key(filename):
+            # activity.jsonl.3.gz é mais antigo que .1.gz; datas ordenam como texto
+            if filename == self.path:
+                return (1, 0, "")
+            suffix = filename[len(self.path) + 1 :].removesuffix(".gz")
+            if suffix.isdigit():
+                return (0, -int(suffix), "")
+            return (0, 0, suffix)
+
+        return sorted(files, key=age_key)
+
+    def iter_entries(self, start=None, end=None):
+        """Itera eventos (dict) com start <= ts <= end"""
+        start_iso = start.isoformat() if start else None
+        end_iso = end.isoformat() if end else None
+        for filename in self.segment_files():
+            opener = gzip.open if filename.endswith(".gz") else open
+            try:
+                with opener(filename, "rt", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue
+                        ts = entry.get("ts", "")
+                        if start_iso and ts < start_iso:
+                            continue
+                        if end_iso and ts > end_iso:
+                            continue
+                        yield entry
+            except OSError:
+                continue
+
+    def export_range(self, filename, start=None, end=None):
+        """Exporta mensagens do intervalo em texto, no formato do log da GUI
+
+        Eventos sem mensagem (ex.: amostras de conectividade) ficam só no JSON.
+        """
+        count = 0
+        with open(filename, "w", encoding="utf-8") as f:
+            for entry in self.iter_entries(start, end):
+                message = entry.get("message")
+                if not message:
+                    continue
+                ts = entry.get("ts", "").replace("T", " ")[:19]
+                f.write(f"[{ts}] {message}\n")
+                count += 1
+        return count
+
+
+_activity_log = ActivityLog()
+
+
+def get_activity_log():
+    """Instância compartilhada do log de atividade"""
+    return _activity_log
@@ -0,0 +1,155 @@
+"""
+Agendador monotônico das atividades, sem deriva acumulada
+
+Os prazos são calculados a partir de uma grade fixa em time.monotonic()
+(âncora + k * intervalo), com variação aleatória aplicada em torno de cada
+ponto da grade. O tempo gasto executando a atividade não empurra os
+próximos prazos, ao contrário do reagendamento a partir de datetime.now().
+Cada disparo registra o atraso real em relação ao planejado.
+
+Não depende do loop de eventos do Qt: o relógio é injetável.
+
+    python activity_scheduler.py   # simulação com relógio falso
+"""
+
+import random
+import time
+
+# ±15% em torno da grade = intervalos entre disparos de 70% a 130% do base,
+# a mesma faixa do antigo sorteio de ±30% a partir do fim da execução
+DEFAULT_JITTER = 0.15
+
+
+class LatenessStats:
+    """Estatísticas de atraso (disparo real - planejado), em ms"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+
+    def record(self, lateness_ms):
+        self.count += 1
+        self.total_ms += lateness_ms
+        self.last_ms = lateness_ms
+        if lateness_ms > self.max_ms:
+            self.max_ms = lateness_ms
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.count if self.count else 0.0
+
+    def summary(self):
+        if not self.count:
+            return "sem disparos"
+        return (
+            f"n={self.count} atraso médio={self.mean_ms:.0f}ms "
+            f"máx={self.max_ms:.0f}ms último={self.last_ms:.0f}ms"
+        )
+
+
+class ActivityScheduler:
+    """Calcula prazos de atividade em grade fixa com variação
+
+    jitter: fração do intervalo aplicada para cada lado do ponto da grade
+    (0.15 => ±15%, intervalos entre disparos de 70% a 130% do base).
+    """
+
+    def __init__(self, interval_s, jitter=0.0, clock=time.monotonic, rng=None):
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.interval_s = float(interval_s)
+        self.jitter = jitter
+        self.lateness = LatenessStats()
+        self.skipped_slots = 0
+        self._anchor = None
+        self._slot = 0
+        self._planned = None
+
+    @property
+    def running(self):
+        return self._anchor is not None
+
+    def start(self, interval_s=None, jitter=None):
+        """Ancora a grade no instante atual e planeja o primeiro prazo"""
+        if interval_s is not None:
+            self.interval_s = float(interval_s)
+        if jitter is not None:
+            self.jitter = jitter
+        self._anchor = self.clock()
+        self._slot = 1
+        self._planned = self._plan(self._slot)
+        return self._planned
+
+    def stop(self):
+        self._anchor = None
+        self._planned = None
+
+    def _plan(self, slot):
+        nominal = self._anchor + slot * self.interval_s
+        if self.jitter:
+            offset = self.rng.uniform(-self.jitter, self.jitter) * self.interval_s
+        else:
+            offset = 0.0
+        return nominal + offset
+
+    @property
+    def planned(self):
+        """Prazo planejado (relógio monotônico) do próximo disparo"""
+        return self._planned
+
+    def seconds_until_next(self):
+        """Tempo restante até o próximo prazo (>= 0)"""
+        if self._planned is None:
+            return 0.0
+        return max(0.0, self._planned - self.clock())
+
+    def fired(self):
+        """Registra o disparo atual e retorna o atraso em ms"""
+        if self._planned is None:
+            return 0.0
+        lateness_ms = max(0.0, (self.clock() - self._planned) * 1000)
+        self.lateness.record(lateness_ms)
+        return lateness_ms
+
+    def advance(self):
+        """Planeja o próximo prazo; pula pontos da grade já vencidos
+        (ex.: após suspensão) em vez de disparar em rajada"""
+        if self._anchor is None:
+            return None
+        now = self.clock()
+        self._slot += 1
+        while self._anchor + self._slot * self.interval_s <= now:
+            self._slot += 1
+            self.skipped_slots += 1
+        self._planned = max(self._plan(self._slot), now)
+        return self._planned
+
+
+class FakeClock:
+    """Relógio manual para testes e simulações"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+if __name__ == "__main__":
+    # Simula 1000 ciclos de 60s com atividade de 1.3s e timer com 5ms de atraso
+    fake_clock = FakeClock()
+    scheduler = ActivityScheduler(60, jitter=0.15, clock=fake_clock, rng=random.Random(1))
+    scheduler.start()
+    for _ in range(1000):
+        fake_clock.advance(scheduler.seconds_until_next() + 0.005)
+        scheduler.fired()
+        fake_clock.advance(1.3)  # duração de simulate_safe_activity
+        scheduler.advance()
+    drift = fake_clock.now - 1000 * 60
+    print(f"Deriva após 1000 ciclos: {drift:.1f}s (reagendando após a execução: {1000 * 1.305:.0f}s)")
+    print(f"Atraso: {scheduler.lateness.summary()}")
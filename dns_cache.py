@@ -0,0 +1,194 @@
+"""
+Cache de resolução DNS para as sondas de conectividade
+
+Resolve nomes com getaddrinfo em um pool de threads próprio (o loop asyncio
+nunca bloqueia e asyncio.run não espera lookups lentos ao encerrar), guarda
+respostas positivas e negativas com TTLs distintos e aceita IPs fixados
+pela configuração ("itaipu.gov.br=200.0.0.1"). Consultas simultâneas ao
+mesmo nome compartilham um único lookup.
+
+    python -m pytest tests/test_dns_cache.py
+    python dns_cache.py host [host ...]
+"""
+
+import asyncio
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DNS_POSITIVE_TTL = 300  # segundos
+DNS_NEGATIVE_TTL = 30
+DNS_MAX_WORKERS = 4
+
+
+def is_ipv4(host):
+    try:
+        socket.inet_aton(host)
+        return host.count(".") == 3
+    except OSError:
+        return False
+
+
+def parse_pinned_hosts(text):
+    """Converte "host=ip, host2=ip2" em {host: ip} (ignora IPs inválidos)"""
+    pinned = {}
+    for part in str(text).replace(";", ",").split(","):
+        host, _, ip = part.strip().partition("=")
+        host, ip = host.strip().lower(), ip.strip()
+        if host and is_ipv4(ip):
+            pinned[host] = ip
+    return pinned
+
+
+def system_lookup(host):
+    """getaddrinfo IPv4 (bloqueante); primeiro endereço"""
+    infos = socket.getaddrinfo(host, None, family=socket.AF_INET, type=socket.SOCK_STREAM)
+    return infos[0][4][0]
+
+
+class DnsCache:
+    """Cache de nomes com TTL positivo/negativo e IPs fixados"""
+
+    def __init__(
+        self,
+        positive_ttl=DNS_POSITIVE_TTL,
+        negative_ttl=DNS_NEGATIVE_TTL,
+        pinned=None,
+        lookup=system_lookup,
+        clock=time.monotonic,
+    ):
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.pinned = dict(pinned or {})
+        self.lookup = lookup
+        self.clock = clock
+        self._cache = {}  # host -> (ip ou None, expiração)
+        self._pending = {}  # host -> concurrent.futures.Future
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=DNS_MAX_WORKERS, thread_name_prefix="dns")
+        self.hits = 0
+        self.negative_hits = 0
+        self.pinned_hits = 0
+        self.misses = 0
+        self.failures = 0
+        self.lookup_ms_total = 0.0
+
+    def configure(self, pinned=None, positive_ttl=None, negative_ttl=None):
+        """Atualiza IPs fixados/TTLs e descarta o cache"""
+        with self._lock:
+            if pinned is not None:
+                self.pinned = dict(pinned)
+            if positive_ttl is not None:
+                self.positive_ttl = positive_ttl
+            if negative_ttl is not None:
+                self.negative_ttl = negative_ttl
+            self._cache.clear()
+
+    def cached(self, host):
+        """(encontrado, ip) sem consultar o resolvedor; ip None = negativo"""
+        host = host.lower()
+        if host in self.pinned:
+            self.pinned_hits += 1
+            return True, self.pinned[host]
+        entry = self._cache.get(host)
+        if entry is not None and self.clock() < entry[1]:
+            if entry[0] is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return True, entry[0]
+        return False, None
+
+    def _resolve_blocking(self, host):
+        start = time.perf_counter()
+        try:
+            ip = self.lookup(host)
+        except Exception:
+            ip = None
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.lookup_ms_total += elapsed_ms
+            if ip is None:
+                self.failures += 1
+            ttl = self.positive_ttl if ip else self.negative_ttl
+            self._cache[host] = (ip, self.clock() + ttl)
+            self._pending.pop(host, None)
+        return ip
+
+    def _submit(self, host):
+        """Lookup em andamento para o host (um só por nome)"""
+        with self._lock:
+            future = self._pending.get(host)
+            if future is None:
+                self.misses += 1
+                future = self._executor.submit(self._resolve_blocking, host)
+                self._pending[host] = future
+            return future
+
+    async def resolve(self, host, timeout=3):
+        """IPv4 do host ou None (falha, negativo em cache ou tempo esgotado)"""
+        if is_ipv4(host):
+            return host
+        found, ip = self.cached(host)
+        if found:
+            return ip
+        future = self._submit(host.lower())
+        try:
+            # O lookup continua no pool e preenche o cache mesmo após timeout
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+        except Exception:
+            return None
+
+    def resolve_sync(self, host, timeout=3):
+        """Versão síncrona para threads de trabalho"""
+        if is_ipv4(host):
+            return host
+        found, ip = self.cached(host)
+        if found:
+            return ip
+        try:
+            return self._submit(host.lower()).result(timeout)
+        except Exception:
+            return None
+
+    def stats(self):
+        """Contadores do cache"""
+        lookups = self.hits + self.negative_hits + self.pinned_hits + self.misses
+        return {
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "pinned_hits": self.pinned_hits,
+            "misses": self.misses,
+            "failures": self.failures,
+            "entries": len(self._cache),
+            "hit_rate": round((lookups - self.misses) / lookups, 3) if lookups else 0.0,
+            "avg_lookup_ms": round(self.lookup_ms_total / self.misses, 1) if self.misses else 0.0,
+        }
+
+    def summary(self):
+        stats = self.stats()
+        return (
+            f"acertos={stats['hits']} negativos={stats['negative_hits']} "
+            f"fixados={stats['pinned_hits']} consultas={stats['misses']} "
+            f"falhas={stats['failures']} taxa={stats['hit_rate'] * 100:.0f}% "
+            f"média={stats['avg_lookup_ms']}ms"
+        )
+
+
+_dns_cache = DnsCache()
+
+
+def get_dns_cache():
+    """Instância compartilhada do cache DNS"""
+    return _dns_cache
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or ["itaipu.gov.br", "uol.com.br"]:
+        for attempt in range(2):
+            start = time.perf_counter()
+            address = _dns_cache.resolve_sync(name)
+            print(f"{name} ({attempt + 1}ª): {address} em {(time.perf_counter() - start) * 1000:.1f}ms")
+    print(_dns_cache.summary())
@@ -0,0 +1,640 @@
+"""
+Modo sem janela (servidores, tarefas agendadas)
+
+Mesmo agendador, monitor de inatividade, simulação e sondas de
+conectividade da GUI, num loop asyncio e sem PyQt6.QtWidgets: os QTimer
+viram loop.call_later. As configurações são as mesmas da GUI (QSettings do
+QtCore, se disponível). O estado é exposto por um canal de controle local
+(TCP em 127.0.0.1, porta efêmera, uma linha JSON por comando). Porta e um
+token aleatório ficam num arquivo legível só pelo usuário; comandos sem o
+token são recusados, então outros usuários do mesmo servidor RDP não
+controlam a instância e cada usuário pode ter a sua.
+
+    python keep-alive-app.py --headless [--scheduled|--stopped] [--interval S] [--control-file F]
+    python keep-alive-app.py --ctl status|start|start-scheduled|stop|quit [--control-file F]
+    python headless.py --compare   # memória e partida: GUI x headless
+"""
+
+import asyncio
+import ctypes
+import hmac
+import json
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from datetime import time as dtime
+
+from activity_log import (
+    EVENT_ACTIVITY,
+    EVENT_CONNECTIVITY,
+    EVENT_MESSAGE,
+    EVENT_SCHEDULE,
+    EVENT_USER_ACTIVE,
+    get_activity_log,
+)
+from activity_scheduler import DEFAULT_JITTER, ActivityScheduler
+from idle_monitor import IdleMonitor
+from keepalive_activity import allow_system_lock
+from keepalive_strategy import StrategyEngine
+from log_routing import ROUTES, LogCategory, classify_message
+from probe_engine import ConnectivityProbeEngine, configure_probes, format_connectivity_status
+from refresh_cadence import RefreshCadence, snapshot_signature
+from system_policy import compute_user_timeout, get_policy_cache
+from timeseries_store import TimeSeriesStore
+
+try:
+    import psutil
+
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+CONTROL_HOST = "127.0.0.1"
+CONTROL_FILENAME = "headless-control.json"  # porta efêmera + token da instância
+CONTROL_COMMANDS = ("status", "start", "start-scheduled", "stop", "quit")
+READY_EXIT = "--ready-exit"  # sobe, informa memória e sai (medição)
+
+# Mesmos padrões da GUI
+DEFAULT_INTERVAL = 60
+DEFAULT_USER_TIMEOUT = 60
+USER_TIMEOUT_MIN = 30
+DEFAULT_START_TIME = dtime(8, 0)
+DEFAULT_END_TIME = dtime(18, 0)
+CONNECTIVITY_LOG_S = 60
+
+
+def default_control_file():
+    """Arquivo do canal de controle (LOCALAPPDATA no Windows, home nos demais)"""
+    base = os.getenv("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "KeepAliveRDP", CONTROL_FILENAME)
+
+
+def write_control_file(path, port, token):
+    """Grava porta e token legíveis só pelo usuário (troca atômica)"""
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    # 0o600 no POSIX; no Windows o LOCALAPPDATA já tem ACL só do usuário
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"port": port, "token": token, "pid": os.getpid()}, f)
+    os.replace(temp_path, path)
+
+
+def read_control_file(path):
+    """(porta, token) gravados pela instância, ou None"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return int(data["port"]), str(data["token"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def remove_control_file(path, token):
+    """Apaga o arquivo se ainda for desta instância"""
+    endpoint = read_control_file(path)
+    if endpoint is not None and endpoint[1] == token:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def scratch_control_file(tag):
+    """Arquivo de controle temporário (medições sem disputar com a instância do usuário)"""
+    return os.path.join(tempfile.gettempdir(), f"keepalive-{tag}-{os.getpid()}.json")
+
+
+def process_rss_kb():
+    """Memória residente do processo em KiB (0 se indisponível)"""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss // 1024
+    if sys.platform == "win32":
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", ctypes.c_ulong),
+                ("PageFaultCount", ctypes.c_ulong),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize // 1024
+        return 0
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except Exception:
+        return 0
+
+
+def report_ready(mode):
+    """Linha "READY {...}" lida por --compare"""
+    print("READY " + json.dumps({"mode": mode, "rss_kb": process_rss_kb()}), flush=True)
+
+
+class HeadlessSettings:
+    """Configurações da GUI (QSettings do QtCore) com sobreposição da linha de comando"""
+
+    def __init__(self, overrides=None):
+        self.overrides = dict(overrides or {})
+        try:
+            from PyQt6.QtCore import QSettings
+
+            self._settings = QSettings("KeepAliveTools", "KeepAliveManager")
+        except ImportError:
+            self._settings = None
+
+    def value(self, key, default=None, type_=None):
+        if key in self.overrides:
+            return self.overrides[key]
+        if self._settings is None:
+            return default
+        try:
+            if type_ is None:
+                return self._settings.value(key, default)
+            return self._settings.value(key, default, type_)
+        except Exception:
+            return default
+
+    def time_value(self, key, default):
+        """Horário salvo como QTime pela GUI, como datetime.time"""
+        value = self.value(key)
+        if value is None:
+            return default
+        if isinstance(value, dtime):
+            return value
+        try:
+            return dtime(value.hour(), value.minute())
+        except Exception:
+            return default
+
+
+class HeadlessService:
+    """Serviço de keep-alive sem interface; timers sobre o loop asyncio"""
+
+    def __init__(self, settings, loop=None):
+        self.loop = loop or asyncio.get_running_loop()
+        self.settings = settings
+        self.interval = settings.value("interval", DEFAULT_INTERVAL, int)
+        self.random_intervals = settings.value("random_intervals", True, bool)
+        self.start_time = settings.time_value("start_time", DEFAULT_START_TIME)
+        self.end_time = settings.time_value("end_time", DEFAULT_END_TIME)
+        configure_probes(settings.value)
+
+        # Log persistente (gravação em segundo plano)
+        self.activity_log = get_activity_log()
+        self.activity_log.start()
+
+        self.policy = get_policy_cache().get()
+        # Como na GUI: o ajuste pelas políticas prevalece sobre o valor salvo
+        self.user_timeout = compute_user_timeout(self.policy, USER_TIMEOUT_MIN, DEFAULT_USER_TIMEOUT)
+        get_policy_cache().start_change_watch()
+
+        self.is_running = False
+        self.use_schedule = False
+        self.activity_count = 0
+        self.started_at = time.monotonic()
+        self.last_snapshot = None
+        self.last_connectivity_log = 0.0
+        self._handles = {}  # nome -> asyncio.TimerHandle (equivalente aos QTimer)
+        self._stopped = asyncio.Event()
+        self._token = secrets.token_hex(16)
+
+        self.strategy = StrategyEngine(require_input=settings.value("require_input", False, bool))
+        self.scheduler = ActivityScheduler(self.interval)
+        self.idle_monitor = IdleMonitor(self.user_timeout, on_idle=self.on_user_idle, on_active=self.on_user_active)
+        self.timeseries = TimeSeriesStore()
+        # Sem janela: cadência de "oculta" (recua até o teto; pausa com o serviço parado)
+        self.cadence = RefreshCadence()
+        self.cadence.set_visible(False)
+        self.probe_engine = ConnectivityProbeEngine(
+            lambda snapshot: self.loop.call_soon_threadsafe(self.on_connectivity_snapshot, snapshot)
+        )
+
+    # ----------------------------------------------------------- timers
+    def _call_later(self, name, delay_s, callback):
+        self._cancel(name)
+        self._handles[name] = self.loop.call_later(max(0.0, delay_s), callback)
+
+    def _cancel(self, name):
+        handle = self._handles.pop(name, None)
+        if handle is not None:
+            handle.cancel()
+
+    def _pending(self, name):
+        handle = self._handles.get(name)
+        return handle is not None and not handle.cancelled() and handle.when() > self.loop.time()
+
+    # -------------------------------------------------------------- log
+    def log(self, message, category=None):
+        """Log roteado como na GUI: saída padrão + log persistente"""
+        category = category or classify_message(message)
+        if ROUTES[category].full:
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            print(f"[{timestamp}] {message}", flush=True)
+        self.activity_log.record(EVENT_MESSAGE, message, category=category.key, severity=category.severity.name)
+
+    # ---------------------------------------------------------- serviço
+    def activity_jitter(self):
+        return DEFAULT_JITTER if self.random_intervals else 0.0
+
+    def check_schedule(self):
+        """Verifica horário de funcionamento"""
+        if not self.use_schedule:
+            return True
+        current_time = datetime.now().time()
+        if self.start_time <= self.end_time:
+            return self.start_time <= current_time <= self.end_time
+        return current_time >= self.start_time or current_time <= self.end_time
+
+    def start(self, scheduled=False):
+        """Inicia o serviço (agendado: só dentro do horário)"""
+        self.stop()
+        self.use_schedule = scheduled
+        if scheduled and not self.check_schedule():
+            self.activity_log.record(
+                EVENT_SCHEDULE,
+                state="outside_schedule",
+                start=self.start_time.strftime("%H:%M"),
+                end=self.end_time.strftime("%H:%M"),
+            )
+            self.log("Serviço parado - Fora do horário de agendamento", LogCategory.SCHEDULE)
+            return False
+        self.scheduler.start(self.interval, self.activity_jitter())
+        delay_s = self.scheduler.seconds_until_next()
+        self._call_later("activity", delay_s, self.perform_activity)
+        self.is_running = True
+        self.cadence.set_running(True)
+        if not self._pending("connectivity"):
+            self.schedule_connectivity_refresh()
+        self.idle_monitor.reset()
+        self.sample_idle()
+        self.activity_log.record(
+            EVENT_SCHEDULE,
+            state="started",
+            scheduled=scheduled,
+            interval_s=self.interval,
+            next_s=round(delay_s, 1),
+            strategy=self.strategy.current().key,
+            require_input=self.strategy.require_input,
+        )
+        self.log(f"Serviço Iniciado. Simulação: {self.interval}s ±δ → {delay_s:.1f}s", LogCategory.SERVICE)
+        self.log(self.strategy.describe())
+        return True
+
+    def stop(self):
+        """Para o serviço"""
+        if not self.is_running:
+            return
+        self._cancel("activity")
+        self._cancel("idle")
+        self.scheduler.stop()
+        self.is_running = False
+        self.cadence.set_running(False)
+        self.schedule_connectivity_refresh()
+        allow_system_lock()
+        self.activity_log.record(
+            EVENT_SCHEDULE,
+            state="stopped",
+            scheduled=self.use_schedule,
+            lateness_mean_ms=round(self.scheduler.lateness.mean_ms),
+            lateness_max_ms=round(self.scheduler.lateness.max_ms),
+        )
+        self.log(f"Atraso do agendador: {self.scheduler.lateness.summary()}")
+        self.log(f"Keep-alive: {self.strategy.summary()}")
+        self.log("Serviço Parado", LogCategory.SERVICE)
+
+    def perform_activity(self):
+        lateness_ms = self.scheduler.fired()
+        try:
+            if self.use_schedule and not self.check_schedule():
+                self.stop()
+                return
+
+            idle_time = self.idle_monitor.user_idle_seconds()
+            if idle_time < self.idle_monitor.threshold_s:
+                # Sem reagendar: o monitor de inatividade acorda a simulação
+                self.activity_count += 1
+                self.activity_log.record(
+                    EVENT_USER_ACTIVE,
+                    idle_s=round(idle_time, 1),
+                    timeout_s=self.idle_monitor.threshold_s,
+                    count=self.activity_count,
+                    lateness_ms=round(lateness_ms),
+                )
+                return
+
+            activity_success, activity_message = self.strategy.run(idle_time)
+            if self.strategy.last_events:
+                self.idle_monitor.mark_injected(idle_time)
+            self.activity_count += 1
+            self.activity_log.record(
+                EVENT_ACTIVITY,
+                success=activity_success,
+                idle_s=round(idle_time, 1),
+                count=self.activity_count,
+                detail=activity_message,
+                strategy=self.strategy.last_strategy.key,
+                lateness_ms=round(lateness_ms),
+            )
+            if activity_success:
+                self.log("Simulação Executada", LogCategory.ACTIVITY)
+            else:
+                self.log(f"ERRO: {activity_message}", LogCategory.ERROR)
+
+            if self.is_running:
+                self.schedule_next_activity()
+        except Exception as e:
+            self.log(f"ERRO CRÍTICO: Erro na atividade #{self.activity_count}: {str(e)}", LogCategory.ERROR)
+
+    def schedule_next_activity(self):
+        """Próximo ponto da grade monotônica"""
+        if not self.scheduler.running:
+            self.scheduler.start(self.interval, self.activity_jitter())
+        else:
+            self.scheduler.advance()
+        delay_s = self.scheduler.seconds_until_next()
+        self._call_later("activity", delay_s, self.perform_activity)
+        self.log(f"Próxima Atividade em {delay_s:.1f}s", LogCategory.NEXT_ACTIVITY)
+
+    def sample_idle(self):
+        delay_s = self.idle_monitor.sample()
+        if self.is_running:
+            self._call_later("idle", delay_s, self.sample_idle)
+
+    def on_user_active(self, idle_time):
+        """Usuário voltou: pausa a simulação até nova inatividade"""
+        if not self.is_running or not self._pending("activity"):
+            return
+        self._cancel("activity")
+        timeout_limit = self.idle_monitor.threshold_s
+        self.activity_log.record(
+            EVENT_USER_ACTIVE, idle_s=round(idle_time, 1), timeout_s=timeout_limit, count=self.activity_count
+        )
+        self.log(f"Usuário Ativo (inatividade: {idle_time:.1f}s < {timeout_limit}s)", LogCategory.USER_ACTIVE)
+
+    def on_user_idle(self, idle_time):
+        """Inatividade cruzou o limite: retoma a grade de atividades"""
+        if self.is_running and not self._pending("activity"):
+            self.log(f"Usuário inativo há {idle_time:.1f}s")
+            self.schedule_next_activity()
+
+    # ---------------------------------------------------- conectividade
+    def update_connectivity_info(self):
+        self.probe_engine.submit_cycle()
+        self.schedule_connectivity_refresh()
+
+    def schedule_connectivity_refresh(self):
+        interval = self.cadence.next_interval()
+        if interval is None:
+            self._cancel("connectivity")
+        else:
+            self._call_later("connectivity", interval, self.update_connectivity_info)
+
+    def on_connectivity_snapshot(self, snapshot):
+        """Resultado das sondas, já na thread do loop"""
+        try:
+            self.last_snapshot = snapshot
+            self.activity_log.record(
+                EVENT_CONNECTIVITY,
+                rdp=snapshot.tem_rdp,
+                rdp_sessions=snapshot.lista_rdp,
+                gateway=snapshot.gateway,
+                ip=snapshot.ip_usado,
+                gateway_ms=snapshot.ping_gw,
+                external_ms=snapshot.ping_brasil,
+                external_site=snapshot.site_brasil,
+                external_jitter_ms=round(snapshot.jitter_brasil, 1),
+                rdp_peer_ms=snapshot.ping_sistema,
+            )
+            self.timeseries.record_snapshot(snapshot)
+            self.cadence.observe(snapshot_signature(snapshot), failed=snapshot.ping_gw <= 0)
+            self.schedule_connectivity_refresh()
+
+            now = time.monotonic()
+            if now - self.last_connectivity_log >= CONNECTIVITY_LOG_S:
+                self.last_connectivity_log = now
+                self.log(
+                    format_connectivity_status(
+                        snapshot.tem_rdp,
+                        snapshot.conexao_principal,
+                        snapshot.ping_gw,
+                        snapshot.ping_brasil,
+                        snapshot.ping_sistema,
+                        snapshot.sistema_nome,
+                        snapshot.jitter_brasil,
+                    ),
+                    LogCategory.CONNECTIVITY,
+                )
+        except Exception as e:
+            print(f"[DEBUG] Erro conectividade: {e}")
+
+    # ----------------------------------------------------------- estado
+    def status(self):
+        """Estado para o canal de controle"""
+        snapshot = self.last_snapshot
+        return {
+            "running": self.is_running,
+            "scheduled": self.use_schedule,
+            "activity_count": self.activity_count,
+            "next_activity_s": round(self.scheduler.seconds_until_next(), 1) if self.is_running else None,
+            "interval_s": self.interval,
+            "user_timeout_s": self.idle_monitor.threshold_s,
+            "lateness": self.scheduler.lateness.summary(),
+            "strategy": self.strategy.stats(),
+            "cadence": self.cadence.describe(),
+            "connectivity": snapshot._asdict() if snapshot else None,
+            "samples": self.timeseries.samples,
+            "uptime_s": round(time.monotonic() - self.started_at),
+            "rss_kb": process_rss_kb(),
+        }
+
+    def handle_command(self, command):
+        """Executa um comando do canal de controle; retorna a resposta"""
+        if command == "start":
+            self.start(scheduled=False)
+        elif command == "start-scheduled":
+            self.start(scheduled=True)
+        elif command == "stop":
+            self.stop()
+        elif command == "quit":
+            self._stopped.set()
+        elif command != "status":
+            return {"ok": False, "error": f"comando desconhecido: {command}", "commands": CONTROL_COMMANDS}
+        return {"ok": True, **self.status()}
+
+    async def _serve_client(self, reader, writer):
+        """Uma linha {"command", "token"} por conexão; responde e fecha"""
+        try:
+            line = await reader.readline()
+            try:
+                request = json.loads(line)
+                command, token = request.get("command", ""), str(request.get("token", ""))
+            except (ValueError, AttributeError):
+                command, token = "", ""
+            if hmac.compare_digest(token.encode("utf-8"), self._token.encode("utf-8")):
+                response = self.handle_command(command)
+            else:
+                response = {"ok": False, "error": "token inválido"}
+            writer.write((json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8"))
+            await writer.drain()
+        except Exception as e:
+            print(f"[DEBUG] Erro no canal de controle: {e}")
+        finally:
+            writer.close()
+
+    async def run(self, control_file=None, autostart=None, ready_exit=False):
+        """Loop principal; retorna o código de saída"""
+        control_file = control_file or default_control_file()
+        if read_control_file(control_file) is not None:
+            try:
+                await asyncio.to_thread(send_command, "status", control_file, 2)
+                print(f"Já existe uma instância em execução ({control_file})", file=sys.stderr)
+                return 1
+            except (OSError, ValueError):
+                pass  # arquivo de uma instância que não existe mais
+        try:
+            server = await asyncio.start_server(self._serve_client, CONTROL_HOST, 0)
+            port = server.sockets[0].getsockname()[1]
+            write_control_file(control_file, port, self._token)
+        except OSError as e:
+            print(f"Canal de controle indisponível: {e}", file=sys.stderr)
+            return 1
+        self.log(f"Modo sem janela: controle em {CONTROL_HOST}:{port} ({control_file})", LogCategory.STARTUP)
+        self.log(
+            f"Políticas: proteção de tela {self.policy.screen_saver_timeout}s"
+            f" ({self.policy.screen_saver_source}), RDP {self.policy.rdp_disconnect_time}s"
+            f" ({self.policy.rdp_source or 'não definido'}) → inatividade {self.user_timeout}s",
+            LogCategory.STARTUP,
+        )
+        self._call_later("connectivity", 2, self.update_connectivity_info)
+        if autostart is not None:
+            self.start(scheduled=autostart == "scheduled")
+        if ready_exit:
+            report_ready("headless")
+            self._stopped.set()
+        try:
+            await self._stopped.wait()
+        finally:
+            server.close()
+            remove_control_file(control_file, self._token)
+            self.shutdown()
+        return 0
+
+    def shutdown(self):
+        self.stop()
+        for name in list(self._handles):
+            self._cancel(name)
+        for line in self.probe_engine.report_lines():
+            self.log(f"Latência sonda {line}")
+        self.log("Aplicativo encerrado")
+        self.probe_engine.shutdown()
+        self.activity_log.stop()
+
+
+def send_command(command, control_file=None, timeout=5):
+    """Cliente do canal de controle: envia um comando e devolve a resposta"""
+    control_file = control_file or default_control_file()
+    endpoint = read_control_file(control_file)
+    if endpoint is None:
+        raise FileNotFoundError(control_file)
+    port, token = endpoint
+    with socket.create_connection((CONTROL_HOST, port), timeout=timeout) as sock:
+        sock.sendall((json.dumps({"command": command, "token": token}) + "\n").encode("utf-8"))
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    return json.loads(data)
+
+
+def _measure(argv):
+    """Tempo até "READY" e memória informada pelo processo filho"""
+    start = time.perf_counter()
+    process = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    result = None
+    for line in process.stdout:
+        if line.startswith("READY "):
+            result = json.loads(line[6:])
+            result["startup_ms"] = round((time.perf_counter() - start) * 1000)
+            break
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+    return result
+
+
+def compare(runs=3):
+    """Memória e tempo de partida: GUI x headless (mesmo interpretador)"""
+    app = os.path.join(os.path.dirname(os.path.abspath(__file__)), "keep-alive-app.py")
+    headless_argv = [sys.executable, app, "--headless", READY_EXIT, "--control-file", scratch_control_file("compare")]
+    modes = (("gui", [sys.executable, app, READY_EXIT]), ("headless", headless_argv))
+    for mode, argv in modes:
+        results = [r for r in (_measure(argv) for _ in range(runs)) if r]
+        if not results:
+            print(f"{mode:<9} falhou (dependências ausentes?)")
+            continue
+        startup = sorted(r["startup_ms"] for r in results)[len(results) // 2]
+        rss = max(r["rss_kb"] for r in results)
+        print(f"{mode:<9} partida={startup}ms (mediana de {len(results)}) memória={rss / 1024:.1f} MiB")
+
+
+def main(args):
+    """Ponto de entrada de --headless, --ctl e --compare"""
+    control_file = None
+    if "--control-file" in args:
+        control_file = args[args.index("--control-file") + 1]
+
+    if "--ctl" in args:
+        index = args.index("--ctl")
+        command = args[index + 1] if len(args) > index + 1 else "status"
+        try:
+            response = send_command(command, control_file)
+        except (OSError, ValueError):
+            print(f"Nenhuma instância sem janela ({control_file or default_control_file()})", file=sys.stderr)
+            return 1
+        print(json.dumps(response, indent=2, ensure_ascii=False))
+        return 0 if response.get("ok") else 1
+
+    if "--compare" in args:
+        compare()
+        return 0
+
+    autostart = "scheduled" if "--scheduled" in args else "continuous"
+    if "--stopped" in args:
+        autostart = None
+    overrides = {}
+    if "--interval" in args:
+        overrides["interval"] = int(args[args.index("--interval") + 1])
+
+    async def run():
+        service = HeadlessService(HeadlessSettings(overrides))
+        return await service.run(control_file, autostart, ready_exit=READY_EXIT in args)
+
+    try:
+        return asyncio.run(run())
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,211 @@
+"""
+Monitor de inatividade do usuário orientado a eventos
+
+A leitura do último input fica atrás de IdleProbe (GetLastInputInfo no
+Windows, trace sintético nos testes). IdleMonitor amostra em ritmo
+adaptativo: longe do limite dorme até o instante em que o limite seria
+cruzado; perto dele amostra mais rápido. Emite "ficou inativo" e "ficou
+ativo" apenas quando o limite é cruzado, para o simulador acordar só quando
+necessário. A entrada injetada pelo próprio app (mark_injected) não conta
+como usuário ativo: a inatividade do usuário continua contando a partir do
+valor anterior à injeção.
+
+    python idle_monitor.py   # simulação com trace sintético
+"""
+
+import ctypes
+import sys
+import time
+
+from activity_scheduler import FakeClock
+
+IDLE_MIN_SAMPLE_S = 0.25
+IDLE_MAX_SAMPLE_S = 30.0
+IDLE_ACTIVE_POLL_S = 5.0  # ritmo enquanto inativo (perform_activity confere de novo)
+IDLE_INJECTION_GRACE_S = 1.0  # entrada registrada até 1s após a injeção é do próprio app
+
+
+class LASTINPUTINFO(ctypes.Structure):
+    """Estrutura de GetLastInputInfo (definida uma única vez)"""
+
+    _fields_ = [("cbSize", ctypes.c_uint), ("dwTime", ctypes.c_uint)]
+
+
+class IdleProbe:
+    """Interface das fontes de tempo de inatividade"""
+
+    def idle_seconds(self):
+        """Segundos desde o último input do usuário"""
+        raise NotImplementedError
+
+
+class Win32IdleProbe(IdleProbe):
+    """GetLastInputInfo + GetTickCount, reaproveitando a mesma estrutura"""
+
+    def __init__(self):
+        self._info = LASTINPUTINFO()
+        self._info.cbSize = ctypes.sizeof(LASTINPUTINFO)
+        self._user32 = ctypes.windll.user32
+        self._kernel32 = ctypes.windll.kernel32
+        self._kernel32.GetTickCount.restype = ctypes.c_uint
+
+    def idle_seconds(self):
+        if not self._user32.GetLastInputInfo(ctypes.byref(self._info)):
+            return 0
+        # Contadores de 32 bits voltam a zero a cada ~49,7 dias
+        elapsed_ms = (self._kernel32.GetTickCount() - self._info.dwTime) & 0xFFFFFFFF
+        return elapsed_ms / 1000.0
+
+
+class NullIdleProbe(IdleProbe):
+    """Sem fonte disponível: considera o usuário sempre ativo"""
+
+    def idle_seconds(self):
+        return 0
+
+
+class TraceIdleProbe(IdleProbe):
+    """Trace sintético: instantes (no relógio informado) de cada input"""
+
+    def __init__(self, input_times, clock):
+        self.input_times = sorted(input_times)
+        self.clock = clock
+
+    def idle_seconds(self):
+        now = self.clock()
+        last_input = 0.0
+        for moment in self.input_times:
+            if moment > now:
+                break
+            last_input = moment
+        return now - last_input
+
+
+def default_idle_probe():
+    """Fonte padrão da plataforma"""
+    if sys.platform == "win32":
+        try:
+            return Win32IdleProbe()
+        except Exception:
+            pass
+    return NullIdleProbe()
+
+
+_default_probe = None
+
+
+def get_user_activity_timeout():
+    """Obtém tempo de inatividade do usuário em segundos"""
+    global _default_probe
+    try:
+        if _default_probe is None:
+            _default_probe = default_idle_probe()
+        return _default_probe.idle_seconds()
+    except Exception:
+        return 0
+
+
+class IdleMonitor:
+    """Amostra a inatividade e avisa quando o limite é cruzado
+
+    on_idle(idle_s) / on_active(idle_s) são chamados apenas nas transições;
+    a primeira amostra só define o estado inicial.
+    """
+
+    def __init__(
+        self,
+        threshold_s,
+        probe=None,
+        on_idle=None,
+        on_active=None,
+        min_sample_s=IDLE_MIN_SAMPLE_S,
+        max_sample_s=IDLE_MAX_SAMPLE_S,
+        active_poll_s=IDLE_ACTIVE_POLL_S,
+        injection_grace_s=IDLE_INJECTION_GRACE_S,
+        clock=time.monotonic,
+    ):
+        self.threshold_s = threshold_s
+        self.probe = probe or default_idle_probe()
+        self.on_idle = on_idle
+        self.on_active = on_active
+        self.min_sample_s = min_sample_s
+        self.max_sample_s = max_sample_s
+        self.active_poll_s = active_poll_s
+        self.injection_grace_s = injection_grace_s
+        self.clock = clock
+        self._injected = None  # (instante da injeção, inatividade do usuário antes dela)
+        self.is_idle = None
+        self.last_idle_s = 0.0
+        self.samples = 0
+        self.transitions = 0
+
+    def reset(self):
+        """Esquece o estado (a próxima amostra volta a ser a inicial)"""
+        self.is_idle = None
+
+    def mark_injected(self, idle_before):
+        """Registra entrada injetada pelo app agora (não conta como usuário ativo)"""
+        self._injected = (self.clock(), idle_before)
+
+    def user_idle_seconds(self):
+        """Inatividade do usuário, descontando a última entrada injetada pelo app"""
+        try:
+            idle_s = self.probe.idle_seconds()
+        except Exception:
+            return 0
+        if self._injected is None:
+            return idle_s
+        injected_at, idle_before = self._injected
+        now = self.clock()
+        if now - idle_s > injected_at + self.injection_grace_s:
+            # Último input depois da injeção: é do usuário
+            self._injected = None
+            return idle_s
+        return idle_before + (now - injected_at)
+
+    def next_delay(self, idle_s):
+        """Intervalo até a próxima amostra"""
+        if self.is_idle:
+            return self.active_poll_s
+        # Sem input, a inatividade cresce 1s/s: acorda quando cruzaria o limite
+        remaining = self.threshold_s - idle_s
+        return min(self.max_sample_s, max(self.min_sample_s, remaining))
+
+    def sample(self):
+        """Lê a inatividade, emite transições e retorna o próximo intervalo (s)"""
+        idle_s = self.user_idle_seconds()
+        self.samples += 1
+        self.last_idle_s = idle_s
+        idle_now = idle_s >= self.threshold_s
+        previous, self.is_idle = self.is_idle, idle_now
+
+        if previous is not None and idle_now != previous:
+            self.transitions += 1
+            callback = self.on_idle if idle_now else self.on_active
+            if callback:
+                callback(idle_s)
+        return self.next_delay(idle_s)
+
+
+def simulate_trace(input_times, threshold_s, duration_s):
+    """Executa o monitor sobre um trace sintético; retorna (eventos, amostras)"""
+    clock = FakeClock()
+    events = []
+    monitor = IdleMonitor(
+        threshold_s,
+        TraceIdleProbe(input_times, clock),
+        on_idle=lambda idle: events.append((clock.now, "idle", round(idle, 2))),
+        on_active=lambda idle: events.append((clock.now, "active", round(idle, 2))),
+    )
+    while clock.now < duration_s:
+        clock.advance(monitor.sample())
+    return events, monitor.samples
+
+
+if __name__ == "__main__":
+    # Usuário digita nos primeiros 10 min, sai por 20 min e volta
+    trace = [t * 5.0 for t in range(120)] + [1800.0 + t * 3.0 for t in range(50)]
+    events, samples = simulate_trace(trace, threshold_s=60, duration_s=3600)
+    for moment, state, idle in events:
+        print(f"{moment:8.2f}s  {state:<6} (inatividade {idle}s)")
+    print(f"{samples} amostras em 3600s (amostragem fixa de 1s: 3600)")
@@ -0,0 +1,253 @@
+"""
+Injeção de entrada (mouse/teclado) em lote
+
+InputInjector recebe uma sequência de InputEvent e a entrega de uma vez:
+no Windows, uma única chamada SendInput (sem interpolação de movimento nem
+sleeps entre eventos, ao contrário de pyautogui.moveTo(duration=...)). Fora
+do Windows (ou sem SendInput) NullInjector não envia nada e reporta falha;
+RecordingInjector só registra os lotes e é usado nos testes e benchmarks.
+
+    python -m pytest tests/test_input_injector.py
+    python input_injector.py --bench [n]
+"""
+
+import ctypes
+import logging
+import random
+import sys
+import time
+from typing import NamedTuple
+
+INPUT_MOUSE = 0
+INPUT_KEYBOARD = 1
+MOUSEEVENTF_MOVE = 0x0001
+MOUSEEVENTF_ABSOLUTE = 0x8000
+KEYEVENTF_KEYUP = 0x0002
+SM_CXSCREEN = 0
+SM_CYSCREEN = 1
+
+VK_CAPITAL = 0x14
+VK_NUMLOCK = 0x90
+VK_SCROLL = 0x91
+VK_F15 = 0x7E
+SAFE_TOGGLE_KEYS = (VK_NUMLOCK, VK_SCROLL, VK_CAPITAL)
+
+MOUSE = "mouse"
+KEY = "key"
+
+
+class InputEvent(NamedTuple):
+    """Evento de entrada: movimento (relativo ou absoluto em pixels) ou tecla"""
+
+    kind: str
+    x: int = 0
+    y: int = 0
+    absolute: bool = False
+    vk: int = 0
+    key_up: bool = False
+
+
+def mouse_move(dx, dy):
+    return InputEvent(MOUSE, dx, dy)
+
+
+def mouse_move_to(x, y):
+    return InputEvent(MOUSE, x, y, absolute=True)
+
+
+def key_press(vk):
+    """Tecla pressionada e solta"""
+    return [InputEvent(KEY, vk=vk), InputEvent(KEY, vk=vk, key_up=True)]
+
+
+def activity_sequence(screen_width, screen_height, rng=random):
+    """Mesma atividade de antes, em um lote: movimento ao centro, ajuste e tecla de trava alternada 2x"""
+    center_x = screen_width // 2
+    center_y = screen_height // 2
+    safe_zone = min(screen_width, screen_height) // 20
+
+    # Posição aleatória na área central + pequeno movimento adicional
+    events = [
+        mouse_move_to(
+            center_x + rng.randint(-safe_zone, safe_zone),
+            center_y + rng.randint(-safe_zone, safe_zone),
+        ),
+        mouse_move(rng.randint(-3, 3), rng.randint(-3, 3)),
+    ]
+    # Liga e desliga a mesma tecla de trava: estado final inalterado
+    selected_key = rng.choice(SAFE_TOGGLE_KEYS)
+    events += key_press(selected_key) + key_press(selected_key)
+    return events
+
+
+# Tipos Win32 com largura fixa (c_long/c_ulong têm 8 bytes no Linux 64 bits)
+LONG = ctypes.c_int32
+DWORD = ctypes.c_uint32
+WORD = ctypes.c_uint16
+ULONG_PTR = ctypes.c_size_t
+
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [
+        ("dx", LONG),
+        ("dy", LONG),
+        ("mouseData", DWORD),
+        ("dwFlags", DWORD),
+        ("time", DWORD),
+        ("dwExtraInfo", ULONG_PTR),
+    ]
+
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [
+        ("wVk", WORD),
+        ("wScan", WORD),
+        ("dwFlags", DWORD),
+        ("time", DWORD),
+        ("dwExtraInfo", ULONG_PTR),
+    ]
+
+
+class HARDWAREINPUT(ctypes.Structure):
+    _fields_ = [("uMsg", DWORD), ("wParamL", WORD), ("wParamH", WORD)]
+
+
+class _INPUTUNION(ctypes.Union):
+    _fields_ = [("mi", MOUSEINPUT), ("ki", KEYBDINPUT), ("hi", HARDWAREINPUT)]
+
+
+class INPUT(ctypes.Structure):
+    _anonymous_ = ("u",)
+    _fields_ = [("type", DWORD), ("u", _INPUTUNION)]
+
+
+class InputInjector:
+    """Interface: entrega um lote de InputEvent"""
+
+    def screen_size(self):
+        raise NotImplementedError
+
+    def send(self, events):
+        """Injeta os eventos em ordem; retorna quantos foram aceitos"""
+        raise NotImplementedError
+
+
+class SendInputInjector(InputInjector):
+    """Backend Windows: um único SendInput por lote"""
+
+    def __init__(self):
+        self.user32 = ctypes.windll.user32
+
+    def screen_size(self):
+        return self.user32.GetSystemMetrics(SM_CXSCREEN), self.user32.GetSystemMetrics(SM_CYSCREEN)
+
+    def _to_input(self, event, width, height):
+        item = INPUT()
+        if event.kind == MOUSE:
+            item.type = INPUT_MOUSE
+            if event.absolute:
+                # Coordenadas absolutas normalizadas em 0..65535 (monitor principal)
+                item.mi.dx = event.x * 65535 // max(1, width - 1)
+                item.mi.dy = event.y * 65535 // max(1, height - 1)
+                item.mi.dwFlags = MOUSEEVENTF_MOVE | MOUSEEVENTF_ABSOLUTE
+            else:
+                item.mi.dx, item.mi.dy = event.x, event.y
+                item.mi.dwFlags = MOUSEEVENTF_MOVE
+        else:
+            item.type = INPUT_KEYBOARD
+            item.ki.wVk = event.vk
+            item.ki.dwFlags = KEYEVENTF_KEYUP if event.key_up else 0
+        return item
+
+    def send(self, events):
+        if not events:
+            return 0
+        width, height = self.screen_size()
+        inputs = (INPUT * len(events))(*(self._to_input(e, width, height) for e in events))
+        return self.user32.SendInput(len(events), inputs, ctypes.sizeof(INPUT))
+
+
+class RecordingInjector(InputInjector):
+    """Backend de testes: guarda os lotes e acompanha a posição do cursor"""
+
+    def __init__(self, screen=(1920, 1080)):
+        self.screen = screen
+        self.batches = []
+        self.position = (screen[0] // 2, screen[1] // 2)
+        self.pressed = set()
+
+    def screen_size(self):
+        return self.screen
+
+    def send(self, events):
+        events = list(events)
+        self.batches.append(events)
+        for event in events:
+            if event.kind == MOUSE:
+                if event.absolute:
+                    self.position = (event.x, event.y)
+                else:
+                    self.position = (self.position[0] + event.x, self.position[1] + event.y)
+            elif event.key_up:
+                self.pressed.discard(event.vk)
+            else:
+                self.pressed.add(event.vk)
+        return len(events)
+
+    @property
+    def events(self):
+        return [event for batch in self.batches for event in batch]
+
+
+class NullInjector(InputInjector):
+    """Sem backend de injeção: nada é enviado e send() devolve 0 (a atividade reporta falha)"""
+
+    def __init__(self, screen=(1920, 1080)):
+        self.screen = screen
+
+    def screen_size(self):
+        return self.screen
+
+    def send(self, events):
+        return 0
+
+
+def default_injector():
+    """SendInput no Windows; sem ele, NullInjector (avisa uma vez no log)"""
+    reason = "fora do Windows"
+    if sys.platform == "win32":
+        try:
+            return SendInputInjector()
+        except Exception as e:
+            reason = str(e)
+    logging.warning(f"Injeção de entrada indisponível ({reason}): atividades simuladas vão falhar")
+    return NullInjector()
+
+
+_injector = None
+
+
+def get_input_injector():
+    """Instância compartilhada do injetor"""
+    global _injector
+    if _injector is None:
+        _injector = default_injector()
+    return _injector
+
+
+def benchmark(n=10000):
+    """Custo por atividade na thread chamadora (montagem + envio do lote)"""
+    from keepalive_activity import simulate_safe_activity
+
+    injector = RecordingInjector()
+    start = time.perf_counter()
+    for _ in range(n):
+        simulate_safe_activity(injector)
+    elapsed_us = (time.perf_counter() - start) / n * 1e6
+    print(f"{n} atividades: {elapsed_us:.1f} us/atividade, {len(injector.batches)} lotes")
+    print("pyautogui anterior: >= 400 ms/atividade (moveTo 0.2s + moveRel 0.1s + sleep 0.1s)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 10000)
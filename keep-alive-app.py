@@ -8,25 +8,38 @@ Foz do Iguaçu 11/06/2025
 https://github.com/mauriciomenon/KeepAliveRDP
 """
 
-import ctypes
+import html
 import logging
 import os
-import random
-import re
 import socket
-import subprocess
 import sys
 import time
 from datetime import datetime, timedelta
 
-import pyautogui
-import win32api
-import win32con
-import win32event
-import win32gui
-from PyQt6.QtCore import QLoggingCategory, QSettings, Qt, QTime, QTimer
-from PyQt6.QtGui import QAction, QFont
-from PyQt6.QtWidgets import (
+# Perfil de partida e modo sem janela: despacham antes de carregar o Qt e as
+# dependências da GUI. Por isso os imports abaixo vêm depois de código (noqa: E402)
+if __name__ == "__main__" and "--profile-startup" in sys.argv[1:]:
+    from startup_profile import main as profile_main
+
+    sys.exit(profile_main(sys.argv[1:]))
+
+if __name__ == "__main__" and any(arg in ("--headless", "--ctl", "--compare") for arg in sys.argv[1:]):
+    from headless import main as headless_main
+
+    sys.exit(headless_main(sys.argv[1:]))
+
+from PyQt6.QtCore import (  # noqa: E402
+    QEvent,
+    QLoggingCategory,
+    QObject,
+    QSettings,
+    Qt,
+    QTime,
+    QTimer,
+    pyqtSignal,
+)
+from PyQt6.QtGui import QAction, QFont  # noqa: E402
+from PyQt6.QtWidgets import (  # noqa: E402
     QApplication,
     QCheckBox,
     QComboBox,
@@ -45,12 +58,40 @@ from PyQt6.QtWidgets import (
     QStyle,
     QSystemTrayIcon,
     QTabWidget,
-    QTextEdit,
+    QPlainTextEdit,
     QTimeEdit,
     QVBoxLayout,
     QWidget,
 )
 
+from activity_log import (  # noqa: E402
+    EVENT_ACTIVITY,
+    EVENT_CONNECTIVITY,
+    EVENT_MESSAGE,
+    EVENT_SCHEDULE,
+    EVENT_USER_ACTIVE,
+    get_activity_log,
+)
+from activity_scheduler import DEFAULT_JITTER, ActivityScheduler  # noqa: E402
+from idle_monitor import IdleMonitor, get_user_activity_timeout  # noqa: E402
+from keepalive_activity import allow_system_lock, simulate_safe_activity  # noqa: E402
+from keepalive_strategy import StrategyEngine  # noqa: E402
+from dns_cache import get_dns_cache  # noqa: E402
+from headless import READY_EXIT, report_ready  # noqa: E402
+from latency_chart import LatencySparkline  # noqa: E402
+from log_routing import ROUTES, LogCategory, classify_message, route_for  # noqa: E402
+from log_store import FULL_LOG_MAX_LINES, MAIN_LOG_MAX_LINES  # noqa: E402
+from network_info import get_topology  # noqa: E402
+from probe_engine import (  # noqa: E402
+    ConnectivityProbeEngine,
+    configure_probes,
+    format_connectivity_status,
+)
+from refresh_cadence import RefreshCadence, snapshot_signature  # noqa: E402
+from system_policy import compute_user_timeout, get_policy_cache  # noqa: E402
+from timeseries_store import TimeSeriesStore  # noqa: E402
+from view_model import ViewModel  # noqa: E402
+
 # =============================================================================
 # CONSTANTES E CONFIGURAÇÕES
 # =============================================================================
@@ -61,10 +102,6 @@ APP_AUTHOR = "Maurício Menon"
 APP_DATE = "Foz do Iguaçu 11/06/2025"
 APP_URL = "https://github.com/mauriciomenon/KeepAliveRDP"
 
-# Windows
-SPI_GETSCREENSAVETIMEOUT = 0x000E  # SystemParametersInfo action code
-DEFAULT_SCREENSAVER_TIMEOUT = 900  # 15 min (padrão Windows)
-
 # Configurações padrão
 DEFAULT_INTERVAL = 60  # Segundos entre cada "despertar"
 DEFAULT_USER_TIMEOUT = 60  # Segundos de inatividade necessária
@@ -102,15 +139,6 @@ STR_SERVICE_STOPPED_LOG = "Serviço Parado"
 STR_USER_ACTIVE = "Usuário Ativo (inatividade: {:.1f}s < {}s)"
 STR_SETTINGS_SAVED = "Configurações Salvas"
 
-# Configurações para prevenir bloqueios
-ES_CONTINUOUS = 0x80000000
-ES_SYSTEM_REQUIRED = 0x00000001
-ES_DISPLAY_REQUIRED = 0x00000002
-ES_AWAYMODE_REQUIRED = 0x00000040
-
-# Desabilita fail-safe do PyAutoGUI
-pyautogui.FAILSAFE = False
-
 # Configuração básica de logging
 logging.basicConfig(
     level=logging.WARNING,
@@ -125,6 +153,11 @@ def is_already_running():
     """Verifica se outra instância está em execução"""
     global mutex
     try:
+        # pywin32 só é necessário aqui: importado sob demanda
+        import win32api
+        import win32event
+        import win32gui
+
         # Método 1: Mutex
         mutex = win32event.CreateMutex(None, False, MUTEX_NAME)
         if win32api.GetLastError() == 183:  # ERROR_ALREADY_EXISTS
@@ -175,224 +208,6 @@ def cleanup_lock():
         pass
 
 
-def prevent_system_lock():
-    """Previne bloqueio de tela e hibernação"""
-    try:
-        ctypes.windll.kernel32.SetThreadExecutionState(
-            ES_CONTINUOUS
-            | ES_SYSTEM_REQUIRED
-            | ES_DISPLAY_REQUIRED
-            | ES_AWAYMODE_REQUIRED
-        )
-        return True
-    except Exception:
-        return False
-
-
-def get_user_activity_timeout():
-    """Obtém tempo de inatividade do usuário em segundos"""
-    try:
-
-        class LASTINPUTINFO(ctypes.Structure):
-            _fields_ = [("cbSize", ctypes.c_uint), ("dwTime", ctypes.c_uint)]
-
-        last_input_info = LASTINPUTINFO()
-        last_input_info.cbSize = ctypes.sizeof(LASTINPUTINFO)
-        ctypes.windll.user32.GetLastInputInfo(ctypes.byref(last_input_info))
-
-        current_time = win32api.GetTickCount()
-        idle_time = (current_time - last_input_info.dwTime) / 1000.0
-        return idle_time
-    except Exception:
-        return 0
-
-
-def get_screen_saver_timeout() -> int:
-    """
-    Fallback:
-    1. SystemParametersInfo → valor efetivo (respeita GPO/AD).
-    2. Registro HKCU\Control Panel\Desktop\ScreenSaveTimeOut.
-    3. DEFAULT_SCREENSAVER_TIMEOUT (avisa em stderr; remova o print depois).
-    0 indica protetor de tela desativado.
-    """
-
-    try:
-        timeout = ctypes.c_int()
-        if ctypes.windll.user32.SystemParametersInfoW(
-            SPI_GETSCREENSAVETIMEOUT, 0, ctypes.byref(timeout), 0
-        ):
-            return timeout.value
-    except Exception:
-        pass
-    try:
-        key = win32api.RegOpenKeyEx(
-            win32con.HKEY_CURRENT_USER,
-            r"Control Panel\Desktop",
-            0,
-            win32con.KEY_READ,
-        )
-        try:
-            value, _ = win32api.RegQueryValueEx(key, "ScreenSaveTimeOut")
-        finally:
-            win32api.RegCloseKey(key)
-
-        if isinstance(value, (bytes, bytearray)):
-            value = value.decode("ascii", errors="ignore")
-
-        return int(value.split("\0", 1)[0].strip())
-    except Exception as err:
-        # debug – apague depois de validar
-        print(
-            f"[fallback] ScreenSaveTimeOut não lido, usando "
-            f"{DEFAULT_SCREENSAVER_TIMEOUT}s: {err!r}",
-            file=sys.stderr,
-        )
-    return DEFAULT_SCREENSAVER_TIMEOUT
-
-
-def get_rdp_disconnect_time():
-    """Obtém tempo de desconexão/timeout RDP do sistema de forma robusta
-    1. HKLM Policies (GPO aplicado via domínio)
-    2. HKCU Policies (políticas do usuário)
-    3. Configurações locais do Terminal Services
-
-    - MaxIdleTime: Timeout por inatividade
-    - MaxDisconnectionTime: Timeout de desconexão de sessão
-    - MaxConnectionTime: Tempo máximo de conexão contínua
-    - MaxSessionTime: Tempo máximo de sessão ativa
-    """
-    try:
-        # Chaves do registro para timeout RDP - em ordem de prioridade
-        base_key = "SYSTEM\\CurrentControlSet\\Control\\Terminal Server"
-        policy_key_machine = r"SOFTWARE\Policies\Microsoft\Windows NT\Terminal Services"
-        policy_key_user = r"SOFTWARE\Policies\Microsoft\Windows NT\Terminal Services"
-
-        # Lista de chaves para verificar (prioridade: Policies primeiro)
-        keys_to_check = [
-            # Políticas de Grupo - prioridade máxima
-            (win32con.HKEY_LOCAL_MACHINE, policy_key_machine),
-            (win32con.HKEY_CURRENT_USER, policy_key_user),
-            # Configurações locais do Terminal Services
-            (win32con.HKEY_LOCAL_MACHINE, f"{base_key}\\WinStations\\RDP-Tcp"),
-            (win32con.HKEY_LOCAL_MACHINE, base_key),
-        ]
-
-        # Tipos de timeout para verificar (em ordem de prioridade)
-        timeout_values = [
-            "MaxIdleTime",  # Timeout por inatividade
-            "MaxDisconnectionTime",  # Timeout de desconexão
-            "MaxConnectionTime",  # Tempo máximo de conexão
-            "MaxSessionTime",  # Tempo máximo de sessão
-        ]
-
-        for hive, key_path in keys_to_check:
-            try:
-                key = win32api.RegOpenKeyEx(
-                    hive,
-                    key_path,
-                    0,
-                    win32con.KEY_READ,
-                )
-
-                # Verificar cada tipo de timeout nesta chave
-                # Coleta TODOS os valores desta chave para encontrar o menor
-                found_timeouts = []
-                for timeout_type in timeout_values:
-                    try:
-                        value, _ = win32api.RegQueryValueEx(key, timeout_type)
-                        if value > 0:
-                            found_timeouts.append(value)
-                    except Exception:
-                        # Este tipo de timeout não existe nesta chave, continua
-                        continue
-
-                # Se encontrou timeouts, retorna o MENOR (o que desconecta primeiro)
-                if found_timeouts:
-                    win32api.RegCloseKey(key)
-                    return int(min(found_timeouts) / 1000)  # Converte ms para segundos
-
-                win32api.RegCloseKey(key)
-
-            except Exception:
-                continue
-
-        return 0  # Nenhum timeout encontrado
-
-    except Exception:
-        return 0
-
-
-def adjust_user_timeout():
-    """
-    Ajusta timeout de inatividade baseado em proteção de tela e RDP
-    """
-    try:
-        # Obtém tempos do sistema
-        screen_saver_time = get_screen_saver_timeout()
-        rdp_time = get_rdp_disconnect_time()
-
-        print(
-            f"[DEBUG timeout] Screen Saver: {screen_saver_time}s ({screen_saver_time//60} min)"
-        )
-        print(
-            f"[DEBUG timeout] RDP Timeout: {rdp_time}s ({rdp_time//60} min)"
-            if rdp_time > 0
-            else "[DEBUG timeout] RDP Timeout: não definido"
-        )
-
-        # Lista para timeouts calculados
-        calculated_timeouts = []
-
-        # Processa Screen Saver timeout
-        if screen_saver_time > 0:
-            screen_timeout = max(int(screen_saver_time / 5.0), USER_TIMEOUT_MIN)
-            # Limita screen timeout a no máximo 120s (2 minutos)
-            screen_timeout = min(screen_timeout, 120)
-            calculated_timeouts.append(screen_timeout)
-            # print(f"[DEBUG timeout] Screen timeout: {screen_timeout}s (1/5 de {screen_saver_time}s)")
-
-        # Processa RDP timeout
-        if rdp_time > 0:
-            rdp_timeout = max(int(rdp_time / 4.0), USER_TIMEOUT_MIN)
-            # Limita RDP timeout a no máximo 90s (1.5 minutos)
-            rdp_timeout = min(rdp_timeout, 90)
-            calculated_timeouts.append(rdp_timeout)
-            # print(f"[DEBUG timeout] RDP timeout: {rdp_timeout}s (1/4 de {rdp_time}s)")
-
-        # Determina timeout final
-        if calculated_timeouts:
-            # Usa o MENOR dos timeouts
-            final_timeout = min(calculated_timeouts)
-            # print(f"[DEBUG timeout] Escolhido: {final_timeout}s (menor entre {calculated_timeouts})")
-        else:
-            # Nenhum timeout encontrado, usa padrão
-            final_timeout = DEFAULT_USER_TIMEOUT
-            # print(f"[DEBUG timeout] Nenhum timeout do sistema, usando padrão: {final_timeout}s")
-
-        # Aplica limites finais mais restritivos
-        # Mínimo: 30s, Máximo: 120s
-        TIMEOUT_MAX_AJUSTADO = 120  # 2 minutos no máximo
-        limited_timeout = max(
-            min(final_timeout, TIMEOUT_MAX_AJUSTADO), USER_TIMEOUT_MIN
-        )
-
-        if limited_timeout != final_timeout:
-            print(
-                f"[DEBUG timeout] Limitado: {final_timeout}s → {limited_timeout}s (máx {TIMEOUT_MAX_AJUSTADO}s)"
-            )
-
-        print(
-            f"[DEBUG timeout] ✅ RESULTADO FINAL: {limited_timeout}s ({limited_timeout//60}min {limited_timeout%60}s)"
-        )
-        print("-" * 50)
-
-        return limited_timeout
-
-    except Exception as e:
-        print(f"[ERROR timeout] Erro no cálculo: {e}")
-        return DEFAULT_USER_TIMEOUT
-
-
 def format_time_intelligent(seconds):
     """Formata tempo: < 60s: "45s" | >= 60s: "10 min 15s" """
     if seconds < 60:
@@ -405,215 +220,17 @@ def format_time_intelligent(seconds):
         return f"{minutes} min {remaining_seconds}s"
 
 
-def get_network_info():
-    """Obtém gateway, IP e nome REAL da interface principal"""
-    try:
-        gateway_ip = "192.168.1.1"
-        my_ip = "127.0.0.1"
-        interface_name = "Local"
-
-        if sys.platform == "win32":
-            # Detecta gateway principal
-            result = subprocess.run(
-                ["route", "print", "0.0.0.0"], capture_output=True, text=True, timeout=5
-            )
-            if result.returncode == 0:
-                lines = result.stdout.split("\n")
-                for line in lines:
-                    if "0.0.0.0" in line and "On-link" not in line:
-                        parts = line.split()
-                        if len(parts) >= 4:
-                            potential_gateway = parts[2]
-                            potential_interface_ip = parts[3]
-                            if re.match(
-                                r"^(\d{1,3}\.){3}\d{1,3}$", potential_gateway
-                            ) and re.match(
-                                r"^(\d{1,3}\.){3}\d{1,3}$", potential_interface_ip
-                            ):
-                                gateway_ip = potential_gateway
-                                my_ip = potential_interface_ip
-                                break
-
-            # NOVA LÓGICA: Captura nome REAL da interface do ipconfig
-            try:
-                result = subprocess.run(
-                    ["ipconfig"], capture_output=True, text=True, timeout=3
-                )
-                if result.returncode == 0:
-                    lines = result.stdout.split("\n")
-                    current_adapter = ""
-
-                    for line in lines:
-                        # Detecta linha de adaptador
-                        if "Adaptador" in line and ":" in line:
-                            # Extrai nome real do adaptador
-                            adapter_match = re.search(r"Adaptador\s+\w+\s+(.+?):", line)
-                            if adapter_match:
-                                current_adapter = adapter_match.group(1).strip()
-
-                        # Verifica se é o IP atual
-                        elif my_ip in line and current_adapter:
-                            # Processa nome da interface para ficar compacto
-                            interface_name = current_adapter
-
-                            # Crop de interfaces longas (baseado nos seus exemplos)
-                            if len(interface_name) > 12:
-                                if "VirtualBox" in interface_name:
-                                    interface_name = "VirtualBox"
-                                elif "VMware Network Adapter VMnet" in interface_name:
-                                    vmnet_match = re.search(
-                                        r"VMnet(\d+)", interface_name
-                                    )
-                                    if vmnet_match:
-                                        interface_name = f"VMnet{vmnet_match.group(1)}"
-                                    else:
-                                        interface_name = "VMware"
-                                elif "vEthernet" in interface_name:
-                                    # vEthernet (WSL) -> vEth(WSL)
-                                    veth_match = re.search(
-                                        r"vEthernet\s*\((.+?)\)", interface_name
-                                    )
-                                    if veth_match:
-                                        inner = veth_match.group(1)
-                                        if len(inner) > 8:
-                                            inner = inner[:6] + ".."
-                                        interface_name = f"vEth({inner})"
-                                    else:
-                                        interface_name = "vEthernet"
-                                elif "Conexão de Rede Bluetooth" in interface_name:
-                                    interface_name = "Bluetooth"
-                                else:
-                                    # Crop genérico para outros casos
-                                    interface_name = interface_name[:10] + ".."
-                            break
-            except Exception:
-                # Fallback para lógica anterior simplificada
-                if "Ethernet" in current_adapter:
-                    interface_name = "Ethernet"
-                elif "Wi-Fi" in current_adapter or "Wireless" in current_adapter:
-                    interface_name = "Wi-Fi"
-                elif "VPN" in current_adapter:
-                    interface_name = "VPN"
-                else:
-                    interface_name = "Rede"
-
-        return gateway_ip, my_ip, interface_name
-    except Exception:
-        return "192.168.1.1", "127.0.0.1", "Local"
-
-
-def get_rdp_interface_ip():
-    """Detecta IP da interface usada para RDP"""
-    try:
-        result = subprocess.run(
-            ["netstat", "-an"], capture_output=True, text=True, timeout=5
-        )
-        if result.returncode == 0:
-            lines = result.stdout.split("\n")
-            for line in lines:
-                if ":3389" in line and "ESTABLISHED" in line:
-                    match = re.search(
-                        r"(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}):3389", line
-                    )
-                    if match:
-                        local_ip = match.group(1)
-                        if local_ip not in ["127.0.0.1", "0.0.0.0"]:
-                            return local_ip
-        _, my_ip, _ = get_network_info()
-        return my_ip
-    except Exception:
-        _, my_ip, _ = get_network_info()
-        return my_ip
-
-
-def ping_host(host, timeout=3):
-    """Ping host e retorna tempo em ms (-1 se falhou)"""
-    try:
-        if sys.platform == "win32":
-            cmd = ["ping", "-n", "1", "-w", str(timeout * 1000), host]
+def format_ping(ping_time):
+    """Latência em rich text colorido por faixa ("---" se sem resposta)"""
+    if ping_time > 0:
+        if ping_time < 30:
+            return f"<b style='color: green;'>{ping_time}ms</b>"
+        elif ping_time < 100:
+            return f"<b style='color: orange;'>{ping_time}ms</b>"
         else:
-            cmd = ["ping", "-c", "1", "-W", str(timeout), host]
-
-        result = subprocess.run(
-            cmd, capture_output=True, text=True, timeout=timeout + 1
-        )
-
-        if result.returncode == 0:
-            if sys.platform == "win32":
-                match = re.search(r"tempo[<=](\d+)ms|time[<=](\d+)ms", result.stdout)
-                if match:
-                    return int(match.group(1) or match.group(2))
-            else:
-                match = re.search(r"time=(\d+\.?\d*).*ms", result.stdout)
-                if match:
-                    return int(float(match.group(1)))
-        return -1
-    except Exception:
-        return -1
-
-
-def detectar_conexoes_rdp():
-    """Detecta conexões RDP ativas"""
-    try:
-        conexoes_ativas = []
-
-        if sys.platform == "win32":
-            try:
-                result = subprocess.run(
-                    ["qwinsta"], capture_output=True, text=True, timeout=5
-                )
-                if result.returncode == 0:
-                    lines = result.stdout.split("\n")
-                    for line in lines:
-                        if "rdp" in line.lower() and "ativo" in line.lower():
-                            conexoes_ativas.append("Local-RDP")
-            except Exception:
-                pass
-
-        try:
-            result = subprocess.run(
-                ["netstat", "-an"], capture_output=True, text=True, timeout=5
-            )
-            if result.returncode == 0:
-                lines = result.stdout.split("\n")
-                for line in lines:
-                    if ":3389" in line and "ESTABLISHED" in line:
-                        parts = line.split()
-                        if len(parts) >= 2:
-                            foreign_addr = parts[1]
-                            match = re.search(
-                                r"(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}):", foreign_addr
-                            )
-                            if match:
-                                remote_ip = match.group(1)
-                                if remote_ip not in ["127.0.0.1", "0.0.0.0"]:
-                                    last_octet = remote_ip.split(".")[-1]
-                                    conexoes_ativas.append(f"RDP-{last_octet}")
-        except Exception:
-            pass
-
-        conexoes_ativas = list(dict.fromkeys(conexoes_ativas))
-        tem_conexao = len(conexoes_ativas) > 0
-        conexao_principal = conexoes_ativas[0] if conexoes_ativas else "Nenhuma"
-
-        return tem_conexao, conexoes_ativas, conexao_principal
-    except Exception:
-        return False, [], "Erro"
-
-
-def ping_site_brasileiro():
-    """Ping para site brasileiro confiável"""
-    sites_brasileiros = [
-        ("itaipu.gov.br", "Itaipu"),
-        ("uol.com.br", "UOL"),
-    ]
-
-    for site_url, site_name in sites_brasileiros:
-        tempo = ping_host(site_url, timeout=2)
-        if tempo > 0:
-            return tempo, site_name
-
-    return -1, "Brasil"
+            return f"<b style='color: red;'>{ping_time}ms</b>"
+    else:
+        return "<b style='color: red;'>---</b>"
 
 
 def get_computer_info():
@@ -634,86 +251,90 @@ def get_computer_info():
         return "Local"
 
 
-def simulate_safe_activity():
-    """Simula atividade segura com verificação"""
-    try:
-        # Movimento seguro no centro da tela
-        screen_width, screen_height = pyautogui.size()
-        center_x = screen_width // 2
-        center_y = screen_height // 2
-        safe_zone = min(screen_width, screen_height) // 20
-
-        # Posição aleatória na área central
-        target_x = center_x + random.randint(-safe_zone, safe_zone)
-        target_y = center_y + random.randint(-safe_zone, safe_zone)
-
-        # Movimento suave
-        pyautogui.moveTo(target_x, target_y, duration=0.2)
-
-        # Pequeno movimento adicional
-        move_x = random.randint(-3, 3)
-        move_y = random.randint(-3, 3)
-        pyautogui.moveRel(move_x, move_y, duration=0.1)
-
-        # Eventos de teclado seguros
-        safe_keys = ["numlock", "scrolllock", "capslock"]
-        selected_key = random.choice(safe_keys)
-        pyautogui.press(selected_key)
-        time.sleep(0.1)
-        pyautogui.press(selected_key)
-
-        return True, "Atividade simulada"
-    except Exception as e:
-        return False, f"Erro na simulação: {str(e)}"
+class ConnectivitySignals(QObject):
+    """Sinais para entregar resultados das sondas à thread da GUI"""
+
+    snapshot_ready = pyqtSignal(object)
+
+
+class LogView(QPlainTextEdit):
+    """Painel de log limitado: cada linha é O(1), sem reescrever o documento"""
+
+    def __init__(self, max_lines, parent=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        # O documento é a única cópia: descarta sozinho as linhas mais antigas
+        self.setMaximumBlockCount(max_lines)
+
+    def append_line(self, text, bold=False):
+        """Adiciona linha de texto simples (opcionalmente em negrito)"""
+        weight = "bold" if bold else "normal"
+        self.appendHtml(
+            f'<span style="font-weight: {weight};">{html.escape(text)}</span>'
+        )
+        scrollbar = self.verticalScrollBar()
+        if scrollbar:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def clear_lines(self):
+        self.clear()
+
+    def export_text(self):
+        """Texto das linhas retidas"""
+        return self.toPlainText()
 
 
 class LogTab(QWidget):
     """Aba para exibir logs de atividade"""
 
+    # Intervalos de exportação: (rótulo, horas; None = sessão atual, 0 = tudo)
+    SAVE_RANGES = [
+        ("Sessão atual", None),
+        ("Últimas 24 horas", 24),
+        ("Últimos 7 dias", 24 * 7),
+        ("Tudo", 0),
+    ]
+
     def __init__(self, parent=None):
         super().__init__(parent)
         layout = QVBoxLayout(self)
+        self.session_start = datetime.now()
+        self.activity_log = get_activity_log()
 
-        self.log_text = QTextEdit()
-        self.log_text.setReadOnly(True)
+        self.log_text = LogView(FULL_LOG_MAX_LINES)
         layout.addWidget(self.log_text)
 
         button_layout = QHBoxLayout()
         clear_button = QPushButton("Limpar Log")
         clear_button.clicked.connect(self.clear_log)
+        self.save_range_combo = QComboBox()
+        for label, _ in self.SAVE_RANGES:
+            self.save_range_combo.addItem(label)
         save_button = QPushButton("Salvar Log")
         save_button.clicked.connect(self.save_log)
         button_layout.addWidget(clear_button)
+        button_layout.addWidget(self.save_range_combo)
         button_layout.addWidget(save_button)
         layout.addLayout(button_layout)
 
-    def add_log(self, message, is_orientation=False):
+    def add_log(self, message, is_orientation=False, category=None):
         """Adiciona mensagem ao log com timestamp"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         log_message = f"[{timestamp}] {message}"
 
-        if is_orientation:
-            # Apenas negrito sem fundo azul
-            formatted_text = f'<span style="font-weight: bold;">{log_message}</span>'
-            self.log_text.append(formatted_text)
-        else:
-            self.log_text.append(log_message)
-
-        # Limite de 1000 linhas
-        text_content = self.log_text.toPlainText()
-        lines = text_content.split("\n")
-        if len(lines) > 1000:
-            lines = lines[-1000:]
-            self.log_text.setPlainText("\n".join(lines))
-
-        # Rola para o final
-        scrollbar = self.log_text.verticalScrollBar()
-        if scrollbar:
-            scrollbar.setValue(scrollbar.maximum())
+        # Negrito para orientações; limite de linhas aplicado pelo LogView
+        self.log_text.append_line(log_message, bold=is_orientation)
+        category = category or LogCategory.GENERAL
+        self.activity_log.record(
+            EVENT_MESSAGE,
+            message,
+            category=category.key,
+            severity=category.severity.name,
+        )
 
     def clear_log(self):
         """Limpa o log visual"""
-        self.log_text.clear()
+        self.log_text.clear_lines()
 
     def save_log(self):
         """Salva o log em arquivo usando seletor nativo"""
@@ -737,9 +358,20 @@ class LogTab(QWidget):
             if not filename.lower().endswith(".txt"):
                 filename += ".txt"
 
-            # Salvar arquivo
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(self.log_text.toPlainText())
+            # Exporta o intervalo escolhido do log persistente
+            if self.activity_log.running:
+                _, hours = self.SAVE_RANGES[self.save_range_combo.currentIndex()]
+                if hours is None:
+                    start = self.session_start
+                elif hours:
+                    start = datetime.now() - timedelta(hours=hours)
+                else:
+                    start = None
+                self.activity_log.flush()  # espera o gravador alcançar a fila antes de ler
+                self.activity_log.export_range(filename, start=start)
+            else:
+                with open(filename, "w", encoding="utf-8") as f:
+                    f.write(self.log_text.export_text())
 
             self.add_log(f"Log salvo em: {filename}")
         except Exception as e:
@@ -769,6 +401,13 @@ class AdvancedTab(QWidget):
         self.random_intervals.setChecked(True)
         options_layout.addWidget(self.random_intervals)
 
+        self.require_input_cb = QCheckBox("Exigir entrada real (mouse/teclado) mesmo sem proteção de tela/RDP")
+        self.require_input_cb.setToolTip(
+            "Sem proteção de tela e sem limite de inatividade do RDP, o keep-alive só impede a suspensão"
+            " (SetThreadExecutionState). Marque se a sessão ainda assim bloqueia ou o Teams fica Ausente."
+        )
+        options_layout.addWidget(self.require_input_cb)
+
         self.minimize_to_tray_cb = QCheckBox("Minimizar para bandeja ao fechar")
         self.minimize_to_tray_cb.setChecked(True)
         options_layout.addWidget(self.minimize_to_tray_cb)
@@ -836,9 +475,53 @@ class AdvancedTab(QWidget):
         test_button.clicked.connect(self.test_simulation)
         test_layout.addWidget(test_button)
 
+        export_button = QPushButton("Exportar Latências das Sondas")
+        export_button.clicked.connect(self.export_probe_latency)
+        test_layout.addWidget(export_button)
+
+        history_button = QPushButton("Exportar Histórico de Conectividade (24h)")
+        history_button.clicked.connect(self.export_connectivity_history)
+        test_layout.addWidget(history_button)
+
         layout.addWidget(test_group)
+
+        # Estatísticas do cache DNS das sondas
+        dns_group = QGroupBox("Cache DNS")
+        dns_layout = QVBoxLayout(dns_group)
+        self.dns_stats_label = QLabel("Sem consultas")
+        self.dns_stats_label.setWordWrap(True)
+        dns_layout.addWidget(self.dns_stats_label)
+        layout.addWidget(dns_group)
         layout.addStretch()
 
+    def export_connectivity_history(self):
+        """Exporta as amostras de conectividade das últimas 24h em CSV"""
+        main_window = self.window()
+        if not hasattr(main_window, "timeseries"):
+            return
+        try:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename, _ = QFileDialog.getSaveFileName(
+                self,
+                "Exportar Histórico",
+                os.path.join(
+                    os.path.expanduser("~"),
+                    "Desktop",
+                    f"keep_alive_conectividade_{timestamp}.csv",
+                ),
+                "CSV (*.csv);;Todos os Arquivos (*)",
+            )
+            if not filename:
+                return
+            count = main_window.timeseries.export_csv(filename, start=time.time() - 86400)
+            main_window.log_tab.add_log(f"Histórico exportado ({count} amostras): {filename}")
+        except Exception as e:
+            main_window.log_tab.add_log(f"Erro ao exportar histórico: {str(e)}")
+
+    def update_dns_stats(self):
+        """Atualiza o resumo do cache DNS"""
+        self.dns_stats_label.setText(get_dns_cache().summary())
+
     def test_simulation(self):
         """Testa simulação"""
         try:
@@ -866,6 +549,33 @@ class AdvancedTab(QWidget):
             if hasattr(main_window, "log_tab") and main_window.log_tab:
                 main_window.log_tab.add_log(error_msg)
 
+    def export_probe_latency(self):
+        """Exporta histogramas de latência das sondas em JSON"""
+        main_window = self.window()
+        if not hasattr(main_window, "probe_engine"):
+            return
+        try:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename, _ = QFileDialog.getSaveFileName(
+                self,
+                "Exportar Latências",
+                os.path.join(
+                    os.path.expanduser("~"),
+                    "Desktop",
+                    f"keep_alive_latencias_{timestamp}.json",
+                ),
+                "JSON (*.json);;Todos os Arquivos (*)",
+            )
+            if not filename:
+                return
+            main_window.probe_engine.export_histograms(filename)
+            for line in main_window.probe_engine.report_lines():
+                main_window.log_tab.add_log(f"Latência sonda {line}")
+            main_window.log_tab.add_log(main_window.view.summary())
+            main_window.log_tab.add_log(f"Latências exportadas em: {filename}")
+        except Exception as e:
+            main_window.log_tab.add_log(f"Erro ao exportar latências: {str(e)}")
+
 
 class AboutTab(QWidget):
     """Aba 'Sobre' com informações do projeto"""
@@ -958,10 +668,20 @@ class KeepAliveApp(QMainWindow):
             "end_time", QTime(DEFAULT_END_TIME_HOUR, DEFAULT_END_TIME_MINUTE), QTime
         )
 
+        # Sondas: porta TCP, alvos externos, IPs fixados, portas RDP
+        configure_probes(self.settings.value)
+
+        # Log persistente (gravação em segundo plano)
+        get_activity_log().start()
+
         # Ajusta timeout automaticamente
-        self.screen_saver_time = get_screen_saver_timeout()
-        self.rdp_time = get_rdp_disconnect_time()
-        adjusted_timeout = adjust_user_timeout()
+        self.policy = get_policy_cache().get()
+        self.screen_saver_time = self.policy.screen_saver_timeout
+        self.rdp_time = self.policy.rdp_disconnect_time
+        adjusted_timeout = compute_user_timeout(
+            self.policy, USER_TIMEOUT_MIN, DEFAULT_USER_TIMEOUT
+        )
+        get_policy_cache().start_change_watch()
 
         if adjusted_timeout != self.default_user_timeout:
             self.default_user_timeout = adjusted_timeout
@@ -971,9 +691,25 @@ class KeepAliveApp(QMainWindow):
         self.use_schedule = True
         self.activity_count = 0
 
+        # Estratégia de keep-alive (piso pela política, escala por efeito)
+        self.strategy = StrategyEngine(
+            require_input=self.settings.value("require_input", False, bool)
+        )
+
         # Timers
+        self.scheduler = ActivityScheduler(self.default_interval)
         self.activity_timer = QTimer()
+        self.activity_timer.setSingleShot(True)
+        self.activity_timer.setTimerType(Qt.TimerType.PreciseTimer)
         self.activity_timer.timeout.connect(self.perform_activity)
+        self.idle_monitor = IdleMonitor(
+            self.default_user_timeout,
+            on_idle=self.on_user_idle,
+            on_active=self.on_user_active,
+        )
+        self.idle_timer = QTimer()
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.timeout.connect(self.sample_idle)
         self.inactive_log_timer = QTimer()
         self.inactive_log_timer.timeout.connect(self.log_inactive_status)
         self.inactive_log_timer.start(INACTIVE_LOG_INTERVAL)
@@ -1216,10 +952,17 @@ class KeepAliveApp(QMainWindow):
         ping_row.addWidget(self.sistema_widget)
         ping_row.addStretch()
 
+        # Linha 3: histórico recente das latências
+        self.latency_chart = LatencySparkline()
+        # Último estado aplicado aos widgets de conectividade
+        self.view = ViewModel()
+
         # Montagem das linhas
         connectivity_main_layout.addLayout(rdp_row)
         connectivity_main_layout.addSpacing(5)
         connectivity_main_layout.addLayout(ping_row)
+        connectivity_main_layout.addSpacing(5)
+        connectivity_main_layout.addWidget(self.latency_chart)
 
         connectivity_layout.addLayout(connectivity_main_layout)
         main_layout.addWidget(connectivity_frame)
@@ -1228,8 +971,7 @@ class KeepAliveApp(QMainWindow):
         # Log de Atividade (altura reduzida)
         user_group = QGroupBox("Verificação de Atividade do Usuário")
         user_group_layout = QVBoxLayout(user_group)
-        self.main_log_text = QTextEdit()
-        self.main_log_text.setReadOnly(True)
+        self.main_log_text = LogView(MAIN_LOG_MAX_LINES)
         self.main_log_text.setMaximumHeight(110)
         self.main_log_text.setSizePolicy(
             QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed
@@ -1264,6 +1006,7 @@ class KeepAliveApp(QMainWindow):
 
         # Abas restantes
         self.advanced_tab = AdvancedTab(self.tab_widget)
+        self.advanced_tab.require_input_cb.setChecked(self.strategy.require_input)
         self.tab_widget.addTab(self.advanced_tab, "Opções")
 
         self.log_tab = LogTab(self.tab_widget)
@@ -1305,24 +1048,8 @@ class KeepAliveApp(QMainWindow):
         timestamp = datetime.now().strftime("%H:%M:%S")  # Só hora:min:seg
         log_message = f"[{timestamp}] {message}"
 
-        if is_orientation:
-            # Apenas negrito sem fundo azul
-            formatted_text = f'<span style="font-weight: bold;">{log_message}</span>'
-            self.main_log_text.append(formatted_text)
-        else:
-            self.main_log_text.append(log_message)
-
-        # Limite de 15 linhas
-        text_content = self.main_log_text.toPlainText()
-        lines = text_content.split("\n")
-        if len(lines) > 15:
-            lines = lines[-15:]
-            self.main_log_text.setPlainText("\n".join(lines))
-
-        # Rola para o final
-        scrollbar = self.main_log_text.verticalScrollBar()
-        if scrollbar:
-            scrollbar.setValue(scrollbar.maximum())
+        # Negrito para orientações; limite de 15 linhas aplicado pelo LogView
+        self.main_log_text.append_line(log_message, bold=is_orientation)
 
     def update_execution_type_label(self):
         """Atualiza o label do tipo de execução"""
@@ -1385,6 +1112,7 @@ class KeepAliveApp(QMainWindow):
         self.advanced_tab.random_intervals.setChecked(
             self.settings.value("random_intervals", True, bool)
         )
+        self.advanced_tab.require_input_cb.setChecked(self.strategy.require_input)
         self.advanced_tab.interval_slider.setValue(
             self.settings.value("interval", DEFAULT_INTERVAL, int)
         )
@@ -1408,8 +1136,10 @@ class KeepAliveApp(QMainWindow):
         self.settings.setValue(
             "random_intervals", self.advanced_tab.random_intervals.isChecked()
         )
+        self.strategy.require_input = self.advanced_tab.require_input_cb.isChecked()
+        self.settings.setValue("require_input", self.strategy.require_input)
 
-        self.add_filtered_log(STR_SETTINGS_SAVED)
+        self.add_filtered_log(STR_SETTINGS_SAVED, category=LogCategory.SETTINGS)
         # self.log_tab.add_log(STR_SETTINGS_SAVED)
         # self.add_main_log(STR_SETTINGS_SAVED)
 
@@ -1431,9 +1161,9 @@ class KeepAliveApp(QMainWindow):
         """Loga status de inatividade"""
         if not self.is_running:
             status_msg = STR_SERVICE_STOPPED
-            help_msg = "<b>Inicie o programa clicando na opção desejada</b>"
-            self.log_tab.log_text.append(help_msg)
-            self.main_log_text.append(help_msg)
+            help_msg = "Inicie o programa clicando na opção desejada"
+            self.log_tab.log_text.append_line(help_msg, bold=True)
+            self.main_log_text.append_line(help_msg, bold=True)
 
             # self.add_filtered_log(status_msg)
             # self.log_tab.add_log(status_msg)
@@ -1459,7 +1189,7 @@ class KeepAliveApp(QMainWindow):
         self.log_tab.add_log(help_msg_full)
 
         # Log principal (SEM timestamp)
-        self.main_log_text.append(help_msg_short)
+        self.main_log_text.append_line(help_msg_short)
 
     def log_help_message_if_inactive(self):
         """Loga orientação quando inativo"""
@@ -1468,73 +1198,124 @@ class KeepAliveApp(QMainWindow):
 
     def setup_connectivity_timer(self):
         """Configura timer para conectividade"""
+        self.connectivity_signals = ConnectivitySignals()
+        self.connectivity_signals.snapshot_ready.connect(self.on_connectivity_snapshot)
+        self.probe_engine = ConnectivityProbeEngine(
+            self.connectivity_signals.snapshot_ready.emit
+        )
+
+        # Mudança de endereço IP invalida o cache de topologia
+        get_topology().start_address_watch()
+
+        # Histórico de latência em memória (tamanho fixo)
+        self.timeseries = TimeSeriesStore()
+        self.latency_chart.history = self.timeseries.recent_rows
+
+        # Intervalo adaptativo (rápido se visível e instável, recua se estável/oculto)
+        self.cadence = RefreshCadence()
+        self.cadence.set_running(self.is_running)
         self.connectivity_timer = QTimer()
+        self.connectivity_timer.setSingleShot(True)
         self.connectivity_timer.timeout.connect(self.update_connectivity_info)
-        self.connectivity_timer.start(15000)  # 15 segundos
-        self.connectivity_log_counter = 0
+        self.last_connectivity_log = 0.0
         self.last_gateway = ""
         self.last_my_ip = ""
         self.last_interface = ""
 
-        # Timer para horário atual (atualiza a cada segundo)
+        # Timer para horário atual (a cada segundo, só com a janela visível)
         self.current_time_timer = QTimer()
         self.current_time_timer.timeout.connect(self.update_current_time)
-        self.current_time_timer.start(1000)
         self.update_current_time()  # Atualização inicial
 
         QTimer.singleShot(2000, self.update_connectivity_info)
 
+    def schedule_connectivity_refresh(self):
+        """Rearma o timer de conectividade conforme a cadência (ou pausa)"""
+        interval = self.cadence.next_interval()
+        if interval is None:
+            self.connectivity_timer.stop()
+        else:
+            self.connectivity_timer.start(int(interval * 1000))
+
+    def on_visibility_changed(self):
+        """Janela mostrada/ocultada/minimizada: ajusta relógio e cadência"""
+        if not hasattr(self, "cadence"):
+            return
+        visible = self.isVisible() and not self.isMinimized()
+        if visible:
+            self.update_current_time()
+            if not self.current_time_timer.isActive():
+                self.current_time_timer.start(1000)
+        else:
+            self.current_time_timer.stop()
+        if self.cadence.set_visible(visible):
+            # Tela possivelmente desatualizada: atualiza já
+            self.update_connectivity_info()
+        else:
+            self.schedule_connectivity_refresh()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.on_visibility_changed()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.on_visibility_changed()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            self.on_visibility_changed()
+
     def update_connectivity_info(self):
-        """Atualiza informações de conectividade"""
+        """Dispara ciclo de conectividade no pool de sondas (não bloqueia a GUI)"""
+        self.probe_engine.submit_cycle()
+        # Rearma já; o resultado do ciclo reajusta o intervalo
+        self.schedule_connectivity_refresh()
+
+    def on_connectivity_snapshot(self, snapshot):
+        """Recebe o resultado das sondas na thread da GUI e atualiza a tela"""
         try:
-            gateway, my_ip, interface = get_network_info()
-            tem_rdp, lista_rdp, conexao_principal = detectar_conexoes_rdp()
-
-            ip_usado = get_rdp_interface_ip() if tem_rdp else my_ip
-            ping_gw = ping_host(gateway, timeout=2)
-            ping_brasil, site_brasil = ping_site_brasileiro()
-
-            ping_sistema = -1
-            sistema_nome = ""
-            if tem_rdp and conexao_principal not in ["Local-RDP", "Nenhuma", "Erro"]:
-                if conexao_principal.startswith("RDP-"):
-                    last_octet = conexao_principal.replace("RDP-", "")
-                    gateway_base = ".".join(gateway.split(".")[:-1])
-                    sistema_ip = f"{gateway_base}.{last_octet}"
-                    ping_sistema = ping_host(sistema_ip, timeout=2)
-                    sistema_nome = conexao_principal
-
-            self.update_connectivity_display(
-                gateway,
-                my_ip,
-                ip_usado,
-                interface,
-                tem_rdp,
-                lista_rdp,
-                conexao_principal,
-                ping_gw,
-                ping_brasil,
-                ping_sistema,
-                site_brasil,
-                sistema_nome,
+            self.probe_engine.timed(
+                "ui_display", self.update_connectivity_display, *snapshot
             )
+            self.advanced_tab.update_dns_stats()
+            self.log_tab.activity_log.record(
+                EVENT_CONNECTIVITY,
+                rdp=snapshot.tem_rdp,
+                rdp_sessions=snapshot.lista_rdp,
+                gateway=snapshot.gateway,
+                ip=snapshot.ip_usado,
+                gateway_ms=snapshot.ping_gw,
+                external_ms=snapshot.ping_brasil,
+                external_site=snapshot.site_brasil,
+                external_jitter_ms=round(snapshot.jitter_brasil, 1),
+                rdp_peer_ms=snapshot.ping_sistema,
+            )
+
+            self.timeseries.record_snapshot(snapshot)
+            self.cadence.observe(
+                snapshot_signature(snapshot), failed=snapshot.ping_gw <= 0
+            )
+            self.schedule_connectivity_refresh()
 
-            self.connectivity_log_counter += 1
-            if self.connectivity_log_counter >= 4:  # Log a cada 1 minuto
-                self.connectivity_log_counter = 0
+            now = time.monotonic()
+            if now - self.last_connectivity_log >= 60:  # Log a cada 1 minuto
+                self.last_connectivity_log = now
                 self.log_connectivity_info(
-                    tem_rdp,
-                    conexao_principal,
-                    ping_gw,
-                    ping_brasil,
-                    site_brasil,
-                    ping_sistema,
-                    sistema_nome,
+                    snapshot.tem_rdp,
+                    snapshot.conexao_principal,
+                    snapshot.ping_gw,
+                    snapshot.ping_brasil,
+                    snapshot.site_brasil,
+                    snapshot.ping_sistema,
+                    snapshot.sistema_nome,
+                    snapshot.jitter_brasil,
                 )
 
-            self.last_gateway = gateway
-            self.last_my_ip = ip_usado
-            self.last_interface = interface
+            self.last_gateway = snapshot.gateway
+            self.last_my_ip = snapshot.ip_usado
+            self.last_interface = snapshot.interface
 
         except Exception as e:
             print(f"[DEBUG] Erro conectividade: {e}")
@@ -1562,16 +1343,17 @@ class KeepAliveApp(QMainWindow):
         ping_sistema,
         site_brasil,
         sistema_nome,
+        jitter_brasil=0.0,
     ):
         """Atualiza display de conectividade"""
         try:
             if not hasattr(self, "_computer_name_set"):
                 computer_name = get_computer_info()
-                self.computer_name_label.setText(f"<b>{computer_name}</b>")
+                self.view.set_text(self.computer_name_label, f"<b>{computer_name}</b>")
                 self._computer_name_set = True
             # Meu IP
             # Atualiza LABEL "IP:" com nome da interface
-            self.ip_label.setText(f"IP ({interface}):")
+            self.view.set_text(self.ip_label, f"IP ({interface}):")
 
             # IP simples - SEM interface no valor (já está no label)
             if my_ip_usado != my_ip_original:
@@ -1580,7 +1362,7 @@ class KeepAliveApp(QMainWindow):
                 )
             else:
                 ip_display = f"<b>{my_ip_usado}</b>"
-            self.my_ip_label.setText(ip_display)
+            self.view.set_text(self.my_ip_label, ip_display)
 
             # Status RDP
             if tem_rdp:
@@ -1589,43 +1371,41 @@ class KeepAliveApp(QMainWindow):
                     rdp_text += f" <small>({len(lista_rdp)})</small>"
             else:
                 rdp_text = "<b style='color: gray;'>Inativo</b>"
-            self.rdp_status_label.setText(rdp_text)
+            self.view.set_text(self.rdp_status_label, rdp_text)
 
-            # Dropdown RDP
-            self.rdp_combo.clear()
+            # Dropdown RDP (só insere/remove o que mudou; mantém a seleção)
             if lista_rdp and len(lista_rdp) > 1:
-                for conexao in lista_rdp:
-                    display_name = conexao.replace("Local-RDP", "Local").replace(
-                        "RDP-", "Sistema ."
-                    )
-                    self.rdp_combo.addItem(display_name)
-                self.rdp_combo.setVisible(True)
+                self.view.set_items(
+                    self.rdp_combo,
+                    [
+                        conexao.replace("Local-RDP", "Local").replace(
+                            "RDP-", "Sistema ."
+                        )
+                        for conexao in lista_rdp
+                    ],
+                )
+                self.view.set_visible(self.rdp_combo, True)
             else:
-                self.rdp_combo.setVisible(False)
-
-            # Formatação de ping
-            def format_ping(ping_time):
-                if ping_time > 0:
-                    if ping_time < 30:
-                        return f"<b style='color: green;'>{ping_time}ms</b>"
-                    elif ping_time < 100:
-                        return f"<b style='color: orange;'>{ping_time}ms</b>"
-                    else:
-                        return f"<b style='color: red;'>{ping_time}ms</b>"
-                else:
-                    return "<b style='color: red;'>---</b>"
+                self.view.set_items(self.rdp_combo, [])
+                self.view.set_visible(self.rdp_combo, False)
 
             # Labels de ping
-            self.gateway_ping_label.setText(format_ping(ping_gw))
-            self.brasil_ping_label.setText(format_ping(ping_brasil))
+            self.view.set_text(self.gateway_ping_label, format_ping(ping_gw))
+            self.view.set_text(self.brasil_ping_label, format_ping(ping_brasil))
+            self.view.set_tooltip(
+                self.brasil_ping_label,
+                f"{site_brasil}: jitter {jitter_brasil:.1f}ms" if ping_brasil > 0 else "",
+            )
+
+            self.latency_chart.add_sample(
+                ping_gw, ping_brasil, ping_sistema if sistema_nome else -1
+            )
 
             if ping_sistema > 0 and sistema_nome:
-                sistema_display = sistema_nome.replace("RDP-", "")
-                # self.brasil_ping_label.setText(f"Itaipu: {format_ping(ping_brasil)}")
-                self.sistema_ping_label.setText(f"{format_ping(ping_sistema)}")
-                self.sistema_widget.setVisible(True)
+                self.view.set_text(self.sistema_ping_label, format_ping(ping_sistema))
+                self.view.set_visible(self.sistema_widget, True)
             else:
-                self.sistema_widget.setVisible(False)
+                self.view.set_visible(self.sistema_widget, False)
 
         except Exception as e:
             print(f"[DEBUG] Erro display: {e}")
@@ -1639,30 +1419,20 @@ class KeepAliveApp(QMainWindow):
         site_brasil,
         ping_sistema,
         sistema_nome,
+        jitter_brasil=0.0,
     ):
         """Loga conectividade de forma compacta"""
         try:
-            status_parts = []
-
-            if tem_rdp:
-                if conexao_principal == "Local-RDP":
-                    status_parts.append("RDP:Local")
-                else:
-                    sistema_short = conexao_principal.replace("RDP-", ".")
-                    status_parts.append(f"RDP:{sistema_short}")
-            else:
-                status_parts.append("RDP:Off")
-
-            if ping_gw > 0:
-                status_parts.append(f"GW:{ping_gw}ms")
-            if ping_brasil > 0:
-                status_parts.append(f"BR:{ping_brasil}ms")
-            if ping_sistema > 0:
-                sistema_short = sistema_nome.replace("RDP-", "S")
-                status_parts.append(f"{sistema_short}:{ping_sistema}ms")
-
-            log_msg = "Net: " + " | ".join(status_parts)
-            self.add_filtered_log(log_msg)
+            log_msg = format_connectivity_status(
+                tem_rdp,
+                conexao_principal,
+                ping_gw,
+                ping_brasil,
+                ping_sistema,
+                sistema_nome,
+                jitter_brasil,
+            )
+            self.add_filtered_log(log_msg, category=LogCategory.CONNECTIVITY)
             # self.log_tab.add_log(log_msg)
             # self.add_main_log(log_msg)
 
@@ -1705,7 +1475,7 @@ class KeepAliveApp(QMainWindow):
 
     def start_service_with_schedule(self):
         """Inicia serviço com verificação de agendamento"""
-        self.add_filtered_log("Iniciado agendamento")
+        self.add_filtered_log("Iniciado agendamento", category=LogCategory.SCHEDULE)
         # self.log_tab.add_log("Iniciado agendamento")
         # self.add_main_log("Iniciado agendamento")
 
@@ -1716,24 +1486,23 @@ class KeepAliveApp(QMainWindow):
             end_time = self.end_time_edit.time().toString("HH:mm")
             self.status_label.setText(STR_SERVICE_STOPPED)
             self.update_execution_type_label()
-            self.add_filtered_log("Serviço parado - Fora do horário de agendamento")
+            self.log_tab.activity_log.record(
+                EVENT_SCHEDULE, state="outside_schedule", start=start_time, end=end_time
+            )
+            self.add_filtered_log(
+                "Serviço parado - Fora do horário de agendamento",
+                category=LogCategory.SCHEDULE,
+            )
             # self.log_tab.add_log("Serviço parado - Fora do horário de agendamento")
             # self.add_main_log("Serviço parado - Fora do horário de agendamento")
 
     # ────────────────────────── start_service ──────────────────────────────
     def start_service(self):
         """Inicia o serviço"""
+        self.strategy.require_input = self.advanced_tab.require_input_cb.isChecked()
         base_interval = self.advanced_tab.interval_slider.value()  # em segundos
-
-        if self.advanced_tab.random_intervals.isChecked():
-            variation = base_interval * 0.30
-            rand_secs = random.uniform(
-                base_interval - variation, base_interval + variation
-            )
-        else:
-            rand_secs = float(base_interval)
-
-        next_interval_ms = int(rand_secs * 1000)
+        self.scheduler.start(base_interval, self.activity_jitter())
+        rand_secs = self.scheduler.seconds_until_next()
         next_time = datetime.now() + timedelta(seconds=rand_secs)
 
         # Log completo (detalhado)
@@ -1748,13 +1517,28 @@ class KeepAliveApp(QMainWindow):
             f"Próxima atividade ({rand_secs:.1f}s): {next_time.strftime('%H:%M:%S')}"
         )
 
-        self.activity_timer.start(next_interval_ms)
+        self.activity_timer.start(int(rand_secs * 1000))
         self.is_running = True
+        self.cadence.set_running(True)
+        if not self.connectivity_timer.isActive():
+            self.schedule_connectivity_refresh()  # retoma se estava pausado
+        self.idle_monitor.reset()
+        self.sample_idle()
         self.status_label.setText(STR_SERVICE_RUNNING)
         self.update_execution_type_label()
+        self.log_tab.activity_log.record(
+            EVENT_SCHEDULE,
+            state="started",
+            scheduled=self.use_schedule,
+            interval_s=base_interval,
+            next_s=round(rand_secs, 1),
+            strategy=self.strategy.current().key,
+            require_input=self.strategy.require_input,
+        )
 
         # Adiciona aos logs separadamente
         self.log_tab.add_log(log_msg_full)  # Log completo
+        self.log_tab.add_log(self.strategy.describe())
         self.add_main_log(log_msg_short)  # Log principal customizado
         # self.log_tab.add_log(log_msg)
         # self.add_main_log(log_msg)
@@ -1765,11 +1549,24 @@ class KeepAliveApp(QMainWindow):
             return
 
         self.activity_timer.stop()
+        self.idle_timer.stop()
+        self.scheduler.stop()
         self.is_running = False
+        self.cadence.set_running(False)
+        self.schedule_connectivity_refresh()
         self.status_label.setText(STR_SERVICE_STOPPED)
         self.update_execution_type_label()
-        ctypes.windll.kernel32.SetThreadExecutionState(ES_CONTINUOUS)
-        self.add_filtered_log(STR_SERVICE_STOPPED_LOG)
+        allow_system_lock()
+        self.log_tab.activity_log.record(
+            EVENT_SCHEDULE,
+            state="stopped",
+            scheduled=self.use_schedule,
+            lateness_mean_ms=round(self.scheduler.lateness.mean_ms),
+            lateness_max_ms=round(self.scheduler.lateness.max_ms),
+        )
+        self.log_tab.add_log(f"Atraso do agendador: {self.scheduler.lateness.summary()}")
+        self.log_tab.add_log(f"Keep-alive: {self.strategy.summary()}")
+        self.add_filtered_log(STR_SERVICE_STOPPED_LOG, category=LogCategory.SERVICE)
         # self.log_tab.add_log(STR_SERVICE_STOPPED_LOG)
         # self.add_main_log(STR_SERVICE_STOPPED_LOG)
 
@@ -1780,46 +1577,63 @@ class KeepAliveApp(QMainWindow):
         os.execl(python, python, *sys.argv)
 
     def perform_activity(self):
+        lateness_ms = self.scheduler.fired()
         try:
             # Verifica agendamento
             if self.use_schedule and not self.check_schedule():
                 self.stop_service()
                 return
 
-            # Verifica inatividade do usuário
-            idle_time = get_user_activity_timeout()
+            # Verifica inatividade do usuário (sem contar a entrada injetada pelo app)
+            idle_time = self.idle_monitor.user_idle_seconds()
             timeout_limit = self.advanced_tab.timeout_slider.value()
 
             if idle_time < timeout_limit:
                 self.activity_count += 1
+                self.log_tab.activity_log.record(
+                    EVENT_USER_ACTIVE,
+                    idle_s=round(idle_time, 1),
+                    timeout_s=timeout_limit,
+                    count=self.activity_count,
+                    lateness_ms=round(lateness_ms),
+                )
                 cancel_message = STR_USER_ACTIVE.format(idle_time, timeout_limit)
-                self.add_filtered_log(cancel_message)
+                self.add_filtered_log(cancel_message, category=LogCategory.USER_ACTIVE)
                 # self.log_tab.add_log(cancel_message)
                 # self.add_main_log(cancel_message)
 
-                if self.is_running:
-                    self.schedule_next_activity()
+                # Sem reagendar: o monitor de inatividade acorda a simulação
                 return
 
-            # Prevenir bloqueio
-            prevent_system_lock()
-
-            # Simular atividade
-            activity_success, activity_message = simulate_safe_activity()
+            # Estratégia mais barata que atende às políticas (escala se não
+            # zerar a inatividade)
+            activity_success, activity_message = self.strategy.run(idle_time)
+            if self.strategy.last_events:
+                self.idle_monitor.mark_injected(idle_time)
             self.activity_count += 1
             now = datetime.now().strftime("%H:%M:%S")
             status_msg = f"Atividade #{self.activity_count} em {now}"
+            self.log_tab.activity_log.record(
+                EVENT_ACTIVITY,
+                success=activity_success,
+                idle_s=round(idle_time, 1),
+                count=self.activity_count,
+                detail=activity_message,
+                strategy=self.strategy.last_strategy.key,
+                lateness_ms=round(lateness_ms),
+            )
 
             if activity_success:
                 self.status_label.setText(status_msg + " (Sucesso)")
-                self.add_filtered_log(STR_SIMULATION_SUCCESS)
+                self.add_filtered_log(
+                    STR_SIMULATION_SUCCESS, category=LogCategory.ACTIVITY
+                )
                 # self.log_tab.add_log(STR_SIMULATION_SUCCESS)
                 # self.add_main_log(STR_SIMULATION_SUCCESS)
             else:
                 self.status_label.setText(status_msg + f" ({activity_message})")
                 error_message = f"ERRO: {activity_message}"
-                self.log_tab.add_log(error_message)
-                self.add_main_log(error_message)
+                self.add_filtered_log(error_message, category=LogCategory.ERROR)
 
             # Agendar próxima
             if self.is_running:
@@ -1829,94 +1643,90 @@ class KeepAliveApp(QMainWindow):
             error_msg = f"Erro na atividade #{self.activity_count}: {str(e)}"
             self.status_label.setText(error_msg)
             critical_error = f"ERRO CRÍTICO: {error_msg}"
-            self.log_tab.add_log(critical_error)
-            self.add_main_log(critical_error)
+            self.add_filtered_log(critical_error, category=LogCategory.ERROR)
+
+    def sample_idle(self):
+        """Amostra a inatividade e rearma o timer no ritmo adaptativo"""
+        self.idle_monitor.threshold_s = self.advanced_tab.timeout_slider.value()
+        delay_s = self.idle_monitor.sample()
+        if self.is_running:
+            self.idle_timer.start(int(delay_s * 1000))
+
+    def on_user_active(self, idle_time):
+        """Usuário voltou: pausa a simulação até nova inatividade"""
+        if not self.is_running or not self.activity_timer.isActive():
+            return
+        self.activity_timer.stop()
+        timeout_limit = self.idle_monitor.threshold_s
+        self.log_tab.activity_log.record(
+            EVENT_USER_ACTIVE,
+            idle_s=round(idle_time, 1),
+            timeout_s=timeout_limit,
+            count=self.activity_count,
+        )
+        cancel_message = STR_USER_ACTIVE.format(idle_time, timeout_limit)
+        self.add_filtered_log(cancel_message, category=LogCategory.USER_ACTIVE)
+
+    def on_user_idle(self, idle_time):
+        """Inatividade cruzou o limite: retoma a grade de atividades"""
+        if self.is_running and not self.activity_timer.isActive():
+            self.log_tab.add_log(f"Usuário inativo há {idle_time:.1f}s")
+            self.schedule_next_activity()
+
+    def activity_jitter(self):
+        """Variação em torno da grade (0 = intervalos fixos)"""
+        return DEFAULT_JITTER if self.advanced_tab.random_intervals.isChecked() else 0.0
 
     def schedule_next_activity(self):
-        """Agenda próxima atividade"""
+        """Agenda próxima atividade no próximo ponto da grade monotônica"""
         self.activity_timer.stop()
         base_interval = self.advanced_tab.interval_slider.value()  # em segundos
+        jitter = self.activity_jitter()
 
-        if self.advanced_tab.random_intervals.isChecked():
-            variation = base_interval * 0.30
-            rand_secs = random.uniform(
-                base_interval - variation, base_interval + variation
-            )
-            interval_text = f"{base_interval}s ±30% → {rand_secs:.1f}s"
+        # Mudança de intervalo/variação reancora a grade
+        if (
+            not self.scheduler.running
+            or base_interval != self.scheduler.interval_s
+            or jitter != self.scheduler.jitter
+        ):
+            self.scheduler.start(base_interval, jitter)
         else:
-            rand_secs = float(base_interval)
-            interval_text = f"{base_interval}s fixo"
+            self.scheduler.advance()
 
-        next_interval_ms = int(rand_secs * 1000)
-        self.activity_timer.setInterval(next_interval_ms)
-        self.activity_timer.start()
+        rand_secs = self.scheduler.seconds_until_next()
+        self.activity_timer.start(int(rand_secs * 1000))
 
         next_time = datetime.now() + timedelta(seconds=rand_secs)
         next_message = STR_NEXT_ACTIVITY.format(
             next_time.strftime("%H:%M:%S"), f"{rand_secs:.1f}"
         )
 
-        self.add_filtered_log(next_message)
+        self.add_filtered_log(next_message, category=LogCategory.NEXT_ACTIVITY)
         # self.log_tab.add_log(next_message)
         # self.add_main_log(next_message)
 
-    def filter_log_message(self, message):
-        """
-        NOVA FUNÇÃO: Determina se mensagem é importante para log principal
-        """
-        # Mensagens IMPORTANTES (aparecem no log principal)
-        important_keywords = [
-            "Atividade Executada",
-            "Usuário Ativo",
-            "Próxima Atividade",
-            "Serviço Iniciado",
-            "Serviço Parado",
-            "Keep Alive RDP Connection iniciado",
-            "iniciado",
-            "agendamento",
-            "Erro",
-            "Falha",
-            "ERRO",
-        ]
-
-        # Mensagens FILTRADAS (só no log completo)
-        filtered_keywords = [
-            "Net: RDP:Off",
-            "Net: RDP:Local",
-            "GW:",
-            "BR:",
-            "|",  # Linhas de conectividade têm "|"
-            "Keep Alive RDP Connection iniciado",
-            "Usuário Ativo",
-        ]
-
-        # Se contém palavra-chave importante
-        for keyword in important_keywords:
-            if keyword in message:
-                return True
+    def filter_log_message(self, message, category=None):
+        """Determina se mensagem é importante para log principal"""
+        return route_for(message, category).main
 
-        # Se contém palavra-chave filtrada
-        for keyword in filtered_keywords:
-            if keyword in message:
-                return False
-
-        # Por padrão, considera importante
-        return True
-
-    def add_filtered_log(self, message, is_orientation=False):
+    def add_filtered_log(self, message, is_orientation=False, category=None):
         """
-        NOVA FUNÇÃO: Adiciona log com filtro inteligente
+        Adiciona log roteado pela categoria (texto livre é classificado)
         """
-        # SEMPRE adiciona ao log completo (aba Log)
-        self.log_tab.add_log(message, is_orientation)
+        category = category or classify_message(message)
+        route = ROUTES[category]
 
-        # Só adiciona ao log principal se for importante
-        if self.filter_log_message(message):
+        if route.full:
+            self.log_tab.add_log(message, is_orientation, category)
+        if route.main:
             self.add_main_log(message, is_orientation)
 
     def quit_application(self):
         try:
             self.save_settings()
+            for line in self.probe_engine.report_lines():
+                self.log_tab.add_log(f"Latência sonda {line}")
+            self.log_tab.add_log(self.view.summary())
             self.log_tab.add_log("Aplicativo encerrado")
             self.add_main_log("Aplicativo encerrado")
         except Exception:
@@ -1924,10 +1734,13 @@ class KeepAliveApp(QMainWindow):
 
         try:
             self.activity_timer.stop()
+            self.idle_timer.stop()
             self.inactive_log_timer.stop()
             self.help_timer.stop()
             self.connectivity_timer.stop()
             self.current_time_timer.stop()
+            self.probe_engine.shutdown()
+            self.log_tab.activity_log.stop()
             self.tray_icon.hide()
             cleanup_lock()
         except Exception:
@@ -1954,9 +1767,21 @@ def main():
     # window.add_main_log(f"{APP_NAME} iniciado")
     # window.add_filtered_log(f"{APP_NAME} iniciado")
     # window.log_inactive_status()
-    window.log_tab.add_log(f"{APP_NAME} iniciado")  # Só no log completo
+    window.log_tab.add_log(f"{APP_NAME} iniciado", category=LogCategory.STARTUP)
+    policy = window.policy
+    window.log_tab.add_log(
+        f"Políticas: proteção de tela {policy.screen_saver_timeout}s"
+        f" ({policy.screen_saver_source}), RDP {policy.rdp_disconnect_time}s"
+        f" ({policy.rdp_source or 'não definido'})"
+        f" → inatividade {window.default_user_timeout}s",
+        category=LogCategory.STARTUP,
+    )
     window.log_help_message()
 
+    if READY_EXIT in sys.argv:
+        # Medição (headless.py --compare): informa memória após a janela subir
+        QTimer.singleShot(0, lambda: (report_ready("gui"), window.quit_application()))
+
     sys.exit(app.exec())
 
 
@@ -84,7 +84,6 @@ import os
 import json
 import ctypes
 import threading
-import uuid
 import logging
 from datetime import datetime
 import time
@@ -92,11 +91,12 @@ from enum import Enum
 from typing import Dict, Any
 import asyncio
 
-import psutil
 import win32ts
-import websockets
 import aiohttp
 
+from process_watch import ProcessWatch
+from teams_ipc import ConnectionState, LoopCalls, PortDiscovery, TeamsConnection, TeamsIpcError
+
 from PyQt6.QtCore import (
     Qt,
     QTimer,
@@ -140,7 +140,9 @@ ES_DISPLAY_REQUIRED = 0x00000002
 TEAMS_WS_PORT_START = 8001
 TEAMS_WS_PORT_END = 8999
 TEAMS_WS_TIMEOUT = 5  # segundos
+TEAMS_CONNECT_TIMEOUT = 15  # segundos (descoberta da porta + primeira conexão)
 TEAMS_WS_RETRY_DELAY = 1000  # ms
+TEAMS_WS_DISCOVERY_CONCURRENCY = 64  # portas testadas ao mesmo tempo
 
 # Templates de mensagens para o Teams
 TEAMS_STATUS_MSG = {
@@ -176,15 +178,22 @@ class TeamsSignals(QObject):
 
     connection_status = pyqtSignal(bool, str)
     status_changed = pyqtSignal(bool, str)
+    port_discovered = pyqtSignal(int, str)  # porta (0 = não encontrada), origem
 
 
 class TeamsElectronManager:
     """Gerenciador de comunicação com o processo Electron do Teams"""
 
-    def __init__(self):
+    def __init__(self, discovery_concurrency=TEAMS_WS_DISCOVERY_CONCURRENCY):
         self.teams_process = None
+        # PID do Teams em cache: nova varredura só se o processo mudar
+        self.process_watch = ProcessWatch(
+            "ms-teams.exe", path_hint=os.path.join(os.getenv("LOCALAPPDATA", ""), "Microsoft", "Teams")
+        )
         self.ipc_connected = False
-        self.websocket = None
+        # Sessão persistente (heartbeat, reconexão, multiplexação por id)
+        self.connection = None
+        self.http_session = None
         self.connection_timer = QTimer()
         self.connection_timer.timeout.connect(self._try_connect)
         self.connection_attempts = 0
@@ -192,20 +201,28 @@ class TeamsElectronManager:
         self.ipc_port = None
         self.signals = TeamsSignals()
         self.ws_lock = threading.Lock()
+        self.discovery = PortDiscovery(
+            range(TEAMS_WS_PORT_START, TEAMS_WS_PORT_END),
+            handshake=self._test_ws_connection,
+            concurrency=discovery_concurrency,
+        )
 
         # Configurar loop assíncrono em thread separada
         self.loop = asyncio.new_event_loop()
         self.thread = threading.Thread(target=self._run_async_loop, daemon=True)
         self.thread.start()
+        # Chamadas ao loop sem .result() na thread do Qt: prazo, métrica e cancelamento
+        self.calls = LoopCalls(self.loop)
+        self.connecting = None
 
     def _run_async_loop(self):
         """Executa o loop assíncrono em thread separada"""
         asyncio.set_event_loop(self.loop)
         self.loop.run_forever()
 
-    async def _find_teams_ws_port(self):
-        """Procura a porta WebSocket do Teams"""
-        teams_path = os.path.join(os.getenv("LOCALAPPDATA"), "Microsoft", "Teams")
+    def _config_ws_port(self):
+        """Porta informada pelo Teams em desktop-config.json (ou None)"""
+        teams_path = os.path.join(os.getenv("LOCALAPPDATA", ""), "Microsoft", "Teams")
         config_file = os.path.join(teams_path, "desktop-config.json")
 
         try:
@@ -213,54 +230,90 @@ class TeamsElectronManager:
                 with open(config_file, "r") as f:
                     config = json.load(f)
                     if "webSocketPort" in config:
-                        port = config["webSocketPort"]
-                        logger.info(f"Porta WebSocket encontrada no config: {port}")
-                        if await self._test_ws_connection(port):
-                            return port
+                        logger.info(f"Porta WebSocket encontrada no config: {config['webSocketPort']}")
+                        return config["webSocketPort"]
         except Exception as e:
             logger.error(f"Erro ao ler arquivo de configuração: {str(e)}")
+        return None
 
-        logger.info("Procurando porta WebSocket ativa...")
-        for port in range(TEAMS_WS_PORT_START, TEAMS_WS_PORT_END):
-            if await self._test_ws_connection(port):
-                logger.info(f"Porta WebSocket encontrada: {port}")
-                return port
+    async def _find_teams_ws_port(self):
+        """Procura a porta WebSocket do Teams (última boa, config, faixa em paralelo)"""
+        config_port = self._config_ws_port()
+        port = await self.discovery.discover(preferred=[config_port] if config_port else [])
+        stats = self.discovery.stats()
+        if port:
+            logger.info(f"Porta WebSocket encontrada: {port} ({stats['source']}, {stats['last_ms']}ms)")
+        else:
+            logger.warning(f"Porta WebSocket não encontrada ({stats['tcp_checks']} portas testadas)")
+        return port
 
-        return None
+    def discover_port(self):
+        """Descoberta sem bloquear a thread do Qt; resultado em signals.port_discovered"""
+
+        def done(outcome, port):
+            if outcome != "ok":
+                logger.error(f"Erro na descoberta da porta: {port}")
+                port = None
+            if outcome != "cancelada":
+                self.signals.port_discovered.emit(port or 0, self.discovery.last_source or "")
+
+        return self.calls.submit("descoberta", self._find_teams_ws_port(), TEAMS_CONNECT_TIMEOUT, done)
+
+    async def _http(self) -> aiohttp.ClientSession:
+        """Sessão HTTP única, reaproveitada por todos os testes de porta"""
+        if self.http_session is None or self.http_session.closed:
+            self.http_session = aiohttp.ClientSession()
+        return self.http_session
 
     async def _test_ws_connection(self, port: int) -> bool:
         """Testa conexão WebSocket em uma porta específica"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.ws_connect(
-                    f"ws://127.0.0.1:{port}", timeout=0.5
-                ) as ws:
-                    await ws.ping()
-                    return True
+            session = await self._http()
+            async with session.ws_connect(f"ws://127.0.0.1:{port}", timeout=0.5) as ws:
+                await ws.ping()
+                return True
         except Exception:
             return False
 
-    async def _connect_websocket(self) -> None:
-        """Estabelece conexão WebSocket com o Teams"""
-        if not self.ipc_port:
-            raise TeamsError("Porta WebSocket não configurada")
+    async def _discover_url(self):
+        """URL do WebSocket (redescoberta a cada reconexão: a porta muda)"""
+        self.ipc_port = await self._find_teams_ws_port()
+        return f"ws://127.0.0.1:{self.ipc_port}" if self.ipc_port else None
 
-        try:
-            self.websocket = await websockets.connect(
-                f"ws://127.0.0.1:{self.ipc_port}",
-                ping_interval=None,
-                ping_timeout=TEAMS_WS_TIMEOUT,
-            )
-            logger.info("Conexão WebSocket estabelecida")
-        except Exception as e:
-            raise TeamsError(f"Erro ao conectar WebSocket: {str(e)}")
+    def _on_connection_state(self, state, detail):
+        """Estado da sessão (thread do loop) → sinais Qt"""
+        self.ipc_connected = state is ConnectionState.CONNECTED
+        if state is ConnectionState.CONNECTED:
+            logger.info(f"Conexão WebSocket estabelecida: {detail}")
+            self.signals.connection_status.emit(True, "Conectado")
+        elif state is ConnectionState.DISCONNECTED and detail:
+            logger.warning(f"Conexão WebSocket indisponível: {detail}")
+            self.signals.connection_status.emit(False, detail)
+
+    async def _connect_websocket(self) -> bool:
+        """Inicia a sessão persistente e aguarda a primeira conexão"""
+        if self.connection is None:
+            self.connection = TeamsConnection(self._discover_url, on_state=self._on_connection_state)
+        # Sem prazo aqui: TEAMS_CONNECT_TIMEOUT é aplicado por LoopCalls
+        return await self.connection.wait_connected()
 
     def start_connection(self):
         """Inicia tentativas de conexão com o Teams"""
+        # Descoberta já começa no loop; a primeira tentativa encontra a porta em cache
+        self.discover_port()
         self.connection_timer.start(TEAMS_WS_RETRY_DELAY)
 
     def _try_connect(self):
-        """Tenta estabelecer conexão com o Teams"""
+        """Tenta estabelecer conexão com o Teams (retorna sem esperar)"""
+        if self.ipc_connected:
+            self.connection_timer.stop()
+            return True
+        if self.connecting is not None and not self.connecting.done():
+            return None  # tentativa anterior ainda em andamento
+        if self.connection_attempts >= self.max_attempts:
+            self.connection_timer.stop()
+            return False
+
         try:
             self.connection_attempts += 1
             logger.info(
@@ -271,111 +324,105 @@ class TeamsElectronManager:
             if not self.teams_process:
                 logger.warning("Processo do Teams não encontrado")
                 self.signals.connection_status.emit(False, "Teams não encontrado")
-                if self.connection_attempts >= self.max_attempts:
-                    self.connection_timer.stop()
                 return False
 
             logger.info("Processo do Teams encontrado")
 
-            # Procurar porta WebSocket
-            future = asyncio.run_coroutine_threadsafe(
-                self._find_teams_ws_port(), self.loop
-            )
-            self.ipc_port = future.result()
-
-            if not self.ipc_port:
-                logger.warning("Porta WebSocket não encontrada")
-                self.signals.connection_status.emit(False, "Porta não encontrada")
-                if self.connection_attempts >= self.max_attempts:
-                    self.connection_timer.stop()
-                return False
-
-            # Estabelecer conexão WebSocket
-            future = asyncio.run_coroutine_threadsafe(
-                self._connect_websocket(), self.loop
+            # Descoberta da porta + conexão (a sessão reconecta sozinha depois);
+            # ipc_connected e connection_status vêm de _on_connection_state
+            self.connecting = self.calls.submit(
+                "conexão", self._connect_websocket(), TEAMS_CONNECT_TIMEOUT, self._on_connect_result
             )
-            future.result()
-
-            logger.info(f"Porta WebSocket encontrada: {self.ipc_port}")
-            self.ipc_connected = True
-            self.signals.connection_status.emit(True, "Conectado")
-            self.connection_timer.stop()
-            return True
+            return None
 
         except Exception as e:
             logger.error(f"Erro ao conectar com Teams: {str(e)}")
             self.signals.connection_status.emit(False, str(e))
-            if self.connection_attempts >= self.max_attempts:
-                self.connection_timer.stop()
             return False
 
+    def _on_connect_result(self, outcome, value):
+        """Fim de uma tentativa de conexão (thread do loop)"""
+        if outcome == "ok" and value:
+            logger.info(f"Porta WebSocket encontrada: {self.ipc_port}")
+            return
+        if outcome == "timeout":
+            value = f"Teams sem WebSocket em {TEAMS_CONNECT_TIMEOUT}s"
+        elif outcome == "ok":
+            value = "Porta não encontrada"
+        if outcome != "cancelada":
+            logger.warning(f"Falha na conexão com Teams: {value}")
+            self.signals.connection_status.emit(False, value)
+
     def _find_teams_process(self):
         """Localiza o processo principal do Teams"""
-        teams_path = os.path.join(os.getenv("LOCALAPPDATA"), "Microsoft", "Teams")
-
-        for proc in psutil.process_iter(["pid", "name", "cmdline", "exe"]):
-            try:
-                if "ms-teams.exe" in proc.info["name"].lower():
-                    proc_path = proc.info.get("exe", "")
-                    # Verificar se é o processo principal do Teams
-                    if teams_path.lower() in proc_path.lower():
-                        logger.info(f"Teams encontrado em: {proc_path}")
-                        return proc
-            except (psutil.NoSuchProcess, psutil.AccessDenied, KeyError):
-                continue
-        return None
+        scans = self.process_watch.scans
+        proc = self.process_watch.find()
+        if proc is not None and self.process_watch.scans != scans:
+            logger.info(f"Teams encontrado: PID {proc.pid} ({self.process_watch.summary()})")
+        return proc
 
     async def _send_ws_message(self, message: Dict[str, Any]) -> bool:
-        """Envia mensagem WebSocket para o Teams"""
-        if not self.websocket:
+        """Envia requisição e aguarda a resposta de mesmo id"""
+        if not self.connection:
             return False
 
         try:
-            message_str = json.dumps(message)
-            await self.websocket.send(message_str)
-            response = await self.websocket.recv()
+            # Sem prazo aqui: TEAMS_WS_TIMEOUT é aplicado por LoopCalls
+            response = await self.connection.request(message["method"], message["params"], timeout=None)
             return "error" not in response
-        except Exception as e:
+        except TeamsIpcError as e:
             logger.error(f"Erro ao enviar mensagem WebSocket: {str(e)}")
             return False
 
     def set_status(self, status: str) -> bool:
-        """Altera o status via WebSocket"""
-        if not self.ipc_connected or not self.websocket:
+        """Altera o status via WebSocket (retorna sem esperar; resultado em status_changed)"""
+        if not self.ipc_connected or not self.connection:
             self.signals.status_changed.emit(False, "Não conectado")
             return False
 
         try:
             # Preparar mensagem de status
             message = TEAMS_STATUS_MSG.copy()
-            message["id"] = str(uuid.uuid4())
-            message["params"]["status"] = status
+            message["params"] = dict(message["params"], status=status)
 
             # Enviar mensagem
-            future = asyncio.run_coroutine_threadsafe(
-                self._send_ws_message(message), self.loop
-            )
-            success = future.result()
-
-            if success:
-                self.signals.status_changed.emit(True, "Status alterado")
-                return True
-            else:
-                self.signals.status_changed.emit(False, "Erro ao alterar status")
-                return False
+            self.calls.submit("status", self._send_ws_message(message), TEAMS_WS_TIMEOUT, self._on_status_result)
+            return True
 
         except Exception as e:
             logger.error(f"Erro ao definir status: {str(e)}")
             self.signals.status_changed.emit(False, str(e))
             return False
 
+    def _on_status_result(self, outcome, value):
+        """Resposta da troca de status (thread do loop)"""
+        if outcome == "ok" and value:
+            self.signals.status_changed.emit(True, "Status alterado")
+        elif outcome == "ok":
+            self.signals.status_changed.emit(False, "Erro ao alterar status")
+        elif outcome != "cancelada":
+            logger.error(f"Erro ao definir status: {value}")
+            self.signals.status_changed.emit(False, value)
+
+    async def _close_sessions(self):
+        # A sessão HTTP da descoberta existe mesmo sem TeamsConnection (Teams não achado)
+        if self.connection is not None:
+            await self.connection.close()
+        if self.http_session is not None:
+            await self.http_session.close()
+
     def close(self):
         """Fecha a conexão com o Teams"""
         logger.info("Fechando conexões do Teams")
         self.connection_timer.stop()
-        if self.websocket:
-            future = asyncio.run_coroutine_threadsafe(self.websocket.close(), self.loop)
-            future.result()
+        cancelled = self.calls.cancel_all()
+        logger.info(f"Chamadas ao Teams: {self.calls.metrics.summary()} (canceladas no fechamento: {cancelled})")
+        if self.connection is not None or self.http_session is not None:
+            future = asyncio.run_coroutine_threadsafe(self._close_sessions(), self.loop)
+            try:
+                future.result(timeout=TEAMS_WS_TIMEOUT)
+            except Exception as e:
+                logger.error(f"Erro ao fechar sessão do Teams: {str(e)}")
         self.ipc_connected = False
         self.loop.call_soon_threadsafe(self.loop.stop)
         self.thread.join(timeout=1.0)
@@ -414,11 +461,13 @@ class KeepAliveApp(QMainWindow):
         self.activity_count = 0
         self.last_user_activity = time.time()
         self.current_teams_status = TeamsStatus.AVAILABLE
+        self.pending_teams_status = None
 
         # Inicializar gerenciador do Teams
         self.teams_manager = TeamsElectronManager()
         self.teams_manager.signals.connection_status.connect(self.on_connection_status)
         self.teams_manager.signals.status_changed.connect(self.on_status_changed)
+        self.teams_manager.signals.port_discovered.connect(self.on_port_discovered)
 
         # Configurar ícone da aplicação
         app_icon = self.style().standardIcon(QStyle.StandardPixmap.SP_ComputerIcon)
@@ -451,14 +500,27 @@ class KeepAliveApp(QMainWindow):
             logger.warning(f"Erro na conexão com Teams: {message}")
             self.status_label.setText(f"Erro na conexão com Teams\n{message}")
 
+    def on_port_discovered(self, port, source):
+        """Callback da descoberta da porta WebSocket"""
+        if port:
+            logger.info(f"Porta WebSocket do Teams: {port} ({source})")
+        else:
+            logger.warning("Porta WebSocket do Teams não encontrada")
+
     def on_status_changed(self, success, message):
         """Callback para mudanças no status do Teams"""
         if success:
             logger.info(f"Status atualizado: {message}")
             self.status_label.setText(f"Status atualizado\n{message}")
+            if self.pending_teams_status is not None:
+                self.current_teams_status = self.pending_teams_status
         else:
             logger.warning(f"Erro ao atualizar status: {message}")
             self.status_label.setText(f"Erro ao atualizar status\n{message}")
+        self.pending_teams_status = None
+        # Atualizar botões da UI (volta ao status anterior em caso de erro)
+        for s, btn in self.teams_buttons.items():
+            btn.setChecked(s == self.current_teams_status)
 
     def setup_ui(self) -> None:
         """Configura a interface do usuário"""
@@ -882,10 +944,8 @@ if __name__ == "__main__":
         try:
             logger.info(f"Alterando status para: {status.display_name}")
             if self.teams_manager.set_status(status.ipc_status):
-                self.current_teams_status = status
-                # Atualizar botões da UI
-                for s, btn in self.teams_buttons.items():
-                    btn.setChecked(s == status)
+                # Confirmação chega depois, em on_status_changed
+                self.pending_teams_status = status
                 return True
             return False
         except Exception as e:
@@ -0,0 +1,54 @@
+"""
+Simulação de atividade e bloqueio de suspensão
+
+Compartilhado pela GUI (keep-alive-app.py) e pelo modo sem janela
+(headless.py): nada aqui depende do Qt. A entrada simulada vai em um
+único lote pelo InputInjector (SendInput no Windows), sem pyautogui.
+"""
+
+import ctypes
+
+from input_injector import activity_sequence, get_input_injector
+
+# Configurações para prevenir bloqueios
+ES_CONTINUOUS = 0x80000000
+ES_SYSTEM_REQUIRED = 0x00000001
+ES_DISPLAY_REQUIRED = 0x00000002
+ES_AWAYMODE_REQUIRED = 0x00000040
+
+
+def prevent_system_lock():
+    """Previne bloqueio de tela e hibernação"""
+    try:
+        ctypes.windll.kernel32.SetThreadExecutionState(
+            ES_CONTINUOUS
+            | ES_SYSTEM_REQUIRED
+            | ES_DISPLAY_REQUIRED
+            | ES_AWAYMODE_REQUIRED
+        )
+        return True
+    except Exception:
+        return False
+
+
+def allow_system_lock():
+    """Devolve ao sistema o controle de bloqueio/hibernação"""
+    try:
+        ctypes.windll.kernel32.SetThreadExecutionState(ES_CONTINUOUS)
+        return True
+    except Exception:
+        return False
+
+
+def simulate_safe_activity(injector=None):
+    """Simula atividade segura com verificação (um lote, sem esperas)"""
+    try:
+        injector = injector or get_input_injector()
+        screen_width, screen_height = injector.screen_size()
+        events = activity_sequence(screen_width, screen_height)
+        sent = injector.send(events)
+        if sent != len(events):
+            return False, f"Erro na simulação: {sent}/{len(events)} eventos aceitos"
+        return True, "Atividade simulada"
+    except Exception as e:
+        return False, f"Erro na simulação: {str(e)}"
@@ -0,0 +1,276 @@
+"""
+Estratégias de keep-alive escolhidas pela política
+
+Da mais barata para a mais cara:
+    execution_state  SetThreadExecutionState apenas (nenhum evento)
+    zero_mouse       1 movimento de mouse de 0 pixel (zera a inatividade)
+    f15              tecla F15 (inexistente na maioria dos teclados)
+    full             simulate_safe_activity (movimento + tecla de trava)
+
+O piso vem da política: SetThreadExecutionState não impede a proteção de
+tela nem zera a inatividade da sessão (bloqueio, Ausente no Teams), então
+só basta sem proteção de tela e sem limite de inatividade do RDP; nos
+demais casos é preciso zerar o tempo de inatividade. Uma estratégia que injeta entrada é conferida logo após o
+envio (GetLastInputInfo); se não zerar a inatividade em falhas seguidas, o
+motor escala. Depois de um tempo no nível escalado, tenta de novo o mais
+barato.
+
+    python keepalive_strategy.py   # eventos/hora por cenário, antes e depois
+"""
+
+import time
+from enum import Enum
+
+from idle_monitor import NullIdleProbe, TraceIdleProbe, default_idle_probe
+from input_injector import VK_F15, RecordingInjector, get_input_injector, key_press, mouse_move
+from keepalive_activity import prevent_system_lock, simulate_safe_activity
+from system_policy import get_policy_cache
+
+STRATEGY_VERIFY_TOLERANCE_S = 1.0  # inatividade após o envio considerada "zerada"
+STRATEGY_ESCALATE_AFTER = 2  # falhas seguidas antes de escalar
+STRATEGY_RETRY_CHEAPER_S = 3600  # tempo no nível escalado antes de testar o anterior
+FULL_ACTIVITY_EVENTS = 6  # eventos de simulate_safe_activity
+
+
+class Strategy(Enum):
+    """Estratégias em ordem de custo (valor = nível)"""
+
+    EXECUTION_STATE = 0
+    ZERO_MOUSE = 1
+    F15_KEY = 2
+    FULL = 3
+
+    @property
+    def key(self):
+        return ("execution_state", "zero_mouse", "f15", "full")[self.value]
+
+    @property
+    def label(self):
+        return ("estado de execução", "mouse 0px", "tecla F15", "simulação completa")[self.value]
+
+
+def strategy_floor(policy, require_input=False):
+    """Estratégia mais barata que atende à política"""
+    if require_input or policy is None or policy.rdp_disconnect_time > 0 or policy.screen_saver_timeout > 0:
+        # Proteção de tela e desconexão do RDP contam inatividade: só entrada real zera
+        return Strategy.ZERO_MOUSE
+    # Sem proteção de tela nem limite do RDP: basta impedir a suspensão
+    return Strategy.EXECUTION_STATE
+
+
+def strategy_floor_reason(policy, require_input=False):
+    """Motivo do piso escolhido por strategy_floor (para o log)"""
+    if require_input:
+        return "entrada real exigida nas configurações"
+    if policy is None:
+        return "política desconhecida, entrada real por segurança"
+    if policy.rdp_disconnect_time > 0:
+        return f"RDP desconecta após {policy.rdp_disconnect_time}s de inatividade ({policy.rdp_source})"
+    if policy.screen_saver_timeout > 0:
+        return f"proteção de tela após {policy.screen_saver_timeout}s de inatividade ({policy.screen_saver_source})"
+    return "sem proteção de tela nem limite de inatividade do RDP, basta impedir a suspensão"
+
+
+class StrategyEngine:
+    """Executa a estratégia corrente, confere o efeito e escala se preciso"""
+
+    def __init__(
+        self,
+        policy_source=None,
+        injector=None,
+        probe=None,
+        require_input=False,
+        escalate_after=STRATEGY_ESCALATE_AFTER,
+        retry_cheaper_s=STRATEGY_RETRY_CHEAPER_S,
+        clock=time.monotonic,
+        lock=prevent_system_lock,
+    ):
+        self.policy_source = policy_source or get_policy_cache().get
+        self.injector = injector
+        self.probe = probe
+        self.require_input = require_input
+        self.escalate_after = escalate_after
+        self.retry_cheaper_s = retry_cheaper_s
+        self.clock = clock
+        self.lock = lock
+        self.level = None  # nível corrente (None até a primeira execução)
+        self.escalated_at = None
+        self.failures = 0
+        self.probation = False  # testando de novo um nível mais barato
+        self.last_strategy = None
+        self.last_events = 0  # eventos injetados na última execução
+        self.started_at = clock()
+        self.runs = {strategy: 0 for strategy in Strategy}
+        self.events = 0
+        self.escalations = 0
+        self.unverified = 0
+        self.cpu_ms = 0.0
+
+    def _injector(self):
+        if self.injector is None:
+            self.injector = get_input_injector()
+        return self.injector
+
+    def _probe(self):
+        if self.probe is None:
+            self.probe = default_idle_probe()
+        return self.probe
+
+    def current(self):
+        """Estratégia a usar agora (respeita o piso da política vigente)"""
+        floor = strategy_floor(self.policy_source(), self.require_input)
+        if self.level is None or self.level.value < floor.value:
+            self.level = floor
+            self.failures = 0
+        elif (
+            self.level.value > floor.value
+            and self.escalated_at is not None
+            and self.clock() - self.escalated_at >= self.retry_cheaper_s
+        ):
+            # Condições mudam (sessão RDP, driver): testa o nível anterior
+            self.level = Strategy(self.level.value - 1)
+            self.escalated_at = self.clock() if self.level.value > floor.value else None
+            self.probation = True
+            self.failures = 0
+        return self.level
+
+    def describe(self):
+        """Estratégia corrente e motivo do piso (log ao iniciar o monitoramento)"""
+        policy = self.policy_source()
+        strategy = self.current()
+        floor = strategy_floor(policy, self.require_input)
+        return f"Keep-alive: {strategy.label} (piso {floor.label}: {strategy_floor_reason(policy, self.require_input)})"
+
+    def _execute(self, strategy):
+        """(sucesso, eventos injetados, mensagem)"""
+        locked = self.lock()
+        if strategy is Strategy.EXECUTION_STATE:
+            return locked, 0, "Bloqueio de tela impedido" if locked else "SetThreadExecutionState falhou"
+        if strategy is Strategy.ZERO_MOUSE:
+            sent = self._injector().send([mouse_move(0, 0)])
+            return sent == 1, sent, "Movimento de mouse (0 px)"
+        if strategy is Strategy.F15_KEY:
+            sent = self._injector().send(key_press(VK_F15))
+            return sent == 2, sent, "Tecla F15"
+        success, message = simulate_safe_activity(self._injector())
+        return success, FULL_ACTIVITY_EVENTS if success else 0, message
+
+    def _idle_reset(self, strategy, idle_before):
+        """True/False se deu para conferir que a inatividade zerou; None se não"""
+        if strategy is Strategy.EXECUTION_STATE or isinstance(self._probe(), NullIdleProbe):
+            return None
+        if idle_before is None or idle_before <= STRATEGY_VERIFY_TOLERANCE_S:
+            return None
+        return self._probe().idle_seconds() <= STRATEGY_VERIFY_TOLERANCE_S
+
+    def _escalate(self):
+        if self.level is Strategy.FULL:
+            return
+        self.level = Strategy(self.level.value + 1)
+        self.escalated_at = self.clock()
+        self.escalations += 1
+        self.failures = 0
+        self.probation = False
+
+    def run(self, idle_before=None):
+        """Executa uma atividade; retorna (sucesso, mensagem)"""
+        start = time.perf_counter()
+        strategy = self.current()
+        self.last_strategy = strategy
+        success, events, message = self._execute(strategy)
+        self.runs[strategy] += 1
+        self.events += events
+        self.last_events = events
+
+        reset = self._idle_reset(strategy, idle_before) if success else False
+        if reset is None:
+            self.unverified += 1
+        if success and reset is not False:
+            self.failures = 0
+            self.probation = False
+        else:
+            self.failures += 1
+            if self.probation or self.failures >= self.escalate_after:
+                previous = strategy
+                self._escalate()
+                message += f" (sem efeito; {previous.label} → {self.level.label})"
+        self.cpu_ms += (time.perf_counter() - start) * 1000
+        # Falha de verificação não é falha da atividade: o próximo ciclo já escala
+        return success, message
+
+    def events_per_hour(self):
+        hours = max(1e-9, (self.clock() - self.started_at) / 3600)
+        return self.events / hours
+
+    def stats(self):
+        total = sum(self.runs.values())
+        return {
+            "strategy": self.level.key if self.level else None,
+            "runs": {strategy.key: count for strategy, count in self.runs.items()},
+            "events": self.events,
+            "events_per_hour": round(self.events_per_hour(), 1),
+            "escalations": self.escalations,
+            "unverified": self.unverified,
+            "cpu_us_per_run": round(self.cpu_ms * 1000 / total, 1) if total else 0.0,
+        }
+
+    def summary(self):
+        stats = self.stats()
+        runs = " ".join(f"{key}={count}" for key, count in stats["runs"].items() if count)
+        level = self.level.label if self.level else "---"
+        return (
+            f"estratégia {level}: {runs or 'sem execuções'} eventos={stats['events']}"
+            f" ({stats['events_per_hour']}/h) escalonamentos={stats['escalations']}"
+        )
+
+
+class _ScenarioProbe(TraceIdleProbe):
+    """Inatividade simulada: só entradas das estratégias em `effective` zeram"""
+
+    def __init__(self, clock, injector, effective):
+        super().__init__([], clock)
+        self.injector = injector
+        self.effective = effective
+        self._seen = 0
+
+    def idle_seconds(self):
+        for batch in self.injector.batches[self._seen :]:
+            if self.effective(batch):
+                self.input_times.append(self.clock())
+        self._seen = len(self.injector.batches)
+        return super().idle_seconds()
+
+
+def simulate_hour(policy, effective, interval_s=60, hours=1.0):
+    """Eventos injetados em `hours` horas para uma política e um ambiente"""
+    from activity_scheduler import FakeClock
+
+    clock = FakeClock(0.0)
+    injector = RecordingInjector()
+    probe = _ScenarioProbe(clock, injector, effective)
+    engine = StrategyEngine(lambda: policy, injector, probe, clock=clock, lock=lambda: True)
+    while clock() < hours * 3600:
+        clock.advance(interval_s)
+        engine.run(probe.idle_seconds())
+    return engine
+
+
+if __name__ == "__main__":
+    from system_policy import PolicySnapshot
+
+    def make_policy(rdp_s, screen_saver_s=900):
+        return PolicySnapshot(screen_saver_s, "default", rdp_s, "policy" if rdp_s else "", {}, 0.0)
+
+    def is_key(batch):
+        return any(e.kind == "key" for e in batch)
+
+    print(f"Antes: {FULL_ACTIVITY_EVENTS * 60} eventos/h (simulação completa a cada 60s)")
+    for label, policy, effective in (
+        ("sem proteção de tela nem RDP", make_policy(0, 0), lambda batch: True),
+        ("só proteção de tela", make_policy(0), lambda batch: True),
+        ("RDP 15 min, mouse 0px funciona", make_policy(900), lambda batch: True),
+        ("RDP 15 min, só teclado zera", make_policy(900), is_key),
+        ("RDP 15 min, nada zera", make_policy(900), lambda batch: False),
+    ):
+        engine = simulate_hour(policy, effective, hours=8)
+        print(f"  {label:<32} {engine.events_per_hour():6.1f} eventos/h  {engine.summary()}")
@@ -0,0 +1,196 @@
+"""
+Gráfico compacto (sparkline) das latências dos últimos minutos
+
+O desenho fica em um QPixmap: a cada amostra o conteúdo é deslocado para a
+esquerda (QPixmap.scroll) e só a faixa nova à direita é pintada; o
+paintEvent apenas copia o pixmap. Escala vertical logarítmica fixa
+(1 ms a 1 s) para que nenhuma amostra nova obrigue a redesenhar o resto.
+Redesenho completo só ao redimensionar ou voltar a ficar visível, a partir
+do histórico (TimeSeriesStore).
+
+    python latency_chart.py --bench [amostras]
+"""
+
+import math
+import sys
+import time
+
+from PyQt6.QtCore import QRect
+from PyQt6.QtGui import QColor, QPainter, QPen, QPixmap
+from PyQt6.QtWidgets import QSizePolicy, QWidget
+
+SPARKLINE_MINUTES = 10
+SPARKLINE_HEIGHT = 44
+SPARKLINE_MAX_MS = 1000
+# (nome, cor) na ordem das amostras: gateway, externo, sistema RDP
+SPARKLINE_SERIES = (("Gateway", "#2e7d32"), ("Itaipu", "#1565c0"), ("Sistema", "#ef6c00"))
+SPARKLINE_GRID_MS = (10, 100)
+
+
+class LatencySparkline(QWidget):
+    """Sparkline de latência com renderização incremental"""
+
+    def __init__(self, minutes=SPARKLINE_MINUTES, history=None, parent=None):
+        super().__init__(parent)
+        self.minutes = minutes
+        # history(segundos) -> [(ts, gateway, externo, sistema), ...] para redesenho
+        self.history = history
+        self.setMinimumHeight(SPARKLINE_HEIGHT)
+        self.setMaximumHeight(SPARKLINE_HEIGHT)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+        self.setToolTip(
+            f"Latência, últimos {minutes} min: "
+            + ", ".join(f"<span style='color:{color}'>{name}</span>" for name, color in SPARKLINE_SERIES)
+        )
+        self._background = QColor("#fafafa")
+        self._grid = QColor("#e0e0e0")
+        self._pens = [QPen(QColor(color), 1.5) for _, color in SPARKLINE_SERIES]
+        self._pixmap = None
+        self._dirty = True
+        self._last_y = [None] * len(SPARKLINE_SERIES)
+        self._last_ts = None
+        self._x_remainder = 0.0
+        self.updates = 0
+        self.rebuilds = 0
+        self.update_ms_total = 0.0
+        self.update_ms_max = 0.0
+
+    def _px_per_second(self):
+        return max(1, self.width()) / (self.minutes * 60.0)
+
+    def _y_for(self, ms):
+        """Posição vertical (escala log); None se sem resposta"""
+        if ms is None or ms <= 0 or (isinstance(ms, float) and math.isnan(ms)):
+            return None
+        fraction = math.log10(min(max(ms, 1), SPARKLINE_MAX_MS)) / math.log10(SPARKLINE_MAX_MS)
+        height = self._pixmap.height() - 3
+        return 1 + height - fraction * height
+
+    def _paint_strip(self, painter, x0, x1):
+        """Fundo e grade da faixa [x0, x1)"""
+        height = self._pixmap.height()
+        painter.fillRect(QRect(x0, 0, x1 - x0, height), self._background)
+        painter.setPen(self._grid)
+        for grid_ms in SPARKLINE_GRID_MS:
+            y = int(self._y_for(grid_ms))
+            painter.drawLine(x0, y, x1 - 1, y)
+
+    def _draw_values(self, painter, x_prev, x, values):
+        for index, value in enumerate(values):
+            y = self._y_for(value)
+            if y is not None:
+                painter.setPen(self._pens[index])
+                previous = self._last_y[index]
+                if previous is not None:
+                    painter.drawLine(int(x_prev), int(previous), int(x), int(y))
+                else:
+                    painter.drawPoint(int(x), int(y))
+            self._last_y[index] = y
+
+    def rebuild(self):
+        """Redesenho completo a partir do histórico"""
+        self.rebuilds += 1
+        self._pixmap = QPixmap(max(1, self.width()), max(1, self.height()))
+        self._last_y = [None] * len(SPARKLINE_SERIES)
+        self._last_ts = None
+        self._x_remainder = 0.0
+        painter = QPainter(self._pixmap)
+        try:
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            self._paint_strip(painter, 0, self._pixmap.width())
+            rows = self.history(self.minutes * 60) if self.history else []
+            if rows:
+                right = self._pixmap.width() - 1
+                now = rows[-1][0]
+                scale = self._px_per_second()
+                x_prev = None
+                for ts, *values in rows:
+                    x = right - (now - ts) * scale
+                    self._draw_values(painter, x if x_prev is None else x_prev, x, values)
+                    x_prev = x
+                self._last_ts = now
+        finally:
+            painter.end()
+        self._dirty = False
+
+    def add_sample(self, gateway_ms, external_ms, peer_ms, ts=None):
+        """Nova amostra: desloca o pixmap e pinta só a faixa nova"""
+        ts = time.time() if ts is None else ts
+        if self._dirty or self._pixmap is None or not self.isVisible():
+            # Oculto: nada a pintar; o histórico refaz o desenho ao reaparecer
+            self._dirty = True
+            return
+        start = time.perf_counter()
+        width = self._pixmap.width()
+        if self._last_ts is None:
+            dx = 0
+        else:
+            exact = (ts - self._last_ts) * self._px_per_second() + self._x_remainder
+            dx = min(width, int(exact))
+            self._x_remainder = exact - dx if dx < width else 0.0
+        if dx > 0:
+            self._pixmap.scroll(-dx, 0, self._pixmap.rect())
+        painter = QPainter(self._pixmap)
+        try:
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            if dx > 0:
+                self._paint_strip(painter, width - dx, width)
+            self._draw_values(painter, width - 1 - dx, width - 1, (gateway_ms, external_ms, peer_ms))
+        finally:
+            painter.end()
+        self._last_ts = ts
+        self.update()
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.updates += 1
+        self.update_ms_total += elapsed_ms
+        self.update_ms_max = max(self.update_ms_max, elapsed_ms)
+
+    def stats(self):
+        mean = self.update_ms_total / self.updates if self.updates else 0.0
+        return {
+            "updates": self.updates,
+            "rebuilds": self.rebuilds,
+            "mean_ms": round(mean, 3),
+            "max_ms": round(self.update_ms_max, 3),
+        }
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._dirty = True
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._dirty = True
+
+    def paintEvent(self, event):
+        if self._dirty or self._pixmap is None:
+            self.rebuild()
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._pixmap)
+        painter.end()
+
+
+def benchmark(samples=5000):
+    """Custo por atualização com plataforma offscreen"""
+    import random
+
+    from PyQt6.QtWidgets import QApplication
+
+    app = QApplication.instance() or QApplication(sys.argv[:1] + ["-platform", "offscreen"])
+    rng = random.Random(0)
+    widget = LatencySparkline()
+    widget.resize(420, SPARKLINE_HEIGHT)
+    widget.show()
+    app.processEvents()
+    ts = time.time()
+    for _ in range(samples):
+        ts += 5
+        widget.add_sample(rng.gauss(3, 1), rng.gauss(20, 5), rng.gauss(8, 2), ts)
+        app.processEvents()
+    print(f"{samples} amostras: {widget.stats()}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 5000)
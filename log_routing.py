@@ -0,0 +1,160 @@
+"""
+Classificação e roteamento das mensagens de log
+
+Cada mensagem recebe uma categoria (LogCategory) e uma severidade no
+momento em que é criada; o destino (log principal, log completo) é uma
+consulta O(1) em ROUTES. Mensagens de texto livre sem categoria
+caem em classify_message(), que usa uma única alternação pré-compilada com
+a mesma precedência da antiga filter_log_message (palavras importantes
+vencem as filtradas; sem correspondência = importante).
+
+    python -m pytest tests/test_log_routing.py   # confere decisões contra a regra antiga
+    python log_routing.py   # vazão do roteamento
+"""
+
+import re
+import time
+from enum import Enum
+from typing import NamedTuple
+
+
+class Severity(Enum):
+    """Severidade da mensagem"""
+
+    DEBUG = 10
+    INFO = 20
+    WARNING = 30
+    ERROR = 40
+
+
+class LogCategory(Enum):
+    """Categoria da mensagem e sua severidade padrão"""
+
+    ACTIVITY = ("activity", Severity.INFO)
+    USER_ACTIVE = ("user_active", Severity.INFO)
+    NEXT_ACTIVITY = ("next_activity", Severity.INFO)
+    SERVICE = ("service", Severity.INFO)
+    SCHEDULE = ("schedule", Severity.INFO)
+    SETTINGS = ("settings", Severity.INFO)
+    STARTUP = ("startup", Severity.INFO)
+    CONNECTIVITY = ("connectivity", Severity.DEBUG)
+    ERROR = ("error", Severity.ERROR)
+    GENERAL = ("general", Severity.INFO)
+
+    def __init__(self, key, severity):
+        self.key = key
+        self.severity = severity
+
+
+class Route(NamedTuple):
+    """Destinos de uma categoria"""
+
+    main: bool
+    full: bool
+
+
+ROUTES = {
+    LogCategory.ACTIVITY: Route(main=True, full=True),
+    LogCategory.USER_ACTIVE: Route(main=True, full=True),
+    LogCategory.NEXT_ACTIVITY: Route(main=True, full=True),
+    LogCategory.SERVICE: Route(main=True, full=True),
+    LogCategory.SCHEDULE: Route(main=True, full=True),
+    LogCategory.SETTINGS: Route(main=True, full=True),
+    LogCategory.STARTUP: Route(main=False, full=True),
+    LogCategory.CONNECTIVITY: Route(main=False, full=True),
+    LogCategory.ERROR: Route(main=True, full=True),
+    LogCategory.GENERAL: Route(main=True, full=True),
+}
+
+# Palavras-chave da regra antiga (texto livre)
+IMPORTANT_KEYWORDS = [
+    "Atividade Executada",
+    "Usuário Ativo",
+    "Próxima Atividade",
+    "Serviço Iniciado",
+    "Serviço Parado",
+    "Keep Alive RDP Connection iniciado",
+    "iniciado",
+    "agendamento",
+    "Erro",
+    "Falha",
+    "ERRO",
+]
+FILTERED_KEYWORDS = [
+    "Net: RDP:Off",
+    "Net: RDP:Local",
+    "GW:",
+    "BR:",
+    "|",  # Linhas de conectividade têm "|"
+    "Keep Alive RDP Connection iniciado",
+    "Usuário Ativo",
+]
+ERROR_KEYWORDS = ["Erro", "Falha", "ERRO"]
+
+
+# Precedência: erro > importante > filtrada (como na regra antiga)
+_KEYWORD_RANK = {}
+for _keyword in FILTERED_KEYWORDS:
+    _KEYWORD_RANK[_keyword] = 1
+for _keyword in IMPORTANT_KEYWORDS:
+    _KEYWORD_RANK[_keyword] = 2
+for _keyword in ERROR_KEYWORDS:
+    _KEYWORD_RANK[_keyword] = 3
+
+# Uma única alternação pré-compilada (mais longas primeiro)
+_KEYWORD_RE = re.compile(
+    "|".join(re.escape(k) for k in sorted(_KEYWORD_RANK, key=len, reverse=True))
+)
+_RANK_CATEGORY = {
+    0: LogCategory.GENERAL,
+    1: LogCategory.CONNECTIVITY,
+    2: LogCategory.GENERAL,
+    3: LogCategory.ERROR,
+}
+
+
+def classify_message(message):
+    """Categoria de uma mensagem de texto livre"""
+    best = 0
+    for match in _KEYWORD_RE.finditer(message):
+        rank = _KEYWORD_RANK[match.group()]
+        if rank > best:
+            best = rank
+            if rank == 3:
+                break
+    return _RANK_CATEGORY[best]
+
+
+def route_for(message, category=None):
+    """Destinos da mensagem (usa a categoria se informada)"""
+    return ROUTES[category or classify_message(message)]
+
+
+def benchmark(repetitions=20000):
+    """Vazão: regex (texto livre) x tabela por categoria"""
+    samples = [
+        ("Configurações Salvas", LogCategory.SETTINGS),
+        ("Net: RDP:.42 | GW:3ms | BR:20ms | S42:5ms", LogCategory.CONNECTIVITY),
+        ("Serviço parado - Fora do horário de agendamento", LogCategory.SCHEDULE),
+        ("Usuário Ativo (inatividade: 12.3s < 60s)", LogCategory.USER_ACTIVE),
+        ("Próxima Atividade: 20:19:18 (59.5s)", LogCategory.NEXT_ACTIVITY),
+        ("ERRO: Erro na simulação: falha", LogCategory.ERROR),
+        ("Mensagem qualquer", LogCategory.GENERAL),
+    ]
+    messages = [m for m, _ in samples]
+    categories = [c for _, c in samples]
+    total = repetitions * len(messages)
+
+    def measure(label, func):
+        start = time.perf_counter()
+        for _ in range(repetitions):
+            func()
+        elapsed = time.perf_counter() - start
+        print(f"{label:<26} {total / elapsed / 1e6:6.2f} M msg/s")
+
+    measure("regex (texto livre)", lambda: [route_for(m) for m in messages])
+    measure("tabela (categoria)", lambda: [ROUTES[c] for c in categories])
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,81 @@
+"""
+Limites dos painéis de log da interface
+
+Os painéis da GUI usam QPlainTextEdit com maximumBlockCount: o próprio
+documento descarta as linhas mais antigas (O(1) por linha) e é a única
+cópia das mensagens, sem reler/reescrever o documento a cada linha.
+
+Benchmark (100k mensagens, antes/depois):
+    python log_store.py --bench [mensagens]
+"""
+
+import sys
+import time
+import tracemalloc
+
+FULL_LOG_MAX_LINES = 1000
+MAIN_LOG_MAX_LINES = 15
+
+
+def _legacy_append(document, line, max_lines):
+    """Algoritmo antigo: reescreve o documento inteiro a cada mensagem"""
+    document = f"{document}\n{line}" if document else line
+    lines = document.split("\n")
+    if len(lines) > max_lines:
+        document = "\n".join(lines[-max_lines:])
+    return document
+
+
+def _measure(label, append, count):
+    tracemalloc.start()
+    start = time.perf_counter()
+    worst = 0.0
+    for index in range(count):
+        t0 = time.perf_counter()
+        append(f"[2025-06-18 05:54:55] Mensagem de teste #{index} | GW:1ms | BR:17ms")
+        worst = max(worst, time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<34} {elapsed / count * 1e6:9.2f} us/append  "
+        f"pior {worst * 1e3:7.2f} ms  pico {peak / 1024:9.1f} KiB"
+    )
+
+
+def benchmark(count=100000, max_lines=FULL_LOG_MAX_LINES):
+    """Compara o algoritmo antigo com o documento limitado"""
+    state = {"document": ""}
+
+    def legacy(line):
+        state["document"] = _legacy_append(state["document"], line, max_lines)
+
+    _measure("antigo (split/slice/join)", legacy, count)
+
+    try:
+        from PyQt6.QtWidgets import QApplication, QPlainTextEdit, QTextEdit
+    except ImportError:
+        print("PyQt6 indisponível: comparação de widgets omitida")
+        return
+
+    app = QApplication.instance() or QApplication(sys.argv[:1] + ["-platform", "offscreen"])
+    old_widget = QTextEdit()
+
+    def legacy_widget(line):
+        old_widget.append(line)
+        lines = old_widget.toPlainText().split("\n")
+        if len(lines) > max_lines:
+            old_widget.setPlainText("\n".join(lines[-max_lines:]))
+
+    widget_count = min(count, 20000)  # algoritmo antigo é O(n) por linha
+    _measure(f"QTextEdit antigo ({widget_count})", legacy_widget, widget_count)
+
+    new_widget = QPlainTextEdit()
+    new_widget.setMaximumBlockCount(max_lines)
+    _measure(f"QPlainTextEdit limitado ({count})", new_widget.appendPlainText, count)
+    app.processEvents()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 100000)
@@ -0,0 +1,358 @@
+"""
+Módulo de coleta de informações de rede (gateway, IP, RDP e latência)
+"""
+
+import ctypes
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from ping_engine import get_default_prober, get_default_sweep
+from socket_table import LOCAL_ADDRESSES, take_rdp_snapshot
+
+try:
+    import psutil
+
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+DEFAULT_GATEWAY = "192.168.1.1"
+DEFAULT_LOCAL_IP = "127.0.0.1"
+DEFAULT_INTERFACE = "Local"
+TOPOLOGY_TTL = 300  # segundos; mudanças de endereço invalidam antes disso
+
+_IPV4_RE = re.compile(r"^(\d{1,3}\.){3}\d{1,3}$")
+_ADAPTER_RE = re.compile(r"Adaptador\s+\w+\s+(.+?):")
+_VMNET_RE = re.compile(r"VMnet(\d+)")
+_VETH_RE = re.compile(r"vEthernet\s*\((.+?)\)")
+
+
+def parse_route_print(output):
+    """Extrai (gateway, ip_local) da rota padrão em `route print 0.0.0.0`"""
+    for line in output.split("\n"):
+        if "0.0.0.0" in line and "On-link" not in line:
+            parts = line.split()
+            if len(parts) >= 4:
+                potential_gateway = parts[2]
+                potential_interface_ip = parts[3]
+                if _IPV4_RE.match(potential_gateway) and _IPV4_RE.match(
+                    potential_interface_ip
+                ):
+                    return potential_gateway, potential_interface_ip
+    return None
+
+
+def shorten_interface_name(interface_name):
+    """Compacta nomes longos de adaptadores para o label da interface"""
+    if len(interface_name) <= 12:
+        return interface_name
+    if "VirtualBox" in interface_name:
+        return "VirtualBox"
+    if "VMware Network Adapter VMnet" in interface_name:
+        vmnet_match = _VMNET_RE.search(interface_name)
+        return f"VMnet{vmnet_match.group(1)}" if vmnet_match else "VMware"
+    if "vEthernet" in interface_name:
+        # vEthernet (WSL) -> vEth(WSL)
+        veth_match = _VETH_RE.search(interface_name)
+        if veth_match:
+            inner = veth_match.group(1)
+            if len(inner) > 8:
+                inner = inner[:6] + ".."
+            return f"vEth({inner})"
+        return "vEthernet"
+    if "Conexão de Rede Bluetooth" in interface_name:
+        return "Bluetooth"
+    # Crop genérico para outros casos
+    return interface_name[:10] + ".."
+
+
+def parse_ipconfig(output, my_ip):
+    """Nome do adaptador (sem compactar) que possui my_ip na saída do `ipconfig`"""
+    current_adapter = ""
+    for line in output.split("\n"):
+        # Detecta linha de adaptador
+        if "Adaptador" in line and ":" in line:
+            adapter_match = _ADAPTER_RE.search(line)
+            if adapter_match:
+                current_adapter = adapter_match.group(1).strip()
+        # Verifica se é o IP atual
+        elif my_ip in line and current_adapter:
+            return current_adapter
+    return None
+
+
+def read_network_info():
+    """Lê gateway, IP e nome REAL da interface principal (route + ipconfig)"""
+    try:
+        gateway_ip = DEFAULT_GATEWAY
+        my_ip = DEFAULT_LOCAL_IP
+        interface_name = DEFAULT_INTERFACE
+
+        if sys.platform == "win32":
+            # Detecta gateway principal
+            result = subprocess.run(
+                ["route", "print", "0.0.0.0"], capture_output=True, text=True, timeout=5
+            )
+            if result.returncode == 0:
+                route = parse_route_print(result.stdout)
+                if route:
+                    gateway_ip, my_ip = route
+
+            # Captura nome REAL da interface do ipconfig
+            try:
+                result = subprocess.run(
+                    ["ipconfig"], capture_output=True, text=True, timeout=3
+                )
+                if result.returncode == 0:
+                    adapter = parse_ipconfig(result.stdout, my_ip)
+                    if adapter:
+                        interface_name = shorten_interface_name(adapter)
+            except Exception:
+                # Sem o nome do adaptador: mantém gateway/IP da rota. (A versão
+                # anterior classificava current_adapter aqui, que nem existia
+                # quando o próprio ipconfig falhava, e perdia a rota.)
+                interface_name = "Rede"
+
+        return gateway_ip, my_ip, interface_name
+    except Exception:
+        return DEFAULT_GATEWAY, DEFAULT_LOCAL_IP, DEFAULT_INTERFACE
+
+
+def read_local_ips():
+    """IPv4 de todos os adaptadores locais (psutil; senão resolução do hostname)"""
+    ips = set()
+    try:
+        if PSUTIL_AVAILABLE:
+            for addresses in psutil.net_if_addrs().values():
+                ips.update(a.address for a in addresses if a.family == socket.AF_INET)
+        else:
+            ips.update(socket.gethostbyname_ex(socket.gethostname())[2])
+    except Exception:
+        pass
+    return ips
+
+
+class NetworkTopology:
+    """Cache de gateway, IP local e nome curto da interface
+
+    Em regime a consulta é só uma leitura de dicionário. O cache expira por
+    TTL e é invalidado por notificação de mudança de endereço (Windows) ou
+    quando uma sessão RDP aparece em um IP local desconhecido. São conhecidos
+    todos os IPs dos adaptadores (máquinas com várias interfaces) e os IPs
+    que já provocaram uma releitura.
+    """
+
+    def __init__(
+        self, reader=read_network_info, ttl=TOPOLOGY_TTL, clock=time.monotonic, local_ips_reader=read_local_ips
+    ):
+        self.reader = reader
+        self.local_ips_reader = local_ips_reader
+        self.ttl = ttl
+        self.clock = clock
+        self._cache = {}
+        self._local_ips = set()
+        self._seen_ips = set()  # IPs que já invalidaram o cache
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._watch_thread = None
+
+    def get(self):
+        """Retorna (gateway, ip_local, interface)"""
+        entry = self._cache.get("topology")
+        if entry is not None and self.clock() < entry[1]:
+            self.hits += 1
+            return entry[0]
+        with self._lock:
+            entry = self._cache.get("topology")
+            if entry is not None and self.clock() < entry[1]:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            value = self.reader()
+            self._local_ips = set(self.local_ips_reader()) | self._seen_ips | {value[1]}
+            self._cache["topology"] = (value, self.clock() + self.ttl)
+            return value
+
+    def invalidate(self):
+        """Descarta o cache; a próxima consulta relê route/ipconfig"""
+        if self._cache.pop("topology", None) is not None:
+            self.invalidations += 1
+
+    def known_local_ips(self):
+        return set(self._local_ips) if "topology" in self._cache else set()
+
+    def observe_local_ips(self, local_ips):
+        """Invalida se um socket RDP usa IP local fora dos IPs conhecidos"""
+        known = self.known_local_ips()
+        if not known:
+            return False
+        unknown = {ip for ip in local_ips if ip not in known and ip not in LOCAL_ADDRESSES}
+        if not unknown:
+            return False
+        # Uma releitura por IP novo, mesmo que ele não apareça nos adaptadores
+        self._seen_ips |= unknown
+        self.invalidate()
+        return True
+
+    def stats(self):
+        """Contadores do cache"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def start_address_watch(self):
+        """Thread que aguarda NotifyAddrChange (Windows) e invalida o cache"""
+        if sys.platform != "win32" or self._watch_thread is not None:
+            return False
+        try:
+            notify_addr_change = ctypes.windll.iphlpapi.NotifyAddrChange
+        except Exception:
+            return False
+
+        def watch():
+            while True:
+                try:
+                    # Chamada síncrona: bloqueia até mudança de endereço IP
+                    if notify_addr_change(None, None) != 0:
+                        return
+                    self.invalidate()
+                except Exception:
+                    return
+
+        self._watch_thread = threading.Thread(
+            target=watch, name="addr-change-watch", daemon=True
+        )
+        self._watch_thread.start()
+        return True
+
+
+_topology = NetworkTopology()
+
+
+def get_topology():
+    """Instância compartilhada do cache de topologia"""
+    return _topology
+
+
+def get_network_info():
+    """Obtém gateway, IP e nome REAL da interface principal (via cache)"""
+    return _topology.get()
+
+
+def get_rdp_interface_ip(snapshot=None, fallback_ip=None):
+    """Detecta IP da interface usada para RDP
+
+    snapshot: RdpSnapshot já lido no ciclo (evita nova leitura da tabela)
+    fallback_ip: IP a usar sem RDP (evita nova chamada a get_network_info)
+    """
+    try:
+        if snapshot is None:
+            snapshot = take_rdp_snapshot()
+        for local_ip in snapshot.local_ips:
+            if local_ip not in LOCAL_ADDRESSES:
+                return local_ip
+    except Exception:
+        pass
+    if fallback_ip:
+        return fallback_ip
+    _, my_ip, _ = get_network_info()
+    return my_ip
+
+
+def ping_host(host, timeout=3):
+    """Ping host e retorna tempo em ms (-1 se falhou), sem criar processos"""
+    return get_default_prober().ping(host, timeout)
+
+
+def ping_host_subprocess(host, timeout=3):
+    """Ping via processo `ping` (caminho antigo, mantido para comparação)"""
+    try:
+        if sys.platform == "win32":
+            cmd = ["ping", "-n", "1", "-w", str(timeout * 1000), host]
+        else:
+            cmd = ["ping", "-c", "1", "-W", str(timeout), host]
+
+        result = subprocess.run(
+            cmd, capture_output=True, text=True, timeout=timeout + 1
+        )
+
+        if result.returncode == 0:
+            if sys.platform == "win32":
+                match = re.search(r"tempo[<=](\d+)ms|time[<=](\d+)ms", result.stdout)
+                if match:
+                    return int(match.group(1) or match.group(2))
+            else:
+                match = re.search(r"time=(\d+\.?\d*).*ms", result.stdout)
+                if match:
+                    return int(float(match.group(1)))
+        return -1
+    except Exception:
+        return -1
+
+
+def detectar_conexoes_rdp(snapshot=None):
+    """Detecta conexões RDP ativas (snapshot: RdpSnapshot compartilhado no ciclo)"""
+    try:
+        conexoes_ativas = []
+
+        if sys.platform == "win32":
+            try:
+                result = subprocess.run(
+                    ["qwinsta"], capture_output=True, text=True, timeout=5
+                )
+                if result.returncode == 0:
+                    lines = result.stdout.split("\n")
+                    for line in lines:
+                        if "rdp" in line.lower() and "ativo" in line.lower():
+                            conexoes_ativas.append("Local-RDP")
+            except Exception:
+                pass
+
+        try:
+            if snapshot is None:
+                snapshot = take_rdp_snapshot()
+            # Como o netstat antigo (2ª coluna): identifica a sessão pelo endereço local
+            for local_ip in snapshot.local_ips:
+                if local_ip not in LOCAL_ADDRESSES:
+                    last_octet = local_ip.split(".")[-1]
+                    conexoes_ativas.append(f"RDP-{last_octet}")
+        except Exception:
+            pass
+
+        conexoes_ativas = list(dict.fromkeys(conexoes_ativas))
+        tem_conexao = len(conexoes_ativas) > 0
+        conexao_principal = conexoes_ativas[0] if conexoes_ativas else "Nenhuma"
+
+        return tem_conexao, conexoes_ativas, conexao_principal
+    except Exception:
+        return False, [], "Erro"
+
+
+def ping_site_brasileiro():
+    """Ping para site brasileiro confiável (alvos sondados em paralelo)"""
+    result = get_default_sweep().run(timeout=2)
+    return result.latency_ms, result.name
+
+
+if __name__ == "__main__":
+    # Permite validar os parsers com saídas capturadas:
+    #   python network_info.py --route < route_print.txt
+    #   python network_info.py --ipconfig 10.0.0.5 < ipconfig.txt
+    if len(sys.argv) > 1 and sys.argv[1] == "--route":
+        print(parse_route_print(sys.stdin.read()))
+    elif len(sys.argv) > 2 and sys.argv[1] == "--ipconfig":
+        adapter_name = parse_ipconfig(sys.stdin.read(), sys.argv[2])
+        print(adapter_name, shorten_interface_name(adapter_name or ""))
+    else:
+        print(get_network_info(), get_topology().stats())
@@ -0,0 +1,601 @@
+"""
+Motor de latência em processo (sem criar processos `ping`)
+
+Backends plugáveis, tentados em ordem:
+- IcmpApiBackend: IcmpSendEcho (iphlpapi) no Windows, não exige administrador
+- IcmpSocketBackend: socket ICMP datagrama (não privilegiado) ou raw no Linux
+- TcpConnectBackend: RTT do handshake TCP em porta configurável
+
+Vários alvos podem ser sondados em paralelo a partir de um único loop asyncio
+com LatencyProber.probe_many(). ping_host() em network_info usa este módulo.
+Nomes são resolvidos pelo cache de dns_cache.
+
+TargetSweep sonda uma lista de alvos externos em paralelo (primeiro que
+responder ou melhor de N), mantém EWMA de latência e jitter por alvo e
+rebaixa temporariamente alvos que falham seguidamente. No modo primeiro
+que responder, as sondas perdedoras terminam em segundo plano (loop
+compartilhado das varreduras) e também entram nas estatísticas.
+
+Benchmark contra o caminho antigo (subprocess):
+    python ping_engine.py --bench [host] [repetições]
+Varredura com respondedor falso (sem rede):
+    python ping_engine.py --sweep-demo
+"""
+
+import asyncio
+import ctypes
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+from typing import NamedTuple
+
+from dns_cache import get_dns_cache
+
+DEFAULT_TCP_PROBE_PORT = 443
+
+# Alvos externos da varredura (host, nome exibido), em ordem de preferência
+DEFAULT_SWEEP_TARGETS = (("itaipu.gov.br", "Itaipu"), ("uol.com.br", "UOL"))
+SWEEP_FIRST = "first"  # primeiro alvo que responder
+SWEEP_BEST = "best"  # menor latência entre todos os alvos
+SWEEP_EWMA_ALPHA = 0.25
+SWEEP_DEMOTE_AFTER = 3  # falhas seguidas até rebaixar
+SWEEP_DEMOTE_SECONDS = 300
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+
+def _icmp_checksum(data):
+    """Checksum RFC 1071"""
+    if len(data) % 2:
+        data += b"\0"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def build_echo_request(identifier, sequence, payload=b"keepalive"):
+    """Monta pacote ICMP Echo Request"""
+    header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, identifier, sequence)
+    checksum = _icmp_checksum(header + payload)
+    header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, checksum, identifier, sequence)
+    return header + payload
+
+
+def parse_echo_reply(packet, has_ip_header):
+    """Retorna (identifier, sequence) de um Echo Reply ou None"""
+    if has_ip_header:
+        if len(packet) < 20:
+            return None
+        packet = packet[(packet[0] & 0x0F) * 4 :]
+    if len(packet) < 8:
+        return None
+    icmp_type, _, _, identifier, sequence = struct.unpack("!BBHHH", packet[:8])
+    if icmp_type != ICMP_ECHO_REPLY:
+        return None
+    return identifier, sequence
+
+
+class PingBackend:
+    """Interface dos backends de latência"""
+
+    name = "base"
+
+    def available(self):
+        return False
+
+    async def probe(self, ip, timeout):
+        """Retorna RTT em ms (float) ou None se não respondeu"""
+        raise NotImplementedError
+
+
+class IcmpSocketBackend(PingBackend):
+    """ICMP via socket: datagrama não privilegiado ou raw (root)"""
+
+    name = "icmp"
+
+    def __init__(self):
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._mode = None  # (tipo de socket, tem cabeçalho IP)
+
+    def _detect_mode(self):
+        if self._mode is None:
+            self._mode = False
+            for sock_type, has_ip_header in (
+                (socket.SOCK_DGRAM, False),
+                (socket.SOCK_RAW, True),
+            ):
+                try:
+                    socket.socket(socket.AF_INET, sock_type, socket.IPPROTO_ICMP).close()
+                    self._mode = (sock_type, has_ip_header)
+                    break
+                except OSError:
+                    continue
+        return self._mode
+
+    def available(self):
+        # No Windows raw sockets exigem administrador; usa IcmpApiBackend
+        return sys.platform != "win32" and bool(self._detect_mode())
+
+    def _next_sequence(self):
+        with self._lock:
+            self._sequence = (self._sequence + 1) & 0xFFFF
+            return self._sequence
+
+    async def probe(self, ip, timeout):
+        mode = self._detect_mode()
+        if not mode:
+            return None
+        sock_type, has_ip_header = mode
+        loop = asyncio.get_running_loop()
+        sock = socket.socket(socket.AF_INET, sock_type, socket.IPPROTO_ICMP)
+        try:
+            sock.setblocking(False)
+            await loop.sock_connect(sock, (ip, 0))
+            # Socket datagrama: o kernel reescreve o identifier com a porta local
+            identifier = sock.getsockname()[1] if not has_ip_header else os.getpid() & 0xFFFF
+            sequence = self._next_sequence()
+            start = time.perf_counter()
+            await loop.sock_sendall(sock, build_echo_request(identifier, sequence))
+            deadline = start + timeout
+            while True:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return None
+                packet = await asyncio.wait_for(loop.sock_recv(sock, 1024), remaining)
+                reply = parse_echo_reply(packet, has_ip_header)
+                if reply and reply[1] == sequence and (not has_ip_header or reply[0] == identifier):
+                    return (time.perf_counter() - start) * 1000
+        except (OSError, asyncio.TimeoutError):
+            return None
+        finally:
+            sock.close()
+
+
+class IcmpApiBackend(PingBackend):
+    """ICMP via IcmpSendEcho (Windows), executado em thread do executor"""
+
+    name = "icmp-api"
+
+    class ICMP_ECHO_REPLY_STRUCT(ctypes.Structure):
+        _fields_ = [
+            ("Address", ctypes.c_ulong),
+            ("Status", ctypes.c_ulong),
+            ("RoundTripTime", ctypes.c_ulong),
+            ("DataSize", ctypes.c_ushort),
+            ("Reserved", ctypes.c_ushort),
+            ("Data", ctypes.c_void_p),
+            ("Ttl", ctypes.c_ubyte),
+            ("Tos", ctypes.c_ubyte),
+            ("Flags", ctypes.c_ubyte),
+            ("OptionsSize", ctypes.c_ubyte),
+            ("OptionsData", ctypes.c_void_p),
+        ]
+
+    def __init__(self):
+        self._iphlpapi = None
+        if sys.platform == "win32":
+            try:
+                self._iphlpapi = ctypes.windll.iphlpapi
+                self._iphlpapi.IcmpCreateFile.restype = ctypes.c_void_p
+                self._iphlpapi.IcmpCloseHandle.argtypes = [ctypes.c_void_p]
+            except Exception:
+                self._iphlpapi = None
+
+    def available(self):
+        return self._iphlpapi is not None
+
+    def _send_echo(self, ip, timeout):
+        payload = b"keepalive"
+        reply_size = ctypes.sizeof(self.ICMP_ECHO_REPLY_STRUCT) + len(payload) + 8
+        reply_buffer = ctypes.create_string_buffer(reply_size)
+        handle = self._iphlpapi.IcmpCreateFile()
+        try:
+            address = struct.unpack("<L", socket.inet_aton(ip))[0]
+            count = self._iphlpapi.IcmpSendEcho(
+                ctypes.c_void_p(handle),
+                ctypes.c_ulong(address),
+                payload,
+                len(payload),
+                None,
+                reply_buffer,
+                reply_size,
+                int(timeout * 1000),
+            )
+            if not count:
+                return None
+            reply = self.ICMP_ECHO_REPLY_STRUCT.from_buffer(reply_buffer)
+            if reply.Status != 0:
+                return None
+            return float(reply.RoundTripTime)
+        finally:
+            self._iphlpapi.IcmpCloseHandle(ctypes.c_void_p(handle))
+
+    async def probe(self, ip, timeout):
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(None, self._send_echo, ip, timeout)
+        except Exception:
+            return None
+
+
+class TcpConnectBackend(PingBackend):
+    """RTT do handshake TCP; conexão recusada (RST) também mede o RTT"""
+
+    name = "tcp"
+
+    def __init__(self, port=DEFAULT_TCP_PROBE_PORT):
+        self.port = port
+
+    def available(self):
+        return True
+
+    async def probe(self, ip, timeout):
+        loop = asyncio.get_running_loop()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, (ip, self.port)), timeout)
+            return (time.perf_counter() - start) * 1000
+        except ConnectionRefusedError:
+            return (time.perf_counter() - start) * 1000
+        except (OSError, asyncio.TimeoutError):
+            return None
+        finally:
+            sock.close()
+
+
+class FakeResponderBackend(PingBackend):
+    """Respondedor local falso: {ip: atraso em s ou None (sem resposta)}"""
+
+    name = "fake"
+
+    def __init__(self, delays):
+        self.delays = dict(delays)
+        self.probes = 0
+
+    def available(self):
+        return True
+
+    async def probe(self, ip, timeout):
+        self.probes += 1
+        delay = self.delays.get(ip)
+        if delay is None or delay > timeout:
+            await asyncio.sleep(timeout)
+            return None
+        start = time.perf_counter()
+        await asyncio.sleep(delay)
+        return (time.perf_counter() - start) * 1000
+
+
+class LatencyProber:
+    """Sonda de latência com backends em cascata"""
+
+    def __init__(self, backends=None, tcp_port=DEFAULT_TCP_PROBE_PORT):
+        if backends is None:
+            backends = [IcmpApiBackend(), IcmpSocketBackend(), TcpConnectBackend(tcp_port)]
+        self.backends = [b for b in backends if b.available()]
+
+    async def resolve(self, host, timeout=3):
+        """Resolve host para IPv4 via cache DNS (None se falhou)"""
+        return await get_dns_cache().resolve(host, timeout)
+
+    async def probe(self, host, timeout=3):
+        """Latência em ms (int, mínimo 1) ou -1 se nenhum backend respondeu
+
+        `timeout` vale para a cascata inteira (DNS incluído): cada backend
+        recebe uma parte igual do que resta, e o último fica com o restante.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        ip = await self.resolve(host, timeout)
+        if ip is None:
+            return -1
+        for index, backend in enumerate(self.backends):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            elapsed = await backend.probe(ip, remaining / (len(self.backends) - index))
+            if elapsed is not None:
+                return max(1, int(round(elapsed)))
+        return -1
+
+    async def probe_many(self, hosts, timeout=3):
+        """Sonda vários hosts em paralelo; retorna {host: ms}"""
+        results = await asyncio.gather(*(self.probe(h, timeout) for h in hosts))
+        return dict(zip(hosts, results))
+
+    def ping(self, host, timeout=3):
+        """Versão síncrona para uso em threads de trabalho"""
+        try:
+            return asyncio.run(self.probe(host, timeout))
+        except Exception:
+            return -1
+
+
+_default_prober = None
+_default_lock = threading.Lock()
+
+
+def get_default_prober():
+    """Instância compartilhada do LatencyProber"""
+    global _default_prober
+    with _default_lock:
+        if _default_prober is None:
+            _default_prober = LatencyProber()
+        return _default_prober
+
+
+def configure_default_prober(tcp_port=DEFAULT_TCP_PROBE_PORT, backends=None):
+    """Recria a instância compartilhada (ex.: porta TCP vinda das configurações)"""
+    global _default_prober
+    with _default_lock:
+        _default_prober = LatencyProber(backends=backends, tcp_port=tcp_port)
+        return _default_prober
+
+
+class SweepTarget:
+    """Estado de um alvo da varredura (EWMA de latência e jitter)"""
+
+    def __init__(self, host, name):
+        self.host = host
+        self.name = name
+        self.ewma_ms = None
+        self.jitter_ms = 0.0
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.demoted_until = 0.0
+
+    def record(self, latency_ms, alpha, now, demote_after, demote_seconds):
+        if latency_ms > 0:
+            self.successes += 1
+            self.consecutive_failures = 0
+            self.demoted_until = 0.0
+            if self.ewma_ms is None:
+                self.ewma_ms = float(latency_ms)
+            else:
+                # Jitter como no RFC 3550: média móvel do desvio absoluto
+                self.jitter_ms += alpha * (abs(latency_ms - self.ewma_ms) - self.jitter_ms)
+                self.ewma_ms += alpha * (latency_ms - self.ewma_ms)
+        else:
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= demote_after:
+                self.demoted_until = now + demote_seconds
+
+    def summary(self, now):
+        ewma = f"{self.ewma_ms:.0f}ms" if self.ewma_ms is not None else "---"
+        state = " rebaixado" if self.demoted_until > now else ""
+        return (
+            f"{self.name} ({self.host}): média={ewma} jitter={self.jitter_ms:.1f}ms "
+            f"ok={self.successes} falhas={self.failures}{state}"
+        )
+
+
+class SweepResult(NamedTuple):
+    """Resultado de uma varredura"""
+
+    latency_ms: int  # -1 se nenhum alvo respondeu
+    name: str
+    host: str
+    jitter_ms: float
+    results: dict  # {host: ms} dos alvos que concluíram
+
+
+_sweep_loop = None
+_sweep_loop_lock = threading.Lock()
+
+
+def get_sweep_loop():
+    """Loop de fundo das varreduras síncronas (as sondas perdedoras continuam nele)"""
+    global _sweep_loop
+    with _sweep_loop_lock:
+        if _sweep_loop is None:
+            _sweep_loop = asyncio.new_event_loop()
+            threading.Thread(target=_sweep_loop.run_forever, name="sweep-loop", daemon=True).start()
+        return _sweep_loop
+
+
+class TargetSweep:
+    """Sonda vários alvos em paralelo com primeiro-que-responder ou melhor-de-N"""
+
+    def __init__(
+        self,
+        targets=DEFAULT_SWEEP_TARGETS,
+        mode=SWEEP_FIRST,
+        prober=None,
+        alpha=SWEEP_EWMA_ALPHA,
+        demote_after=SWEEP_DEMOTE_AFTER,
+        demote_seconds=SWEEP_DEMOTE_SECONDS,
+        clock=time.monotonic,
+    ):
+        self.targets = [SweepTarget(host, name) for host, name in targets]
+        self.mode = mode
+        self.prober = prober
+        self.alpha = alpha
+        self.demote_after = demote_after
+        self.demote_seconds = demote_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._background = set()  # sondas perdedoras ainda em andamento
+
+    def active_targets(self):
+        """Alvos não rebaixados, na ordem configurada (todos se todos falharam)"""
+        now = self.clock()
+        active = [t for t in self.targets if t.demoted_until <= now]
+        return active or list(self.targets)
+
+    def _record(self, target, latency_ms):
+        with self._lock:
+            target.record(
+                latency_ms, self.alpha, self.clock(), self.demote_after, self.demote_seconds
+            )
+
+    def _record_background(self, task):
+        """Sonda perdedora terminou depois do resultado: entra nas estatísticas"""
+        self._background.discard(task)
+        if task.cancelled() or task.exception() is not None:
+            return
+        target, latency_ms = task.result()
+        self._record(target, latency_ms)
+
+    def _result(self, target, latency_ms, results):
+        if target is None:
+            return SweepResult(-1, "Brasil", "", 0.0, results)
+        return SweepResult(latency_ms, target.name, target.host, target.jitter_ms, results)
+
+    async def sweep(self, timeout=2):
+        """Uma varredura; o tempo total é limitado por `timeout`"""
+        prober = self.prober or get_default_prober()
+
+        async def probe_target(target):
+            return target, await prober.probe(target.host, timeout)
+
+        tasks = [asyncio.ensure_future(probe_target(t)) for t in self.active_targets()]
+        results = {}
+        best = None
+        try:
+            # Cada sonda já respeita `timeout` (DNS incluído); a folga é só de agendamento
+            for finished in asyncio.as_completed(tasks, timeout=timeout + 0.5):
+                target, latency_ms = await finished
+                results[target.host] = latency_ms
+                self._record(target, latency_ms)
+                if latency_ms > 0 and (best is None or latency_ms < best[1]):
+                    best = (target, latency_ms)
+                    if self.mode == SWEEP_FIRST:
+                        break
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            # Terminadas na mesma iteração do vencedor: as_completed não chegou a entregá-las
+            for task in tasks:
+                if task.done() and not task.cancelled() and task.exception() is None:
+                    target, latency_ms = task.result()
+                    if target.host not in results:
+                        results[target.host] = latency_ms
+                        self._record(target, latency_ms)
+            pending = [task for task in tasks if not task.done()]
+            if self.mode == SWEEP_FIRST and best is not None:
+                # Os demais terminam sozinhos (cada sonda respeita `timeout`):
+                # alvo fora do ar conta falha e acaba rebaixado
+                for task in pending:
+                    self._background.add(task)
+                    task.add_done_callback(self._record_background)
+            else:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+        if best is None:
+            return self._result(None, -1, results)
+        return self._result(best[0], best[1], results)
+
+    def run(self, timeout=2):
+        """Versão síncrona para uso em threads de trabalho (no loop de fundo das varreduras)"""
+        try:
+            return asyncio.run_coroutine_threadsafe(self.sweep(timeout), get_sweep_loop()).result(timeout + 1)
+        except Exception:
+            return self._result(None, -1, {})
+
+    def report_lines(self):
+        now = self.clock()
+        with self._lock:
+            return [t.summary(now) for t in self.targets]
+
+
+def parse_sweep_targets(text):
+    """Converte "itaipu.gov.br=Itaipu, uol.com.br=UOL" em tupla (host, nome)"""
+    targets = []
+    for part in str(text).replace(";", ",").split(","):
+        host, _, name = part.strip().partition("=")
+        host = host.strip()
+        if host:
+            targets.append((host, name.strip() or host.split(".")[0].capitalize()))
+    return tuple(targets) or DEFAULT_SWEEP_TARGETS
+
+
+def format_sweep_targets(targets):
+    return ", ".join(f"{host}={name}" for host, name in targets)
+
+
+_default_sweep = None
+
+
+def get_default_sweep():
+    """Instância compartilhada da varredura de alvos externos"""
+    global _default_sweep
+    with _default_lock:
+        if _default_sweep is None:
+            _default_sweep = TargetSweep()
+        return _default_sweep
+
+
+def configure_default_sweep(targets=DEFAULT_SWEEP_TARGETS, mode=SWEEP_FIRST):
+    """Recria a varredura compartilhada (alvos e modo vindos das configurações)"""
+    global _default_sweep
+    if mode not in (SWEEP_FIRST, SWEEP_BEST):
+        mode = SWEEP_FIRST
+    with _default_lock:
+        _default_sweep = TargetSweep(targets, mode)
+        return _default_sweep
+
+
+def sweep_demo(cycles=6):
+    """Varredura contra respondedor falso: alvo principal fora do ar"""
+    delays = {"192.0.2.1": None, "192.0.2.2": 0.030, "192.0.2.3": 0.012}
+    targets = (("192.0.2.1", "Fora"), ("192.0.2.2", "Lento"), ("192.0.2.3", "Rápido"))
+    for mode in (SWEEP_FIRST, SWEEP_BEST):
+        backend = FakeResponderBackend(delays)
+        sweep = TargetSweep(targets, mode, prober=LatencyProber(backends=[backend]))
+        for cycle in range(cycles):
+            start = time.perf_counter()
+            result = sweep.run(timeout=0.5)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(
+                f"[{mode}] ciclo {cycle + 1}: {result.name} {result.latency_ms}ms "
+                f"em {elapsed:.0f}ms, sondados {len(result.results)}"
+            )
+            time.sleep(0.5)  # intervalo entre ciclos: as sondas perdedoras terminam
+        for line in sweep.report_lines():
+            print(f"    {line}")
+
+
+def benchmark(host="127.0.0.1", repetitions=50):
+    """Compara ping via subprocess com o motor em processo"""
+    from network_info import ping_host_subprocess
+
+    prober = LatencyProber()
+    print(f"Backends ativos: {[b.name for b in prober.backends]}")
+
+    def measure(label, func):
+        start = time.perf_counter()
+        results = [func() for _ in range(repetitions)]
+        elapsed = (time.perf_counter() - start) * 1000
+        ok = sum(1 for r in results if r > 0)
+        print(f"{label:<22} {elapsed / repetitions:8.2f} ms/chamada  ({ok}/{repetitions} ok)")
+
+    measure("subprocess ping", lambda: ping_host_subprocess(host, timeout=1))
+    measure("motor em processo", lambda: prober.ping(host, timeout=1))
+
+    start = time.perf_counter()
+    asyncio.run(prober.probe_many([host] * repetitions, timeout=1))
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{'probe_many (paralelo)':<22} {elapsed:8.2f} ms total ({repetitions} alvos)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--sweep-demo":
+        sweep_demo()
+    elif len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        bench_host = sys.argv[2] if len(sys.argv) > 2 else "127.0.0.1"
+        bench_reps = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+        benchmark(bench_host, bench_reps)
+    else:
+        for target in sys.argv[1:] or ["127.0.0.1"]:
+            print(f"{target}: {get_default_prober().ping(target)} ms")
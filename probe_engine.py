@@ -0,0 +1,287 @@
+"""
+Motor de sondagem de conectividade em segundo plano
+
+Executa as sondas de rede (rota/ipconfig, qwinsta/netstat e pings) em um
+pool de threads, fora da thread da interface, e entrega o resultado
+consolidado por callback. Cada sonda alimenta um histograma de latência.
+"""
+
+import bisect
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from dns_cache import get_dns_cache, parse_pinned_hosts
+from network_info import (
+    detectar_conexoes_rdp,
+    get_network_info,
+    get_rdp_interface_ip,
+    get_topology,
+    ping_host,
+)
+from ping_engine import (
+    DEFAULT_SWEEP_TARGETS,
+    DEFAULT_TCP_PROBE_PORT,
+    SWEEP_FIRST,
+    configure_default_prober,
+    configure_default_sweep,
+    format_sweep_targets,
+    get_default_sweep,
+    parse_sweep_targets,
+)
+from socket_table import DEFAULT_RDP_PORTS, configure_rdp_ports, parse_rdp_ports, take_rdp_snapshot
+
+# Limites superiores dos buckets do histograma (ms)
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+PROBE_MAX_WORKERS = 6
+
+
+class ConnectivitySnapshot(NamedTuple):
+    """Resultado de um ciclo de sondagem (mesma ordem de update_connectivity_display)"""
+
+    gateway: str
+    my_ip: str
+    ip_usado: str
+    interface: str
+    tem_rdp: bool
+    lista_rdp: list
+    conexao_principal: str
+    ping_gw: int
+    ping_brasil: int
+    ping_sistema: int
+    site_brasil: str
+    sistema_nome: str
+    jitter_brasil: float = 0.0
+
+
+class LatencyHistogram:
+    """Histograma de latência com buckets fixos em escala logarítmica"""
+
+    def __init__(self, buckets=HISTOGRAM_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # último = acima do maior bucket
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, elapsed_ms):
+        """Registra uma amostra em milissegundos"""
+        index = bisect.bisect_left(self.buckets, elapsed_ms)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total_ms += elapsed_ms
+            if elapsed_ms > self.max_ms:
+                self.max_ms = elapsed_ms
+
+    def percentile(self, fraction):
+        """Estimativa do percentil (limite superior do bucket)"""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            target = fraction * self.count
+            seen = 0
+            for index, bucket_count in enumerate(self.counts):
+                seen += bucket_count
+                if seen >= target:
+                    if index < len(self.buckets):
+                        return min(float(self.buckets[index]), self.max_ms)
+                    return self.max_ms
+        return self.max_ms
+
+    def to_dict(self):
+        """Exporta o histograma em formato serializável"""
+        with self._lock:
+            labels = [f"<={b}ms" for b in self.buckets] + [f">{self.buckets[-1]}ms"]
+            return {
+                "count": self.count,
+                "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+                "max_ms": round(self.max_ms, 2),
+                "buckets": dict(zip(labels, self.counts)),
+            }
+
+    def summary(self):
+        """Resumo compacto para o log"""
+        if not self.count:
+            return "sem amostras"
+        avg = self.total_ms / self.count
+        return (
+            f"n={self.count} avg={avg:.0f}ms p50={self.percentile(0.5):.0f}ms "
+            f"p95={self.percentile(0.95):.0f}ms max={self.max_ms:.0f}ms"
+        )
+
+
+def configure_probes(value):
+    """Aplica as configurações das sondas; value(chave, padrão, tipo) como QSettings.value"""
+    # Porta do fallback TCP do motor de latência
+    configure_default_prober(tcp_port=value("tcp_probe_port", DEFAULT_TCP_PROBE_PORT, int))
+    # Alvos externos ("host=Nome, ...") e modo "first" ou "best"
+    configure_default_sweep(
+        parse_sweep_targets(value("latency_targets", format_sweep_targets(DEFAULT_SWEEP_TARGETS), str)),
+        value("latency_sweep_mode", SWEEP_FIRST, str),
+    )
+    # IPs fixados para as sondas ("itaipu.gov.br=200.0.0.1, ...")
+    get_dns_cache().configure(pinned=parse_pinned_hosts(value("dns_pinned_hosts", "", str)))
+    # Portas RDP monitoradas (3389 + portas customizadas, ex.: "3389,3390")
+    configure_rdp_ports(parse_rdp_ports(value("rdp_ports", ",".join(str(p) for p in DEFAULT_RDP_PORTS), str)))
+
+
+def format_connectivity_status(
+    tem_rdp, conexao_principal, ping_gw, ping_brasil, ping_sistema, sistema_nome, jitter_brasil=0.0
+):
+    """Linha compacta "Net: RDP:.42 | GW:2ms | BR:17±3ms | S42:8ms" """
+    status_parts = []
+
+    if tem_rdp:
+        if conexao_principal == "Local-RDP":
+            status_parts.append("RDP:Local")
+        else:
+            sistema_short = conexao_principal.replace("RDP-", ".")
+            status_parts.append(f"RDP:{sistema_short}")
+    else:
+        status_parts.append("RDP:Off")
+
+    if ping_gw > 0:
+        status_parts.append(f"GW:{ping_gw}ms")
+    if ping_brasil > 0:
+        jitter = f"±{jitter_brasil:.0f}" if jitter_brasil >= 1 else ""
+        status_parts.append(f"BR:{ping_brasil}{jitter}ms")
+    if ping_sistema > 0:
+        sistema_short = sistema_nome.replace("RDP-", "S")
+        status_parts.append(f"{sistema_short}:{ping_sistema}ms")
+
+    return "Net: " + " | ".join(status_parts)
+
+
+class ConnectivityProbeEngine:
+    """Executa o ciclo de conectividade em paralelo, fora da thread da GUI"""
+
+    def __init__(self, on_result, max_workers=PROBE_MAX_WORKERS):
+        self.on_result = on_result
+        self.histograms = {}
+        self._histograms_lock = threading.Lock()
+        # Coordenador separado para nunca disputar workers com as sondas
+        self._coordinator = ThreadPoolExecutor(1, thread_name_prefix="probe-cycle")
+        self._workers = ThreadPoolExecutor(max_workers, thread_name_prefix="probe")
+        self._cycle_lock = threading.Lock()
+        self._cycle_running = False
+        self._closed = False
+
+    def histogram(self, name):
+        """Obtém (ou cria) o histograma de uma sonda"""
+        with self._histograms_lock:
+            if name not in self.histograms:
+                self.histograms[name] = LatencyHistogram()
+            return self.histograms[name]
+
+    def timed(self, name, func, *args, **kwargs):
+        """Executa func registrando a duração no histograma da sonda"""
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.histogram(name).record((time.perf_counter() - start) * 1000)
+
+    def submit_cycle(self):
+        """Agenda um ciclo; ignora se o anterior ainda estiver em execução"""
+        with self._cycle_lock:
+            if self._cycle_running or self._closed:
+                return False
+            self._cycle_running = True
+        self._coordinator.submit(self._run_cycle)
+        return True
+
+    def _submit(self, name, func, *args, **kwargs):
+        return self._workers.submit(self.timed, name, func, *args, **kwargs)
+
+    def _run_cycle(self):
+        """Ciclo completo: sondas independentes disparadas em paralelo"""
+        try:
+            start = time.perf_counter()
+            brasil_future = self._submit("ping_brasil", get_default_sweep().run, timeout=2)
+            # Uma única leitura da tabela de sockets por ciclo, junto com a topologia
+            snapshot_future = self._submit("socket_table", take_rdp_snapshot)
+            info_future = self._submit("network_info", get_network_info)
+
+            rdp_snapshot = snapshot_future.result()
+            rdp_future = self._submit("rdp_sessions", detectar_conexoes_rdp, rdp_snapshot)
+            # RDP em IP local novo invalida a topologia em cache: relê
+            if get_topology().observe_local_ips(rdp_snapshot.local_ips):
+                info_future = self._submit("network_info", get_network_info)
+
+            gateway, my_ip, interface = info_future.result()
+            gw_future = self._submit("ping_gateway", ping_host, gateway, timeout=2)
+            tem_rdp, lista_rdp, conexao_principal = rdp_future.result()
+
+            ip_usado = (
+                get_rdp_interface_ip(rdp_snapshot, fallback_ip=my_ip) if tem_rdp else my_ip
+            )
+
+            sistema_future = None
+            sistema_nome = ""
+            if tem_rdp and conexao_principal not in ["Local-RDP", "Nenhuma", "Erro"]:
+                if conexao_principal.startswith("RDP-"):
+                    last_octet = conexao_principal.replace("RDP-", "")
+                    gateway_base = ".".join(gateway.split(".")[:-1])
+                    sistema_ip = f"{gateway_base}.{last_octet}"
+                    sistema_future = self._submit("ping_sistema", ping_host, sistema_ip, timeout=2)
+                    sistema_nome = conexao_principal
+
+            ping_gw = gw_future.result()
+            brasil = brasil_future.result()
+            ping_sistema = sistema_future.result() if sistema_future else -1
+
+            self.histogram("cycle").record((time.perf_counter() - start) * 1000)
+            snapshot = ConnectivitySnapshot(
+                gateway,
+                my_ip,
+                ip_usado,
+                interface,
+                tem_rdp,
+                lista_rdp,
+                conexao_principal,
+                ping_gw,
+                brasil.latency_ms,
+                ping_sistema,
+                brasil.name,
+                sistema_nome,
+                brasil.jitter_ms,
+            )
+            if not self._closed:
+                self.on_result(snapshot)
+        except Exception as e:
+            print(f"[DEBUG] Erro no ciclo de conectividade: {e}")
+        finally:
+            with self._cycle_lock:
+                self._cycle_running = False
+
+    def report_lines(self):
+        """Linhas de resumo dos histogramas, uma por sonda"""
+        with self._histograms_lock:
+            items = sorted(self.histograms.items())
+        lines = [f"{name}: {hist.summary()}" for name, hist in items]
+        topology = get_topology().stats()
+        lines.append(
+            f"topologia (cache): hits={topology['hits']} misses={topology['misses']}"
+            f" invalidações={topology['invalidations']}"
+        )
+        lines.append(f"dns (cache): {get_dns_cache().summary()}")
+        lines.extend(f"alvo {line}" for line in get_default_sweep().report_lines())
+        return lines
+
+    def export_histograms(self, filename):
+        """Exporta os histogramas por sonda em JSON"""
+        with self._histograms_lock:
+            data = {name: hist.to_dict() for name, hist in self.histograms.items()}
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        return filename
+
+    def shutdown(self):
+        """Encerra o pool sem aguardar sondas pendentes"""
+        self._closed = True
+        self._coordinator.shutdown(wait=False, cancel_futures=True)
+        self._workers.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,237 @@
+"""
+Localização de processo com cache do PID
+
+ProcessWatch lista só o nome dos processos e lê o executável apenas dos
+candidatos (nome compatível): em servidores de terminal com centenas de
+sessões, pedir cmdline/exe de todos os processos é caro e gera
+AccessDenied em série. O PID encontrado fica em cache e é revalidado com
+pid_exists + create_time (PID reaproveitado pelo sistema tem outro
+create_time); a varredura só se repete quando essa conferência falha.
+
+    python -m pytest tests/test_process_watch.py
+    python process_watch.py --bench [n]   # tabela sintética (padrão 2000)
+"""
+
+import random
+import sys
+import time
+
+import psutil
+
+# Custo simulado de cada atributo na tabela sintética (us)
+SYNTHETIC_COST_US = {"pid": 0, "name": 2, "create_time": 2, "exe": 40, "cmdline": 40}
+SYNTHETIC_DENIED_FRACTION = 0.6  # processos de outras sessões/serviços
+
+
+class ProcessWatch:
+    """Acha (e lembra) o processo pelo nome e, opcionalmente, pelo caminho do executável"""
+
+    def __init__(self, name, path_hint=None, ps=psutil):
+        self.name = name.lower()
+        self.path_hint = path_hint.lower() if path_hint else None
+        self.ps = ps  # psutil ou tabela com a mesma interface (testes)
+        self.pid = None
+        self.create_time = None
+        self.process = None
+        self.hits = 0
+        self.scans = 0
+        self.exe_lookups = 0
+        self.denied = 0
+        self.last_scan_ms = 0.0
+
+    def _still_valid(self):
+        """Conferência barata do PID em cache"""
+        if self.pid is None or not self.ps.pid_exists(self.pid):
+            return False
+        try:
+            return self.ps.Process(self.pid).create_time() == self.create_time
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return False
+
+    def _matches_path(self, proc):
+        if self.path_hint is None:
+            return True
+        self.exe_lookups += 1
+        try:
+            exe = proc.exe()
+        except psutil.AccessDenied:
+            self.denied += 1
+            return False
+        return bool(exe) and self.path_hint in exe.lower()
+
+    def _scan(self):
+        """Varredura só por nome; exe apenas dos candidatos"""
+        start = time.perf_counter()
+        self.scans += 1
+        found = None
+        for proc in self.ps.process_iter(["name"]):
+            try:
+                name = proc.info["name"]
+                if not name or self.name not in name.lower():
+                    continue
+                if self._matches_path(proc):
+                    found = (proc, proc.create_time())
+                    break
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        self.last_scan_ms = (time.perf_counter() - start) * 1000
+        return found
+
+    def find(self):
+        """Processo encontrado ou None"""
+        if self._still_valid():
+            self.hits += 1
+            return self.process
+        found = self._scan()
+        if found is None:
+            self.pid = self.create_time = self.process = None
+            return None
+        self.process, self.create_time = found
+        self.pid = self.process.pid
+        return self.process
+
+    def stats(self):
+        lookups = self.hits + self.scans
+        return {
+            "pid": self.pid,
+            "hits": self.hits,
+            "scans": self.scans,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "exe_lookups": self.exe_lookups,
+            "denied": self.denied,
+            "last_scan_ms": round(self.last_scan_ms, 2),
+        }
+
+    def summary(self):
+        stats = self.stats()
+        return (
+            f"pid={stats['pid']} acertos={stats['hits']} varreduras={stats['scans']}"
+            f" exe lidos={stats['exe_lookups']} negados={stats['denied']} última varredura={stats['last_scan_ms']}ms"
+        )
+
+
+def _spend(us):
+    """Ocupa a CPU por `us` microssegundos (custo simulado de uma chamada ao sistema)"""
+    end = time.perf_counter() + us / 1e6
+    while time.perf_counter() < end:
+        pass
+
+
+class SyntheticProcess:
+    """Processo da tabela sintética, com a interface usada de psutil.Process"""
+
+    def __init__(self, table, pid, name, exe, created, denied):
+        self.table = table
+        self.pid = pid
+        self._name = name
+        self._exe = exe
+        self._created = created
+        self._denied = denied
+        self.info = {}
+
+    def _read(self, attr, value, deniable=False):
+        if self.pid not in self.table.processes:
+            raise psutil.NoSuchProcess(self.pid)
+        self.table.reads[attr] = self.table.reads.get(attr, 0) + 1
+        _spend(SYNTHETIC_COST_US[attr])
+        if deniable and self._denied:
+            raise psutil.AccessDenied(self.pid)
+        return value
+
+    def name(self):
+        return self._read("name", self._name)
+
+    def exe(self):
+        return self._read("exe", self._exe, deniable=True)
+
+    def cmdline(self):
+        return self._read("cmdline", [self._exe], deniable=True)
+
+    def create_time(self):
+        return self._read("create_time", self._created)
+
+
+class SyntheticProcessTable:
+    """Tabela de processos falsa com a interface usada de psutil (process_iter, pid_exists)"""
+
+    def __init__(
+        self, size=2000, target="ms-teams.exe", target_exe=r"C:\Users\u\AppData\Local\Microsoft\Teams", seed=0
+    ):
+        rng = random.Random(seed)
+        self.processes = {}
+        self.reads = {}
+        self.next_pid = 4
+        names = ("svchost.exe", "chrome.exe", "explorer.exe", "conhost.exe", "RuntimeBroker.exe", "rdpclip.exe")
+        for _ in range(size - 1):
+            name = rng.choice(names)
+            self.add(name, rf"C:\Windows\System32\{name}", denied=rng.random() < SYNTHETIC_DENIED_FRACTION)
+        # Teams no fim da lista: pior caso da varredura
+        self.target_pid = self.add(target, rf"{target_exe}\{target}")
+
+    def add(self, name, exe, denied=False):
+        pid = self.next_pid
+        self.next_pid += 4
+        self.processes[pid] = SyntheticProcess(self, pid, name, exe, time.time() + pid, denied)
+        return pid
+
+    def kill(self, pid):
+        self.processes.pop(pid, None)
+
+    def process_iter(self, attrs=None):
+        for proc in list(self.processes.values()):
+            # Como psutil: atributos negados viram None
+            info = {}
+            for attr in attrs or ():
+                try:
+                    info[attr] = proc.pid if attr == "pid" else getattr(proc, attr)()
+                except psutil.AccessDenied:
+                    info[attr] = None
+            proc.info = info
+            yield proc
+
+    def pid_exists(self, pid):
+        return pid in self.processes
+
+    def Process(self, pid):  # noqa: N802 (mesmo nome de psutil.Process)
+        if pid not in self.processes:
+            raise psutil.NoSuchProcess(pid)
+        return self.processes[pid]
+
+
+def legacy_find(ps, name="ms-teams.exe", path_hint=r"\Microsoft\Teams"):
+    """Busca anterior: cmdline e exe de todos os processos a cada chamada"""
+    for proc in ps.process_iter(["pid", "name", "cmdline", "exe"]):
+        try:
+            if name in proc.info["name"].lower():
+                proc_path = proc.info.get("exe") or ""
+                if path_hint.lower() in proc_path.lower():
+                    return proc
+        except (psutil.NoSuchProcess, psutil.AccessDenied, KeyError):
+            continue
+    return None
+
+
+def benchmark(size=2000, lookups=60):
+    """Busca anterior x ProcessWatch na tabela sintética"""
+
+    def run(label, find, table):
+        start = time.perf_counter()
+        for _ in range(lookups):
+            if find() is None:
+                raise RuntimeError(f"{label}: Teams não encontrado")
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        reads = " ".join(f"{attr}={count}" for attr, count in sorted(table.reads.items()))
+        print(f"  {label:<22} {elapsed_ms / lookups:8.2f} ms/busca  leituras: {reads}")
+
+    print(f"{size} processos ({SYNTHETIC_DENIED_FRACTION:.0%} com exe negado), {lookups} buscas (1 por tentativa)")
+    table = SyntheticProcessTable(size)
+    run("anterior", lambda: legacy_find(table), table)
+    table = SyntheticProcessTable(size)
+    watch = ProcessWatch("ms-teams.exe", r"\Microsoft\Teams", ps=table)
+    run("ProcessWatch", watch.find, table)
+    print(f"  {watch.summary()}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 2000)
@@ -0,0 +1,129 @@
+"""
+Cadência adaptativa da atualização de conectividade
+
+Janela visível e rede instável: atualiza rápido. Resultados estáveis ou
+janela oculta/minimizada: o intervalo dobra a cada ciclo até o teto.
+Serviço parado com a janela oculta: pausa (ninguém vê e nada depende do
+resultado). Qualquer mudança (gateway, IP, sessões RDP) ou falha de ping
+volta ao ritmo inicial.
+
+    python -m pytest tests/test_refresh_cadence.py
+    python refresh_cadence.py   # despertares em 8h, antes/depois
+"""
+
+CADENCE_FAST_S = 5  # visível e instável
+CADENCE_BASE_S = 15  # intervalo antigo fixo
+CADENCE_VISIBLE_MAX_S = 60
+CADENCE_HIDDEN_MAX_S = 240
+CADENCE_BACKOFF = 2.0
+
+
+def snapshot_signature(snapshot):
+    """Parte do ConnectivitySnapshot que define "mudou"/"falhou" """
+    return (
+        snapshot.gateway,
+        snapshot.ip_usado,
+        snapshot.tem_rdp,
+        tuple(snapshot.lista_rdp),
+        snapshot.ping_gw > 0,
+        snapshot.ping_brasil > 0,
+        snapshot.ping_sistema > 0 or not snapshot.sistema_nome,
+    )
+
+
+class RefreshCadence:
+    """Decide o intervalo até a próxima sondagem (None = pausado)"""
+
+    def __init__(
+        self,
+        fast_s=CADENCE_FAST_S,
+        base_s=CADENCE_BASE_S,
+        visible_max_s=CADENCE_VISIBLE_MAX_S,
+        hidden_max_s=CADENCE_HIDDEN_MAX_S,
+        backoff=CADENCE_BACKOFF,
+    ):
+        self.fast_s = fast_s
+        self.base_s = base_s
+        self.visible_max_s = visible_max_s
+        self.hidden_max_s = hidden_max_s
+        self.backoff = backoff
+        self.visible = True
+        self.running = False
+        self.stable_streak = 0
+        self.last_signature = None
+        self.cycles = 0
+
+    def set_visible(self, visible):
+        """Retorna True se a janela acabou de aparecer (vale atualizar já)"""
+        became_visible = visible and not self.visible
+        self.visible = visible
+        return became_visible
+
+    def set_running(self, running):
+        self.running = running
+
+    def observe(self, signature, failed=False):
+        """Registra o resultado de um ciclo"""
+        self.cycles += 1
+        if failed or signature != self.last_signature:
+            self.stable_streak = 0
+        else:
+            self.stable_streak += 1
+        self.last_signature = signature
+
+    @property
+    def unstable(self):
+        return self.stable_streak == 0
+
+    def next_interval(self):
+        """Segundos até a próxima sondagem, ou None para pausar"""
+        if not self.visible and not self.running:
+            return None
+        if self.visible:
+            start = self.fast_s if self.unstable else self.base_s
+            ceiling = self.visible_max_s
+            streak = max(0, self.stable_streak - 1)
+        else:
+            start = self.base_s
+            ceiling = self.hidden_max_s
+            streak = self.stable_streak
+        return min(ceiling, start * self.backoff**streak)
+
+    def describe(self):
+        interval = self.next_interval()
+        state = "pausado" if interval is None else f"{interval:.0f}s"
+        visibility = "visível" if self.visible else "oculta"
+        return f"cadência {state} (janela {visibility}, estável há {self.stable_streak} ciclos)"
+
+
+def simulate_wakeups(hours=8.0, visible=False, running=True, unstable_every=0):
+    """Conta despertares (sondas + relógio) em `hours` horas"""
+    cadence = RefreshCadence()
+    cadence.set_visible(visible)
+    cadence.set_running(running)
+    elapsed, probes = 0.0, 0
+    horizon = hours * 3600
+    while elapsed < horizon:
+        interval = cadence.next_interval()
+        if interval is None:
+            break
+        elapsed += interval
+        probes += 1
+        failed = bool(unstable_every) and probes % unstable_every == 0
+        cadence.observe(("gw", "ip", True, ("RDP-42",), True, True, True), failed)
+    clock_ticks = int(horizon) if visible else 0
+    return probes, clock_ticks
+
+
+if __name__ == "__main__":
+    hours = 8
+    legacy = int(hours * 3600 / CADENCE_BASE_S) + hours * 3600
+    print(f"Antes (15s + relógio 1Hz): {legacy} despertares em {hours}h")
+    for label, kwargs in (
+        ("oculta, serviço ativo, rede estável", {"visible": False}),
+        ("oculta, serviço ativo, falha a cada 20", {"visible": False, "unstable_every": 20}),
+        ("oculta, serviço parado", {"visible": False, "running": False}),
+        ("visível, rede estável", {"visible": True}),
+    ):
+        probes, ticks = simulate_wakeups(hours, **kwargs)
+        print(f"  {label:<40} sondas={probes:5d} relógio={ticks:6d}")
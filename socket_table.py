@@ -0,0 +1,203 @@
+"""
+Tabela de conexões TCP para detecção de sessões RDP
+
+Uma única leitura da tabela de sockets por ciclo (psutil ou `netstat -an`
+como alternativa), filtrada pelas portas RDP em uma passada. O resultado
+(RdpSnapshot) é compartilhado por detectar_conexoes_rdp e
+get_rdp_interface_ip dentro do mesmo ciclo.
+
+Benchmark com tabela falsa:
+    python socket_table.py --bench [conexões]
+"""
+
+import random
+import re
+import subprocess
+import sys
+import time
+from typing import NamedTuple
+
+try:
+    import psutil
+
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+DEFAULT_RDP_PORTS = (3389,)
+LOCAL_ADDRESSES = ("127.0.0.1", "0.0.0.0")
+
+_IPV4_ENDPOINT = re.compile(r"^(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}):(\d+)$")
+
+_rdp_ports = frozenset(DEFAULT_RDP_PORTS)
+
+
+class TcpConnection(NamedTuple):
+    """Linha da tabela de conexões TCP (IPv4)"""
+
+    local_ip: str
+    local_port: int
+    remote_ip: str
+    remote_port: int
+    status: str
+
+
+class RdpSnapshot(NamedTuple):
+    """Conexões RDP estabelecidas em um instante"""
+
+    connections: tuple
+    taken_at: float
+
+    @property
+    def local_ips(self):
+        """IPs locais em uso por RDP, na ordem da tabela"""
+        return list(dict.fromkeys(c.local_ip for c in self.connections))
+
+
+def configure_rdp_ports(ports):
+    """Define as portas consideradas RDP (3389 + portas customizadas)"""
+    global _rdp_ports
+    _rdp_ports = frozenset(int(p) for p in ports) or frozenset(DEFAULT_RDP_PORTS)
+    return _rdp_ports
+
+
+def parse_rdp_ports(text):
+    """Converte "3389, 3390" em tupla de portas válidas"""
+    ports = []
+    for part in str(text).replace(";", ",").split(","):
+        part = part.strip()
+        if part.isdigit() and 0 < int(part) < 65536:
+            ports.append(int(part))
+    return tuple(ports) or DEFAULT_RDP_PORTS
+
+
+def get_rdp_ports():
+    return _rdp_ports
+
+
+class SocketTable:
+    """Interface das fontes da tabela de conexões"""
+
+    def connections(self):
+        """Itera TcpConnection"""
+        raise NotImplementedError
+
+
+class PsutilSocketTable(SocketTable):
+    """Tabela via psutil.net_connections (API nativa, sem processo externo)"""
+
+    def connections(self):
+        for conn in psutil.net_connections(kind="tcp4"):
+            if not conn.raddr:
+                continue
+            yield TcpConnection(
+                conn.laddr.ip, conn.laddr.port, conn.raddr.ip, conn.raddr.port, conn.status
+            )
+
+
+def parse_netstat_output(output):
+    """Interpreta `netstat -an` (Windows ou Linux) em TcpConnection"""
+    for line in output.split("\n"):
+        parts = line.split()
+        if len(parts) < 4 or not parts[0].upper().startswith("TCP"):
+            continue
+        endpoints = [m for m in (_IPV4_ENDPOINT.match(p) for p in parts) if m]
+        if len(endpoints) < 2:
+            continue
+        local, remote = endpoints[0], endpoints[1]
+        status = "ESTABLISHED" if "ESTABLISHED" in parts else parts[-1].upper()
+        yield TcpConnection(
+            local.group(1), int(local.group(2)), remote.group(1), int(remote.group(2)), status
+        )
+
+
+class NetstatSocketTable(SocketTable):
+    """Tabela via `netstat -an` (alternativa quando psutil não está instalado)"""
+
+    def connections(self):
+        result = subprocess.run(["netstat", "-an"], capture_output=True, text=True, timeout=5)
+        if result.returncode != 0:
+            return iter(())
+        return parse_netstat_output(result.stdout)
+
+
+class FakeSocketTable(SocketTable):
+    """Tabela sintética para testes e benchmarks"""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    def connections(self):
+        return iter(self.rows)
+
+    @classmethod
+    def generate(cls, total=10000, rdp_sessions=3, rdp_port=3389, seed=0):
+        """Gera tabela com `total` conexões, das quais `rdp_sessions` são RDP"""
+        rng = random.Random(seed)
+        statuses = ("ESTABLISHED", "TIME_WAIT", "CLOSE_WAIT", "SYN_SENT")
+        rows = []
+        for _ in range(total - rdp_sessions):
+            rows.append(
+                TcpConnection(
+                    f"10.0.0.{rng.randint(1, 254)}",
+                    rng.randint(1024, 65535),
+                    f"172.16.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+                    rng.choice((80, 443, 445, 8080, rng.randint(1024, 65535))),
+                    rng.choice(statuses),
+                )
+            )
+        for index in range(rdp_sessions):
+            rows.insert(
+                rng.randint(0, len(rows)),
+                TcpConnection("10.0.0.5", rdp_port, f"10.0.0.{100 + index}", 50000 + index, "ESTABLISHED"),
+            )
+        return cls(rows)
+
+
+def default_socket_table():
+    """Fonte padrão: psutil quando disponível, senão netstat"""
+    return PsutilSocketTable() if PSUTIL_AVAILABLE else NetstatSocketTable()
+
+
+def take_rdp_snapshot(table=None, ports=None):
+    """Lê a tabela uma vez e filtra as conexões RDP estabelecidas"""
+    table = table or default_socket_table()
+    ports = _rdp_ports if ports is None else frozenset(ports)
+    found = []
+    try:
+        for conn in table.connections():
+            if conn.status != "ESTABLISHED":
+                continue
+            if conn.local_port in ports or conn.remote_port in ports:
+                found.append(conn)
+    except Exception:
+        pass
+    return RdpSnapshot(tuple(found), time.monotonic())
+
+
+def benchmark(total=10000, repetitions=20):
+    """Mede o custo do filtro em uma tabela falsa"""
+    table = FakeSocketTable.generate(total)
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        snapshot = take_rdp_snapshot(table)
+    elapsed = (time.perf_counter() - start) * 1000 / repetitions
+    print(f"{total} conexões: {elapsed:.2f} ms/snapshot, {len(snapshot.connections)} RDP")
+
+    lines = "\n".join(
+        f"  TCP    {c.local_ip}:{c.local_port}    {c.remote_ip}:{c.remote_port}    {c.status}"
+        for c in table.rows
+    )
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        parsed = list(parse_netstat_output(lines))
+    elapsed = (time.perf_counter() - start) * 1000 / repetitions
+    print(f"parse netstat ({len(parsed)} linhas): {elapsed:.2f} ms")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 10000)
+    else:
+        for rdp_conn in take_rdp_snapshot().connections:
+            print(rdp_conn)
@@ -0,0 +1,140 @@
+"""
+Perfil de partida do keep-alive-app.py
+
+Sobe o app em processo novo com -X importtime e --ready-exit, mede o tempo
+até a janela (ou o modo sem janela) ficar pronta e agrega o custo das
+importações por pacote de topo. Falha (código 1) se a partida passar do
+orçamento ou se um módulo pesado (pyautogui, PIL, uiautomation...) for
+importado na partida.
+
+    python keep-alive-app.py --profile-startup [--headless] [--top N] [--runs N]
+"""
+
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import NamedTuple
+
+from headless import READY_EXIT, scratch_control_file
+
+# Orçamento de partida a frio (processo novo até "READY"), em ms
+STARTUP_BUDGET_MS = {"gui": 1500, "headless": 800}
+# Nunca importados na partida (no máximo sob demanda)
+LAZY_MODULES = ("pyautogui", "PIL", "pyscreeze", "pymsgbox", "pytweening", "uiautomation", "comtypes")
+PROFILE_TOP = 15
+PROFILE_RUNS = 3
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+class ImportEntry(NamedTuple):
+    """Uma linha do -X importtime"""
+
+    self_us: int
+    cumulative_us: int
+    depth: int
+    name: str
+
+
+class StartupProfile(NamedTuple):
+    """Resultado de uma partida"""
+
+    mode: str
+    ready_ms: float
+    rss_kb: int
+    imports: list
+
+
+def parse_importtime(text):
+    """Converte a saída de -X importtime em ImportEntry"""
+    entries = []
+    for line in text.splitlines():
+        match = _IMPORTTIME_LINE.match(line.rstrip())
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append(ImportEntry(int(self_us), int(cumulative_us), len(indent) // 2, name))
+    return entries
+
+
+def by_package(entries):
+    """Tempo próprio somado por pacote de topo: [(pacote, us, módulos)]"""
+    totals = {}
+    for entry in entries:
+        package = entry.name.split(".")[0]
+        total, count = totals.get(package, (0, 0))
+        totals[package] = (total + entry.self_us, count + 1)
+    return sorted(((name, us, count) for name, (us, count) in totals.items()), key=lambda item: -item[1])
+
+
+def lazy_violations(entries, lazy=LAZY_MODULES):
+    """Módulos de carga sob demanda importados na partida"""
+    loaded = {entry.name.split(".")[0] for entry in entries}
+    return [name for name in lazy if name in loaded]
+
+
+def profile_once(mode="gui"):
+    """Uma partida a frio do interpretador com -X importtime"""
+    app = os.path.join(os.path.dirname(os.path.abspath(__file__)), "keep-alive-app.py")
+    argv = [sys.executable, "-X", "importtime", app, READY_EXIT]
+    if mode == "headless":
+        argv += ["--headless", "--control-file", scratch_control_file("profile")]
+    start = time.perf_counter()
+    process = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    ready_ms, rss_kb = None, 0
+    for line in process.stdout:
+        if line.startswith("READY ") and ready_ms is None:
+            ready_ms = (time.perf_counter() - start) * 1000
+            rss_kb = int(re.search(r'"rss_kb": (\d+)', line).group(1))
+    try:
+        _, stderr = process.communicate(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        _, stderr = process.communicate()
+    if ready_ms is None:
+        return None
+    return StartupProfile(mode, ready_ms, rss_kb, parse_importtime(stderr))
+
+
+def report(profiles, top=PROFILE_TOP):
+    """Imprime o relatório; retorna a lista de violações do orçamento"""
+    mode = profiles[0].mode
+    fastest = min(profiles, key=lambda p: p.ready_ms)
+    ready = sorted(p.ready_ms for p in profiles)[len(profiles) // 2]
+    imports_ms = sum(e.self_us for e in fastest.imports) / 1000
+    budget = STARTUP_BUDGET_MS[mode]
+
+    print(f"Partida ({mode}): mediana {ready:.0f}ms em {len(profiles)} execuções (orçamento {budget}ms)")
+    print(
+        f"  importações: {imports_ms:.0f}ms em {len(fastest.imports)} módulos;"
+        f" memória {fastest.rss_kb / 1024:.1f} MiB"
+    )
+    print(f"  {'pacote':<24} {'próprio':>9} {'módulos':>8}")
+    for name, self_us, count in by_package(fastest.imports)[:top]:
+        print(f"  {name:<24} {self_us / 1000:>7.1f}ms {count:>8}")
+
+    violations = []
+    if ready > budget:
+        violations.append(f"partida {ready:.0f}ms acima do orçamento de {budget}ms")
+    for name in lazy_violations(fastest.imports):
+        violations.append(f"{name} importado na partida (deve carregar sob demanda)")
+    for violation in violations:
+        print(f"  ORÇAMENTO: {violation}")
+    return violations
+
+
+def main(args):
+    """Ponto de entrada de --profile-startup"""
+    mode = "headless" if "--headless" in args else "gui"
+    top = int(args[args.index("--top") + 1]) if "--top" in args else PROFILE_TOP
+    runs = int(args[args.index("--runs") + 1]) if "--runs" in args else PROFILE_RUNS
+    profiles = [p for p in (profile_once(mode) for _ in range(runs)) if p]
+    if not profiles:
+        print(f"Partida ({mode}): o processo não ficou pronto (dependências ausentes?)", file=sys.stderr)
+        return 1
+    return 1 if report(profiles, top) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,335 @@
+"""
+Políticas do sistema que limitam a inatividade (proteção de tela e RDP)
+
+Os valores de proteção de tela e de Terminal Services são lidos uma vez
+para um PolicySnapshot imutável. O cache só relê quando o TTL expira ou
+quando o Windows notifica mudança nas chaves observadas
+(RegNotifyChangeKeyValue). O cálculo do timeout de inatividade é uma
+função pura sobre o snapshot; a leitura fica atrás de PolicyReader para
+que testes usem dicionários gravados.
+
+    python system_policy.py           # snapshot atual e timeout calculado
+    python -m pytest tests/test_system_policy.py   # casos gravados
+"""
+
+import ctypes
+import sys
+import threading
+import time
+from typing import NamedTuple
+
+try:
+    import win32api
+    import win32con
+
+    PYWIN32_AVAILABLE = True
+except ImportError:
+    PYWIN32_AVAILABLE = False
+
+SPI_GETSCREENSAVETIMEOUT = 0x000E  # SystemParametersInfo action code
+DEFAULT_SCREENSAVER_TIMEOUT = 900  # 15 min (padrão Windows)
+POLICY_TTL = 600  # segundos
+
+# Limites do timeout de inatividade calculado
+SCREEN_TIMEOUT_MAX = 120  # 1/5 da proteção de tela, no máximo 2 min
+RDP_TIMEOUT_MAX = 90  # 1/4 do timeout RDP, no máximo 1,5 min
+ADJUSTED_TIMEOUT_MAX = 120
+
+DESKTOP_KEY = ("HKCU", r"Control Panel\Desktop")
+_TS_BASE_KEY = r"SYSTEM\CurrentControlSet\Control\Terminal Server"
+_TS_POLICY_KEY = r"SOFTWARE\Policies\Microsoft\Windows NT\Terminal Services"
+
+# Chaves RDP em ordem de prioridade (Policies primeiro)
+RDP_POLICY_KEYS = [
+    ("HKLM", _TS_POLICY_KEY),  # GPO aplicada via domínio
+    ("HKCU", _TS_POLICY_KEY),  # Políticas do usuário
+    ("HKLM", _TS_BASE_KEY + r"\WinStations\RDP-Tcp"),  # Configuração local
+    ("HKLM", _TS_BASE_KEY),
+]
+RDP_TIMEOUT_VALUES = [
+    "MaxIdleTime",  # Timeout por inatividade
+    "MaxDisconnectionTime",  # Timeout de desconexão
+    "MaxConnectionTime",  # Tempo máximo de conexão
+    "MaxSessionTime",  # Tempo máximo de sessão
+]
+
+# Chaves observadas para invalidar o cache (subárvores)
+WATCHED_KEYS = [
+    DESKTOP_KEY,
+    ("HKLM", r"SOFTWARE\Policies\Microsoft\Windows NT"),
+    ("HKCU", r"SOFTWARE\Policies\Microsoft\Windows NT"),
+    ("HKLM", _TS_BASE_KEY),
+]
+
+_HIVE_HANDLES = {"HKCU": 0x80000001, "HKLM": 0x80000002}
+
+
+class PolicySnapshot(NamedTuple):
+    """Valores de política lidos em um instante (somente leitura)"""
+
+    screen_saver_timeout: int  # segundos; 0 = desativada
+    screen_saver_source: str  # "spi", "registry" ou "default"
+    rdp_disconnect_time: int  # segundos; 0 = não definido
+    rdp_source: str  # chave onde o timeout RDP foi encontrado
+    rdp_values: tuple  # ((nome, ms), ...) da chave escolhida
+    read_at: float
+
+
+class PolicyReader:
+    """Interface das fontes de política"""
+
+    def screen_saver_spi(self):
+        """Timeout efetivo via SystemParametersInfo (None se indisponível)"""
+        raise NotImplementedError
+
+    def read_key(self, hive, path, names):
+        """{nome: valor} dos valores existentes; None se a chave não existe"""
+        raise NotImplementedError
+
+
+class Win32PolicyReader(PolicyReader):
+    """Leitura real: SystemParametersInfo + registro via pywin32"""
+
+    def screen_saver_spi(self):
+        try:
+            timeout = ctypes.c_int()
+            if ctypes.windll.user32.SystemParametersInfoW(
+                SPI_GETSCREENSAVETIMEOUT, 0, ctypes.byref(timeout), 0
+            ):
+                return timeout.value
+        except Exception:
+            pass
+        return None
+
+    def read_key(self, hive, path, names):
+        hive_handle = {
+            "HKCU": win32con.HKEY_CURRENT_USER,
+            "HKLM": win32con.HKEY_LOCAL_MACHINE,
+        }[hive]
+        try:
+            key = win32api.RegOpenKeyEx(hive_handle, path, 0, win32con.KEY_READ)
+        except Exception:
+            return None
+        values = {}
+        try:
+            for name in names:
+                try:
+                    values[name], _ = win32api.RegQueryValueEx(key, name)
+                except Exception:
+                    continue
+        finally:
+            win32api.RegCloseKey(key)
+        return values
+
+
+class RecordedPolicyReader(PolicyReader):
+    """Políticas gravadas: {"spi": int|None, (hive, path): {nome: valor}}"""
+
+    def __init__(self, recorded):
+        self.recorded = recorded
+        self.key_reads = 0
+
+    def screen_saver_spi(self):
+        return self.recorded.get("spi")
+
+    def read_key(self, hive, path, names):
+        self.key_reads += 1
+        values = self.recorded.get((hive, path))
+        if values is None:
+            return None
+        return {name: values[name] for name in names if name in values}
+
+
+class NullPolicyReader(PolicyReader):
+    """Sem acesso ao sistema: nenhuma política definida"""
+
+    def screen_saver_spi(self):
+        return None
+
+    def read_key(self, hive, path, names):
+        return None
+
+
+def default_policy_reader():
+    """Fonte padrão da plataforma"""
+    if sys.platform == "win32" and PYWIN32_AVAILABLE:
+        return Win32PolicyReader()
+    return NullPolicyReader()
+
+
+def _parse_registry_int(value):
+    """ScreenSaveTimeOut é REG_SZ (às vezes bytes com \\0)"""
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode("ascii", errors="ignore")
+    return int(str(value).split("\0", 1)[0].strip())
+
+
+def read_policy_snapshot(reader, clock=time.monotonic):
+    """Lê todas as políticas uma vez e monta o snapshot"""
+    # 1. SystemParametersInfo (respeita GPO/AD) 2. registro 3. padrão
+    screen_saver = reader.screen_saver_spi()
+    screen_source = "spi"
+    if screen_saver is None:
+        try:
+            values = reader.read_key(*DESKTOP_KEY, ["ScreenSaveTimeOut"]) or {}
+            screen_saver = _parse_registry_int(values["ScreenSaveTimeOut"])
+            screen_source = "registry"
+        except Exception:
+            screen_saver = DEFAULT_SCREENSAVER_TIMEOUT
+            screen_source = "default"
+
+    # RDP: primeira chave com algum valor positivo; vale o menor
+    rdp_time, rdp_source, rdp_values = 0, "", ()
+    for hive, path in RDP_POLICY_KEYS:
+        try:
+            values = reader.read_key(hive, path, RDP_TIMEOUT_VALUES)
+        except Exception:
+            continue
+        if not values:
+            continue
+        found = [(n, v) for n, v in values.items() if isinstance(v, int) and v > 0]
+        if found:
+            rdp_time = int(min(v for _, v in found) / 1000)  # ms para segundos
+            rdp_source = f"{hive}\\{path}"
+            rdp_values = tuple(found)
+            break
+
+    return PolicySnapshot(screen_saver, screen_source, rdp_time, rdp_source, rdp_values, clock())
+
+
+def compute_user_timeout(snapshot, minimum, default):
+    """Timeout de inatividade derivado das políticas (função pura)
+
+    Proteção de tela: 1/5, limitado a SCREEN_TIMEOUT_MAX
+    RDP: 1/4, limitado a RDP_TIMEOUT_MAX
+    Vale o menor; sem políticas usa `default`; resultado em [minimum, ADJUSTED_TIMEOUT_MAX]
+    """
+    candidates = []
+    if snapshot.screen_saver_timeout > 0:
+        screen_timeout = max(int(snapshot.screen_saver_timeout / 5.0), minimum)
+        candidates.append(min(screen_timeout, SCREEN_TIMEOUT_MAX))
+    if snapshot.rdp_disconnect_time > 0:
+        rdp_timeout = max(int(snapshot.rdp_disconnect_time / 4.0), minimum)
+        candidates.append(min(rdp_timeout, RDP_TIMEOUT_MAX))
+    final_timeout = min(candidates) if candidates else default
+    return max(min(final_timeout, ADJUSTED_TIMEOUT_MAX), minimum)
+
+
+class PolicyCache:
+    """Cache do PolicySnapshot com TTL e invalidação por mudança no registro"""
+
+    def __init__(self, reader=None, ttl=POLICY_TTL, clock=time.monotonic):
+        self.reader = reader or default_policy_reader()
+        self.ttl = ttl
+        self.clock = clock
+        self._cache = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._watch_thread = None
+
+    def get(self):
+        """Retorna o PolicySnapshot vigente"""
+        entry = self._cache.get("policy")
+        if entry is not None and self.clock() < entry[1]:
+            self.hits += 1
+            return entry[0]
+        with self._lock:
+            entry = self._cache.get("policy")
+            if entry is not None and self.clock() < entry[1]:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            snapshot = read_policy_snapshot(self.reader, self.clock)
+            self._cache["policy"] = (snapshot, self.clock() + self.ttl)
+            return snapshot
+
+    def invalidate(self):
+        """Descarta o snapshot; a próxima consulta relê as políticas"""
+        if self._cache.pop("policy", None) is not None:
+            self.invalidations += 1
+
+    def stats(self):
+        """Contadores do cache"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def start_change_watch(self, keys=None):
+        """Thread que aguarda RegNotifyChangeKeyValue (Windows) e invalida o cache"""
+        if sys.platform != "win32" or self._watch_thread is not None:
+            return False
+        try:
+            advapi32 = ctypes.windll.advapi32
+            kernel32 = ctypes.windll.kernel32
+        except Exception:
+            return False
+
+        KEY_NOTIFY = 0x0010
+        REG_NOTIFY_CHANGE_NAME = 0x00000001
+        REG_NOTIFY_CHANGE_LAST_SET = 0x00000004
+        notify_filter = REG_NOTIFY_CHANGE_NAME | REG_NOTIFY_CHANGE_LAST_SET
+
+        watched = []
+        for hive, path in keys or WATCHED_KEYS:
+            handle = ctypes.c_void_p()
+            if advapi32.RegOpenKeyExW(
+                ctypes.c_void_p(_HIVE_HANDLES[hive]), path, 0, KEY_NOTIFY, ctypes.byref(handle)
+            ):
+                continue  # chave ausente (ex.: sem GPO): nada a observar
+            event = kernel32.CreateEventW(None, False, False, None)
+            watched.append((handle, ctypes.c_void_p(event)))
+        if not watched:
+            return False
+
+        def arm(handle, event):
+            return advapi32.RegNotifyChangeKeyValue(handle, True, notify_filter, event, True) == 0
+
+        def watch():
+            for handle, event in watched:
+                arm(handle, event)
+            events = (ctypes.c_void_p * len(watched))(*(e for _, e in watched))
+            while True:
+                try:
+                    index = kernel32.WaitForMultipleObjects(len(watched), events, False, 0xFFFFFFFF)
+                    if not 0 <= index < len(watched):
+                        return
+                    self.invalidate()
+                    # Notificação vale uma vez: rearma a chave que mudou
+                    if not arm(*watched[index]):
+                        return
+                except Exception:
+                    return
+
+        self._watch_thread = threading.Thread(target=watch, name="policy-change-watch", daemon=True)
+        self._watch_thread.start()
+        return True
+
+
+_policy_cache = PolicyCache()
+
+
+def get_policy_cache():
+    """Instância compartilhada do cache de políticas"""
+    return _policy_cache
+
+
+def get_screen_saver_timeout():
+    """Timeout da proteção de tela em segundos (0 = desativada)"""
+    return _policy_cache.get().screen_saver_timeout
+
+
+def get_rdp_disconnect_time():
+    """Menor timeout RDP da chave de maior prioridade, em segundos (0 = não definido)"""
+    return _policy_cache.get().rdp_disconnect_time
+
+
+if __name__ == "__main__":
+    policy = get_policy_cache().get()
+    print(policy)
+    print(f"Timeout de inatividade: {compute_user_timeout(policy, 30, 60)}s")
@@ -6,21 +6,111 @@ import random
 import subprocess
 import time
 
-import pyautogui
 import win32con
 import win32gui
 
-# Novo import para UI Automation
-try:
-    import uiautomation as auto
+from uia_locator import ElementLocator, is_avatar_button
 
-    UI_AUTOMATION_AVAILABLE = True
-    print("DEBUG TEAMS: UI Automation disponível")
-except ImportError:
-    UI_AUTOMATION_AVAILABLE = False
-    print(
-        "DEBUG TEAMS: UI Automation não disponível. Instale com: pip install uiautomation"
-    )
+# UI Automation (comtypes + UIAutomationCore) e pyautogui (PIL) são pesados:
+# importados só na primeira verificação
+_uiautomation = None
+_uiautomation_checked = False
+
+
+def load_uiautomation():
+    """Importa uiautomation no primeiro uso; None se não instalado"""
+    global _uiautomation, _uiautomation_checked
+    if not _uiautomation_checked:
+        _uiautomation_checked = True
+        try:
+            import uiautomation
+
+            _uiautomation = uiautomation
+            print("DEBUG TEAMS: UI Automation disponível")
+        except ImportError:
+            print(
+                "DEBUG TEAMS: UI Automation não disponível. Instale com: pip install uiautomation"
+            )
+    return _uiautomation
+
+
+def find_teams_windows(auto):
+    """Janelas de topo do Teams via UI Automation"""
+    found_windows = []
+    try:
+        # Enumera todas as janelas top-level
+        all_windows = auto.GetRootControl().GetChildren()
+        print(f"DEBUG TEAMS: Verificando {len(all_windows)} janelas...")
+
+        for window in all_windows:
+            try:
+                if hasattr(window, "Name") and window.Name:
+                    window_name = window.Name
+                    if "microsoft teams" in window_name.lower():
+                        print(f"DEBUG TEAMS: Janela Teams encontrada: '{window_name}'")
+                        found_windows.append(window)
+            except Exception:
+                continue
+    except Exception as e:
+        print(f"DEBUG TEAMS: Erro ao enumerar janelas: {str(e)}")
+
+    return found_windows
+
+
+_avatar_locator = None
+
+
+def get_avatar_locator(auto):
+    """Localizador compartilhado do botão do avatar"""
+    global _avatar_locator
+    if _avatar_locator is None:
+        _avatar_locator = ElementLocator(lambda: find_teams_windows(auto), is_avatar_button)
+    return _avatar_locator
+
+
+def parse_avatar_status(button_text):
+    """Status a partir do nome do botão do avatar ("... status exibido como Ausente")"""
+    print(f"DEBUG TEAMS: Texto do avatar: '{button_text}'")
+
+    # Procura a palavra após "as" ou "como"
+    words = button_text.split()
+    status_raw = None
+    for i, word in enumerate(words):
+        if word.lower() in ["as", "como"] and i + 1 < len(words):
+            status_raw = words[i + 1].strip(".,!").strip()
+            break
+
+    if not status_raw and words:
+        status_raw = words[-1].strip(".,!").strip()
+
+    if not status_raw:
+        return None
+    print(f"DEBUG TEAMS: Status extraído: '{status_raw}'")
+
+    # Mapeia status (sem emojis)
+    status_map = {
+        "Available": "DISPONÍVEL",
+        "Online": "DISPONÍVEL",
+        "Disponível": "DISPONÍVEL",
+        "Busy": "OCUPADO",
+        "Ocupado": "OCUPADO",
+        "InAMeeting": "OCUPADO",
+        "Away": "AUSENTE",
+        "Ausente": "AUSENTE",
+        "BeRightBack": "AUSENTE",
+        "Volto": "AUSENTE",
+        "DoNotDisturb": "NÃO_PERTURBE",
+        "Dnd": "NÃO_PERTURBE",
+        "Não": "NÃO_PERTURBE",
+        "incomodar": "NÃO_PERTURBE",
+        "Offline": "OFFLINE",
+        "Desconectado": "OFFLINE",
+        "offline": "OFFLINE",
+    }
+    for key, value in status_map.items():
+        if key.lower() in status_raw.lower():
+            return value
+    return status_raw.upper()
 
 
 def get_teams_status():
@@ -29,185 +119,22 @@ def get_teams_status():
         print("DEBUG TEAMS: Iniciando verificação de status do Teams...")
 
         # Método 0: UI Automation - NOVO MÉTODO PRINCIPAL
-        if UI_AUTOMATION_AVAILABLE:
+        auto = load_uiautomation()
+        if auto is not None:
             print("DEBUG TEAMS: Método 0 - UI Automation (lendo avatar)...")
             try:
-                print("DEBUG TEAMS: Procurando janelas Teams com UI Automation...")
-
-                # Busca todas as janelas e filtra as do Teams
-                teams_windows_found = []
-
-                # Método alternativo: busca por todas as janelas que terminam com "Microsoft Teams"
-                def find_teams_windows():
-                    found_windows = []
-                    try:
-                        # Enumera todas as janelas top-level
-                        all_windows = auto.GetRootControl().GetChildren()
-                        print(f"DEBUG TEAMS: Verificando {len(all_windows)} janelas...")
-
-                        for window in all_windows:
-                            try:
-                                if hasattr(window, "Name") and window.Name:
-                                    window_name = window.Name
-                                    if "microsoft teams" in window_name.lower():
-                                        print(
-                                            f"DEBUG TEAMS: Janela Teams encontrada: '{window_name}'"
-                                        )
-                                        found_windows.append(window)
-                            except Exception:
-                                continue
-                    except Exception as e:
-                        print(f"DEBUG TEAMS: Erro ao enumerar janelas: {str(e)}")
-
-                    return found_windows
-
-                teams_windows_found = find_teams_windows()
-
-                if not teams_windows_found:
-                    print(
-                        "DEBUG TEAMS: Nenhuma janela Teams encontrada via UI Automation"
-                    )
+                # Avatar em cache; varre janelas e árvore só quando ele some
+                locator = get_avatar_locator(auto)
+                avatar_button = locator.locate()
+                print(f"DEBUG TEAMS: Localizador do avatar: {locator.summary()}")
+
+                if avatar_button:
+                    final_status = parse_avatar_status(avatar_button.Name)
+                    if final_status:
+                        print(f"DEBUG TEAMS: Status final via UI Automation: {final_status}")
+                        return final_status, f"UI Automation: {final_status}"
                 else:
-                    print(
-                        f"DEBUG TEAMS: {len(teams_windows_found)} janela(s) Teams encontrada(s)"
-                    )
-
-                    # Para cada janela Teams, procura o botão do avatar
-                    for teams_window in teams_windows_found:
-                        try:
-                            print(
-                                f"DEBUG TEAMS: Analisando janela: '{teams_window.Name}'"
-                            )
-
-                            # Procura botões na janela
-                            buttons = teams_window.GetChildren()
-                            print(
-                                f"DEBUG TEAMS: Verificando {len(buttons)} elementos na janela..."
-                            )
-
-                            def search_avatar_button(element, depth=0):
-                                if depth > 3:  # Limita profundidade para evitar loops
-                                    return None
-
-                                try:
-                                    if (
-                                        hasattr(element, "ControlTypeName")
-                                        and element.ControlTypeName == "Button"
-                                        and hasattr(element, "Name")
-                                        and element.Name
-                                    ):
-
-                                        name_lower = element.Name.lower()
-                                        print(
-                                            f"DEBUG TEAMS: Botão encontrado: '{element.Name}'"
-                                        )
-
-                                        # Verifica frases-chave de status
-                                        status_phrases = [
-                                            "status displayed as",
-                                            "status exibido como",
-                                            "com status exibido como",
-                                            "profile picture",
-                                            "foto de perfil",
-                                            "your avatar",
-                                            "seu avatar",
-                                        ]
-
-                                        if any(
-                                            phrase in name_lower
-                                            for phrase in status_phrases
-                                        ):
-                                            print(
-                                                f"DEBUG TEAMS: AVATAR ENCONTRADO: '{element.Name}'"
-                                            )
-                                            return element
-
-                                    # Busca recursivamente nos filhos
-                                    for child in element.GetChildren():
-                                        result = search_avatar_button(child, depth + 1)
-                                        if result:
-                                            return result
-
-                                except Exception:
-                                    pass
-
-                                return None
-
-                            avatar_button = search_avatar_button(teams_window)
-
-                            if avatar_button:
-                                # Extrai status do nome do botão
-                                button_text = avatar_button.Name
-                                print(f"DEBUG TEAMS: Texto do avatar: '{button_text}'")
-
-                                # Procura por palavras de status no texto
-                                words = button_text.split()
-                                status_raw = None
-
-                                # Procura a palavra após "as" ou "como"
-                                for i, word in enumerate(words):
-                                    if word.lower() in ["as", "como"] and i + 1 < len(
-                                        words
-                                    ):
-                                        status_raw = words[i + 1].strip(".,!").strip()
-                                        break
-
-                                if not status_raw and words:
-                                    status_raw = words[-1].strip(".,!").strip()
-
-                                if status_raw:
-                                    print(
-                                        f"DEBUG TEAMS: Status extraído: '{status_raw}'"
-                                    )
-
-                                    # Mapeia status (sem emojis)
-                                    status_map = {
-                                        "Available": "DISPONÍVEL",
-                                        "Online": "DISPONÍVEL",
-                                        "Disponível": "DISPONÍVEL",
-                                        "Busy": "OCUPADO",
-                                        "Ocupado": "OCUPADO",
-                                        "InAMeeting": "OCUPADO",
-                                        "Away": "AUSENTE",
-                                        "Ausente": "AUSENTE",
-                                        "BeRightBack": "AUSENTE",
-                                        "Volto": "AUSENTE",
-                                        "DoNotDisturb": "NÃO_PERTURBE",
-                                        "Dnd": "NÃO_PERTURBE",
-                                        "Não": "NÃO_PERTURBE",
-                                        "incomodar": "NÃO_PERTURBE",
-                                        "Offline": "OFFLINE",
-                                        "Desconectado": "OFFLINE",
-                                        "offline": "OFFLINE",
-                                    }
-
-                                    # Busca mapeamento
-                                    final_status = None
-                                    for key, value in status_map.items():
-                                        if key.lower() in status_raw.lower():
-                                            final_status = value
-                                            break
-
-                                    if not final_status:
-                                        final_status = status_raw.upper()
-
-                                    print(
-                                        f"DEBUG TEAMS: Status final via UI Automation: {final_status}"
-                                    )
-                                    return (
-                                        final_status,
-                                        f"UI Automation: {final_status}",
-                                    )
-
-                        except Exception as e:
-                            print(
-                                f"DEBUG TEAMS: Erro ao analisar janela Teams: {str(e)}"
-                            )
-                            continue
-
-                    print(
-                        "DEBUG TEAMS: Botão do avatar não encontrado em nenhuma janela"
-                    )
+                    print("DEBUG TEAMS: Botão do avatar não encontrado em nenhuma janela")
 
             except Exception as e:
                 print(f"DEBUG TEAMS: Erro no UI Automation: {str(e)}")
@@ -356,6 +283,8 @@ def get_teams_status():
         # Método 3: Fallback simples - só verifica se está rodando
         print("DEBUG TEAMS: Método 3 - Fallback com pyautogui...")
         try:
+            import pyautogui
+
             teams_found = False
             windows_count = 0
             for window in pyautogui.getAllWindows():
@@ -431,6 +360,8 @@ def monitor_teams_continuous():
                     last_status = status
                 else:
                     print(f"[{timestamp}] Status: {status}")
+                if _avatar_locator is not None:
+                    print(f"[{timestamp}] Localizador do avatar: {_avatar_locator.summary()}")
             else:
                 print(".", end="", flush=True)
 
@@ -449,7 +380,7 @@ if __name__ == "__main__":
     print("=" * 30)
 
     # Verifica se UI Automation está disponível
-    if UI_AUTOMATION_AVAILABLE:
+    if load_uiautomation() is not None:
         print("UI Automation: Disponível")
     else:
         print("UI Automation: Não disponível")
@@ -0,0 +1,546 @@
+"""
+Sessão WebSocket persistente com o Teams (Electron)
+
+TeamsConnection mantém uma única conexão viva: heartbeat (ping/pong com
+tempo de resposta) detecta conexões mortas, a reconexão usa backoff
+exponencial com jitter e as requisições em andamento são associadas às
+respostas pelo campo "id" (várias ao mesmo tempo, em qualquer ordem), em
+vez do par estrito send() + recv().
+
+PortDiscovery acha a porta do WebSocket: primeiro a última porta boa
+(guardada em disco) e as preferidas, depois a faixa inteira em paralelo
+(asyncio.gather + semáforo). Cada porta passa antes por um connect TCP
+barato; o handshake WebSocket só acontece onde há alguém escutando.
+
+LoopCalls agenda essas corrotinas a partir da thread do Qt sem esperar
+(.result()): cada chamada tem prazo próprio, entrega o desfecho por
+callback, pode ser cancelada e alimenta CallMetrics (latência/timeouts).
+
+Sem Qt: roda em qualquer loop asyncio e avisa mudanças de estado por
+callback (o app Electron repassa para TeamsSignals).
+
+    python -m pytest tests/test_teams_ipc.py   # contra um servidor websockets local
+    python teams_ipc.py --bench   # descoberta paralela x sequencial
+"""
+
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from enum import Enum
+
+import websockets
+
+IPC_HEARTBEAT_S = 15.0
+IPC_HEARTBEAT_TIMEOUT_S = 5.0
+IPC_REQUEST_TIMEOUT_S = 5.0
+IPC_CONNECT_TIMEOUT_S = 3.0
+IPC_BACKOFF_MIN_S = 0.5
+IPC_BACKOFF_MAX_S = 30.0
+DISCOVERY_CONCURRENCY = 64
+DISCOVERY_TCP_TIMEOUT_S = 0.2
+DISCOVERY_WS_TIMEOUT_S = 0.5
+DISCOVERY_CACHE_FILENAME = "teams_ws_port.json"
+
+
+class ConnectionState(Enum):
+    """Estados da sessão"""
+
+    DISCONNECTED = "disconnected"
+    CONNECTING = "connecting"
+    CONNECTED = "connected"
+    CLOSED = "closed"
+
+
+class TeamsIpcError(Exception):
+    """Falha de requisição (sem conexão, tempo esgotado ou conexão perdida)"""
+
+
+def backoff_delay(attempt, minimum=IPC_BACKOFF_MIN_S, maximum=IPC_BACKOFF_MAX_S, rng=random):
+    """Espera antes da tentativa `attempt` (0, 1, ...): exponencial com jitter"""
+    ceiling = min(maximum, minimum * 2**attempt)
+    return rng.uniform(ceiling / 2, ceiling)
+
+
+class CallMetrics:
+    """Latência e desfecho (ok, timeout, erro, cancelada) por operação"""
+
+    OUTCOMES = ("ok", "timeout", "erro", "cancelada")
+
+    def __init__(self):
+        self.operations = {}
+        self._lock = threading.Lock()
+
+    def record(self, operation, outcome, elapsed_ms):
+        with self._lock:
+            entry = self.operations.setdefault(
+                operation, dict({o: 0 for o in self.OUTCOMES}, calls=0, total_ms=0.0, max_ms=0.0, last_ms=0.0)
+            )
+            entry["calls"] += 1
+            entry[outcome] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["last_ms"] = elapsed_ms
+
+    def stats(self):
+        with self._lock:
+            return {
+                operation: dict(
+                    {o: entry[o] for o in self.OUTCOMES},
+                    calls=entry["calls"],
+                    avg_ms=round(entry["total_ms"] / entry["calls"], 1),
+                    max_ms=round(entry["max_ms"], 1),
+                    last_ms=round(entry["last_ms"], 1),
+                )
+                for operation, entry in self.operations.items()
+            }
+
+    def summary(self):
+        """Resumo compacto para o log"""
+        parts = []
+        for operation, entry in sorted(self.stats().items()):
+            outcomes = " ".join(f"{o}={entry[o]}" for o in self.OUTCOMES if entry[o])
+            parts.append(
+                f"{operation}: n={entry['calls']} {outcomes} avg={entry['avg_ms']:.0f}ms max={entry['max_ms']:.0f}ms"
+            )
+        return "; ".join(parts) or "sem chamadas"
+
+
+class LoopCalls:
+    """Corrotinas agendadas de outra thread (Qt) sem bloquear: prazo, métrica e cancelamento"""
+
+    def __init__(self, loop, metrics=None):
+        self.loop = loop
+        self.metrics = metrics or CallMetrics()
+        self._inflight = set()
+        self._lock = threading.Lock()
+
+    def submit(self, operation, coro, timeout, on_result):
+        """Agenda `coro` no loop; on_result(desfecho, valor ou erro) roda na thread do loop"""
+        start = time.perf_counter()
+
+        def done(future):
+            with self._lock:
+                self._inflight.discard(future)
+            if future.cancelled():
+                outcome, value = "cancelada", "Operação cancelada"
+            elif future.exception() is None:
+                outcome, value = "ok", future.result()
+            elif isinstance(future.exception(), asyncio.TimeoutError):
+                outcome, value = "timeout", f"Sem resposta em {timeout}s"
+            else:
+                outcome, value = "erro", str(future.exception())
+            self.metrics.record(operation, outcome, (time.perf_counter() - start) * 1000)
+            try:
+                on_result(outcome, value)
+            except Exception as e:
+                print(f"[DEBUG] Erro no retorno de {operation}: {e}")
+
+        future = asyncio.run_coroutine_threadsafe(asyncio.wait_for(coro, timeout), self.loop)
+        with self._lock:
+            self._inflight.add(future)
+        future.add_done_callback(done)
+        return future
+
+    def pending(self):
+        with self._lock:
+            return len(self._inflight)
+
+    def cancel_all(self):
+        """Cancela tudo o que ainda não terminou (ex.: ao fechar)"""
+        with self._lock:
+            inflight = list(self._inflight)
+        for future in inflight:
+            future.cancel()
+        return len(inflight)
+
+
+def default_discovery_cache():
+    """Arquivo da última porta boa (LOCALAPPDATA no Windows, home nos demais)"""
+    base = os.getenv("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "KeepAliveRDP", DISCOVERY_CACHE_FILENAME)
+
+
+async def tcp_listening(port, host="127.0.0.1", timeout=DISCOVERY_TCP_TIMEOUT_S):
+    """Connect TCP simples: há algo escutando na porta?"""
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True
+
+
+async def websocket_handshake(port, host="127.0.0.1", timeout=DISCOVERY_WS_TIMEOUT_S):
+    """Handshake WebSocket completo (usado só depois do connect TCP)"""
+    try:
+        websocket = await asyncio.wait_for(
+            websockets.connect(f"ws://{host}:{port}", ping_interval=None, open_timeout=timeout), timeout
+        )
+    except Exception:
+        return False
+    await websocket.close()
+    return True
+
+
+class PortDiscovery:
+    """Descoberta da porta WebSocket com paralelismo limitado e cache em disco"""
+
+    def __init__(
+        self,
+        ports,
+        handshake=websocket_handshake,
+        concurrency=DISCOVERY_CONCURRENCY,
+        cache_path=None,
+        host="127.0.0.1",
+        tcp_timeout_s=DISCOVERY_TCP_TIMEOUT_S,
+    ):
+        self.ports = list(ports)
+        self.handshake = handshake  # corrotina porta -> bool
+        self.concurrency = max(1, int(concurrency))
+        self.cache_path = default_discovery_cache() if cache_path is None else cache_path
+        self.host = host
+        self.tcp_timeout_s = tcp_timeout_s
+        self.last_port = self._load()
+        self.tcp_checks = 0
+        self.handshakes = 0
+        self.last_ms = None
+        self.last_source = None
+        self._inflight = None  # descoberta em andamento (chamadas simultâneas aguardam a mesma)
+
+    def _load(self):
+        if not self.cache_path:
+            return None
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                port = json.load(f).get("port")
+            return port if isinstance(port, int) else None
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def _save(self, port):
+        self.last_port = port
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                json.dump({"port": port, "found_at": time.time()}, f)
+        except OSError as e:
+            print(f"[DEBUG] Erro ao gravar cache da porta do Teams: {e}")
+
+    async def _probe(self, port):
+        self.tcp_checks += 1
+        if not await tcp_listening(port, self.host, self.tcp_timeout_s):
+            return False
+        self.handshakes += 1
+        return await self.handshake(port)
+
+    async def _scan(self, ports):
+        """Varredura paralela; a primeira porta válida encerra as demais"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        found = asyncio.Event()
+
+        async def probe(port):
+            async with semaphore:
+                if found.is_set():
+                    return None
+                if await self._probe(port):
+                    found.set()
+                    return port
+                return None
+
+        results = await asyncio.gather(*(probe(port) for port in ports))
+        return next((port for port in results if port is not None), None)
+
+    async def discover(self, preferred=()):
+        """Porta WebSocket ativa ou None (última boa e preferidas antes da faixa)"""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._discover(preferred))
+        return await asyncio.shield(self._inflight)
+
+    async def _discover(self, preferred):
+        start = time.perf_counter()
+        first = []
+        for port in (self.last_port, *preferred):
+            if port and port not in first:
+                first.append(port)
+        port, source = None, None
+        for candidate in first:
+            if await self._probe(candidate):
+                port, source = candidate, "cache" if candidate == self.last_port else "preferida"
+                break
+        if port is None:
+            port = await self._scan([p for p in self.ports if p not in first])
+            source = "varredura" if port else None
+        if port is not None and port != self.last_port:
+            self._save(port)
+        self.last_ms = (time.perf_counter() - start) * 1000
+        self.last_source = source
+        return port
+
+    def stats(self):
+        return {
+            "last_port": self.last_port,
+            "source": self.last_source,
+            "last_ms": round(self.last_ms, 1) if self.last_ms is not None else None,
+            "tcp_checks": self.tcp_checks,
+            "handshakes": self.handshakes,
+        }
+
+
+class TeamsConnection:
+    """Conexão WebSocket de longa duração com multiplexação por id"""
+
+    def __init__(
+        self,
+        url_source,
+        on_state=None,
+        heartbeat_s=IPC_HEARTBEAT_S,
+        heartbeat_timeout_s=IPC_HEARTBEAT_TIMEOUT_S,
+        connect_timeout_s=IPC_CONNECT_TIMEOUT_S,
+        backoff_min_s=IPC_BACKOFF_MIN_S,
+        backoff_max_s=IPC_BACKOFF_MAX_S,
+    ):
+        # url_source: URL fixa ou corrotina que descobre a URL a cada conexão
+        self.url_source = url_source
+        self.on_state = on_state
+        self.heartbeat_s = heartbeat_s
+        self.heartbeat_timeout_s = heartbeat_timeout_s
+        self.connect_timeout_s = connect_timeout_s
+        self.backoff_min_s = backoff_min_s
+        self.backoff_max_s = backoff_max_s
+        self.state = ConnectionState.DISCONNECTED
+        self.websocket = None
+        self._pending = {}  # id -> Future da resposta
+        self._connected = None  # asyncio.Event (criado no loop)
+        self._supervisor = None
+        self.connects = 0
+        self.reconnects = 0
+        self.heartbeat_failures = 0
+        self.last_rtt_ms = None
+        self.unmatched = 0
+
+    def _set_state(self, state, detail=""):
+        if state is self.state:
+            return
+        self.state = state
+        if state is ConnectionState.CONNECTED:
+            self._connected.set()
+        else:
+            self._connected.clear()
+        if self.on_state:
+            try:
+                self.on_state(state, detail)
+            except Exception as e:
+                print(f"[DEBUG] Erro no callback de estado IPC: {e}")
+
+    def start(self):
+        """Inicia a supervisão (conecta e reconecta); chamar dentro do loop"""
+        if self._supervisor is None or self._supervisor.done():
+            self._connected = self._connected or asyncio.Event()
+            self._supervisor = asyncio.ensure_future(self._supervise())
+        return self._supervisor
+
+    async def wait_connected(self, timeout=None):
+        """True se conectado dentro do prazo"""
+        self.start()
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _resolve_url(self):
+        if callable(self.url_source):
+            return await self.url_source()
+        return self.url_source
+
+    async def _supervise(self):
+        attempt = 0
+        while self.state is not ConnectionState.CLOSED:
+            self._set_state(ConnectionState.CONNECTING)
+            try:
+                url = await self._resolve_url()
+                if not url:
+                    raise TeamsIpcError("Porta WebSocket não encontrada")
+                self.websocket = await asyncio.wait_for(
+                    websockets.connect(url, ping_interval=None, open_timeout=self.connect_timeout_s),
+                    self.connect_timeout_s,
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._set_state(ConnectionState.DISCONNECTED, str(e))
+                await asyncio.sleep(backoff_delay(attempt, self.backoff_min_s, self.backoff_max_s))
+                attempt += 1
+                continue
+
+            attempt = 0
+            self.connects += 1
+            if self.connects > 1:
+                self.reconnects += 1
+            self._set_state(ConnectionState.CONNECTED, url)
+            heartbeat = asyncio.ensure_future(self._heartbeat(self.websocket))
+            try:
+                await self._read(self.websocket)
+                detail = "Conexão encerrada pelo Teams"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                detail = f"Conexão perdida: {e}"
+            finally:
+                heartbeat.cancel()
+                self._fail_pending(TeamsIpcError("Conexão perdida"))
+                await self._close_socket()
+            if self.state is not ConnectionState.CLOSED:
+                self._set_state(ConnectionState.DISCONNECTED, detail)
+                await asyncio.sleep(backoff_delay(0, self.backoff_min_s, self.backoff_max_s))
+
+    async def _read(self, websocket):
+        """Entrega cada resposta à requisição de mesmo id"""
+        async for raw in websocket:
+            try:
+                message = json.loads(raw)
+            except ValueError:
+                self.unmatched += 1
+                continue
+            future = self._pending.pop(message.get("id"), None) if isinstance(message, dict) else None
+            if future is None:
+                # Eventos do Teams ou resposta de requisição já expirada
+                self.unmatched += 1
+            elif not future.done():
+                future.set_result(message)
+
+    async def _heartbeat(self, websocket):
+        """Ping periódico; sem pong no prazo, derruba a conexão (reconecta)"""
+        while True:
+            await asyncio.sleep(self.heartbeat_s)
+            start = time.perf_counter()
+            try:
+                pong = await websocket.ping()
+                await asyncio.wait_for(pong, self.heartbeat_timeout_s)
+                self.last_rtt_ms = (time.perf_counter() - start) * 1000
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.heartbeat_failures += 1
+                await websocket.close()
+                return
+
+    async def _close_socket(self):
+        websocket, self.websocket = self.websocket, None
+        if websocket is not None:
+            try:
+                await websocket.close()
+            except Exception:
+                pass
+
+    def _fail_pending(self, error):
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    async def request(self, method, params=None, timeout=IPC_REQUEST_TIMEOUT_S):
+        """Envia {"id", "method", "params"} e aguarda a resposta de mesmo id"""
+        if self.state is not ConnectionState.CONNECTED or self.websocket is None:
+            raise TeamsIpcError("Não conectado")
+        message_id = str(uuid.uuid4())
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        try:
+            await self.websocket.send(json.dumps({"id": message_id, "method": method, "params": params or {}}))
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise TeamsIpcError(f"Sem resposta em {timeout}s ({method})")
+        except TeamsIpcError:
+            raise
+        except Exception as e:
+            raise TeamsIpcError(f"Erro ao enviar {method}: {e}")
+        finally:
+            self._pending.pop(message_id, None)
+
+    async def close(self):
+        """Encerra a sessão e falha as requisições pendentes"""
+        if self._connected is None:
+            self.state = ConnectionState.CLOSED
+            return
+        self._set_state(ConnectionState.CLOSED)
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            try:
+                await self._supervisor
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._fail_pending(TeamsIpcError("Conexão fechada"))
+        await self._close_socket()
+
+    def stats(self):
+        return {
+            "state": self.state.value,
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "heartbeat_failures": self.heartbeat_failures,
+            "last_rtt_ms": round(self.last_rtt_ms, 1) if self.last_rtt_ms is not None else None,
+            "pending": len(self._pending),
+            "unmatched": self.unmatched,
+        }
+
+
+async def stub_server(port=0, delay_for=None):
+    """Servidor local que responde {"id", "result"} (fora de ordem se delay_for)"""
+
+    async def handler(websocket):
+        async def reply(message):
+            await asyncio.sleep(delay_for(message) if delay_for else 0)
+            try:
+                await websocket.send(json.dumps({"id": message["id"], "result": message["params"]}))
+            except websockets.ConnectionClosed:
+                pass
+
+        tasks = set()
+        try:
+            async for raw in websocket:
+                task = asyncio.ensure_future(reply(json.loads(raw)))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except Exception:
+            pass
+
+    return await websockets.serve(handler, "127.0.0.1", port)
+
+
+async def _bench(span=1000, concurrency=DISCOVERY_CONCURRENCY):
+    server = await stub_server()
+    port = server.sockets[0].getsockname()[1]
+    # Servidor no fim da faixa: pior caso da varredura
+    ports = range(max(1, port - span + 1), port + 1)
+    for label, limit in (("sequencial", 1), (f"paralela ({concurrency})", concurrency)):
+        discovery = PortDiscovery(ports, concurrency=limit, cache_path="")
+        found = await discovery.discover()
+        stats = discovery.stats()
+        print(
+            f"{label:<16} porta={found} {stats['last_ms']:8.1f}ms"
+            f" connects TCP={stats['tcp_checks']} handshakes={stats['handshakes']}"
+        )
+    discovery = PortDiscovery(ports, cache_path="")
+    discovery.last_port = port
+    await discovery.discover()
+    print(f"{'última porta boa':<16} porta={port} {discovery.last_ms:8.1f}ms")
+    print(f"anterior: até {len(ports)} x 0.5s sequenciais, uma ClientSession por porta")
+    server.close()
+    await server.wait_closed()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        asyncio.run(_bench())
@@ -0,0 +1,38 @@
+import threading
+
+from activity_log import EVENT_ACTIVITY, ActivityLog
+
+
+def test_flush_is_a_barrier_without_restart(tmp_path):
+    log = ActivityLog()
+    assert log.start(log_dir=str(tmp_path))
+    listener = log._listener
+    try:
+        for n in range(500):
+            log.record(EVENT_ACTIVITY, f"atividade {n}", count=n)
+        assert log.flush()
+        assert log._listener is listener
+        entries = list(log.iter_entries())
+        assert [e["count"] for e in entries] == list(range(500))
+    finally:
+        log.stop()
+
+
+def test_records_during_flush_are_kept(tmp_path):
+    log = ActivityLog()
+    log.start(log_dir=str(tmp_path))
+    writer_done = threading.Event()
+
+    def writer():
+        for n in range(2000):
+            log.record(EVENT_ACTIVITY, "x", count=n)
+        writer_done.set()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    while not writer_done.is_set():
+        assert log.flush()
+    thread.join()
+    log.stop()
+    assert len(list(log.iter_entries())) == 2000
+    assert all(e.get("message") == "x" for e in log.iter_entries())
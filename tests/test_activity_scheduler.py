@@ -0,0 +1,39 @@
+import random
+
+from activity_scheduler import ActivityScheduler, FakeClock
+
+
+def test_grid_does_not_drift():
+    clock = FakeClock()
+    scheduler = ActivityScheduler(60, jitter=0.15, clock=clock, rng=random.Random(1))
+    scheduler.start()
+    for _ in range(1000):
+        clock.advance(scheduler.seconds_until_next() + 0.005)
+        scheduler.fired()
+        clock.advance(1.3)  # duração de uma atividade
+        scheduler.advance()
+    assert abs(clock.now - 1000 * 60) < 60
+
+
+def test_jitter_stays_within_bounds():
+    clock = FakeClock()
+    scheduler = ActivityScheduler(60, jitter=0.15, clock=clock, rng=random.Random(2))
+    scheduler.start()
+    previous = 0.0
+    for _ in range(200):
+        clock.advance(scheduler.seconds_until_next())
+        assert 0.7 * 60 - 1e-9 <= clock.now - previous <= 1.3 * 60 + 1e-9
+        previous = clock.now
+        scheduler.fired()
+        scheduler.advance()
+
+
+def test_skips_missed_slots_after_suspend():
+    clock = FakeClock()
+    scheduler = ActivityScheduler(60, clock=clock)
+    scheduler.start()
+    clock.advance(60 * 10 + 5)  # suspensão
+    assert scheduler.fired() > 0
+    scheduler.advance()
+    assert scheduler.skipped_slots == 9
+    assert scheduler.seconds_until_next() == 55
@@ -0,0 +1,92 @@
+import asyncio
+import socket
+import threading
+
+from activity_scheduler import FakeClock
+from dns_cache import DnsCache, parse_pinned_hosts
+
+
+class FakeResolver:
+    """Lookup falso: conta chamadas, falha para nomes sem IP e pode segurar a resposta"""
+
+    def __init__(self, answers, gate=None):
+        self.answers = answers
+        self.gate = gate
+        self.calls = []
+
+    def __call__(self, host):
+        self.calls.append(host)
+        if self.gate is not None:
+            self.gate.wait(2)
+        if self.answers.get(host) is None:
+            raise socket.gaierror(host)
+        return self.answers[host]
+
+
+def test_positive_answer_expires_after_ttl():
+    clock = FakeClock()
+    resolver = FakeResolver({"uol.com.br": "200.147.3.157"})
+    cache = DnsCache(positive_ttl=300, lookup=resolver, clock=clock)
+    assert cache.resolve_sync("UOL.com.br") == "200.147.3.157"
+    clock.advance(299)
+    assert cache.resolve_sync("uol.com.br") == "200.147.3.157"
+    assert resolver.calls == ["uol.com.br"]
+    clock.advance(1)
+    resolver.answers["uol.com.br"] = "200.147.3.158"
+    assert cache.resolve_sync("uol.com.br") == "200.147.3.158"
+    assert len(resolver.calls) == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_failure_is_cached_with_negative_ttl():
+    clock = FakeClock()
+    resolver = FakeResolver({})
+    cache = DnsCache(positive_ttl=300, negative_ttl=30, lookup=resolver, clock=clock)
+    assert cache.resolve_sync("fora.example") is None
+    clock.advance(29)
+    assert cache.resolve_sync("fora.example") is None
+    assert resolver.calls == ["fora.example"]
+    clock.advance(1)
+    resolver.answers["fora.example"] = "192.0.2.7"
+    assert cache.resolve_sync("fora.example") == "192.0.2.7"
+    assert cache.stats()["negative_hits"] == 1
+    assert cache.stats()["failures"] == 1
+
+
+def test_pinned_hosts_and_literal_ips_skip_the_resolver():
+    resolver = FakeResolver({})
+    cache = DnsCache(pinned=parse_pinned_hosts("Itaipu.gov.br=200.0.0.1; ruim=300.1.1.1"), lookup=resolver)
+    assert cache.pinned == {"itaipu.gov.br": "200.0.0.1"}
+    assert cache.resolve_sync("itaipu.gov.br") == "200.0.0.1"
+    assert asyncio.run(cache.resolve("10.0.0.1")) == "10.0.0.1"
+    assert resolver.calls == []
+    cache.configure(pinned={})
+    assert cache.resolve_sync("itaipu.gov.br") is None
+    assert resolver.calls == ["itaipu.gov.br"]
+
+
+def test_concurrent_lookups_share_one_query():
+    gate = threading.Event()
+    resolver = FakeResolver({"uol.com.br": "200.147.3.157"}, gate)
+    cache = DnsCache(lookup=resolver)
+
+    async def many():
+        tasks = [asyncio.ensure_future(cache.resolve("uol.com.br", timeout=2)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        gate.set()
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(many()) == ["200.147.3.157"] * 5
+    assert resolver.calls == ["uol.com.br"]
+    assert cache.stats()["misses"] == 1
+
+
+def test_timeout_returns_none_but_lookup_still_fills_cache():
+    gate = threading.Event()
+    resolver = FakeResolver({"lento.example": "192.0.2.8"}, gate)
+    cache = DnsCache(lookup=resolver)
+    assert cache.resolve_sync("lento.example", timeout=0.05) is None
+    pending = cache._pending["lento.example"]
+    gate.set()
+    assert pending.result(2) == "192.0.2.8"
+    assert cache.cached("lento.example") == (True, "192.0.2.8")
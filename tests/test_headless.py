@@ -0,0 +1,53 @@
+import json
+import os
+import socket
+import stat
+import subprocess
+import sys
+import time
+
+import pytest
+
+from headless import read_control_file, remove_control_file, send_command, write_control_file
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "keep-alive-app.py")
+
+
+def test_control_file_roundtrip(tmp_path):
+    path = str(tmp_path / "sub" / "control.json")
+    write_control_file(path, 50123, "abc")
+    assert read_control_file(path) == (50123, "abc")
+    if os.name == "posix":
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    remove_control_file(path, "outro")
+    assert os.path.exists(path)
+    remove_control_file(path, "abc")
+    assert read_control_file(path) is None
+
+
+def test_control_channel_requires_token(tmp_path):
+    control_file = str(tmp_path / "control.json")
+    env = dict(os.environ, LOCALAPPDATA=str(tmp_path), QT_QPA_PLATFORM="offscreen")
+    argv = [sys.executable, APP, "--headless", "--stopped", "--control-file", control_file]
+    process = subprocess.Popen(argv, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 20
+        while read_control_file(control_file) is None:
+            if process.poll() is not None or time.monotonic() > deadline:
+                pytest.fail("instância sem janela não subiu")
+            time.sleep(0.1)
+        port, _ = read_control_file(control_file)
+        with socket.create_connection(("127.0.0.1", port), timeout=5) as sock:
+            sock.sendall(b'{"command": "quit"}\n')
+            assert json.loads(sock.makefile().readline()) == {"ok": False, "error": "token inválido"}
+
+        assert send_command("status", control_file)["ok"]
+        # Segunda instância com o mesmo arquivo não sobe
+        assert subprocess.run(argv, env=env, capture_output=True, timeout=30).returncode == 1
+
+        assert send_command("quit", control_file)["ok"]
+        assert process.wait(timeout=20) == 0
+        assert not os.path.exists(control_file)
+    finally:
+        if process.poll() is None:
+            process.kill()
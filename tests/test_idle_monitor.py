@@ -0,0 +1,74 @@
+from bisect import insort
+
+from activity_scheduler import FakeClock
+from idle_monitor import IdleMonitor, TraceIdleProbe, simulate_trace
+
+
+class FixedProbe:
+    def __init__(self, idle_s):
+        self.idle_s = idle_s
+
+    def idle_seconds(self):
+        return self.idle_s
+
+
+def test_trace_transitions_once_each_way():
+    # Digita nos primeiros 10 min, sai por 20 min e volta
+    trace = [t * 5.0 for t in range(120)] + [1800.0 + t * 3.0 for t in range(50)]
+    events, samples = simulate_trace(trace, threshold_s=60, duration_s=3600)
+    assert [state for _, state, _ in events] == ["idle", "active", "idle"]
+    assert 655 <= events[0][0] <= 656
+    assert samples < 3600 / 5
+
+
+def test_first_sample_only_sets_state():
+    calls = []
+    probe = FixedProbe(120)
+    monitor = IdleMonitor(60, probe, on_idle=calls.append, on_active=calls.append)
+    monitor.sample()
+    assert monitor.is_idle and not calls
+    probe.idle_s = 1
+    monitor.sample()
+    assert calls == [1]
+
+
+def run_keepalive(user_inputs, duration_s=600, threshold_s=60, interval_s=60):
+    """Laço do app com relógio falso: amostras do monitor + atividade injetada a cada intervalo"""
+    clock = FakeClock()
+    probe = TraceIdleProbe(user_inputs, clock)
+    events = []
+    monitor = IdleMonitor(
+        threshold_s,
+        probe,
+        on_idle=lambda idle: events.append((clock.now, "idle")),
+        on_active=lambda idle: events.append((clock.now, "active")),
+        clock=clock,
+    )
+    activities = []
+    next_sample, next_activity = 0.0, interval_s
+    while clock.now < duration_s:
+        clock.advance(min(next_sample, next_activity) - clock.now)
+        if clock.now >= next_activity:
+            idle_s = monitor.user_idle_seconds()
+            if idle_s >= threshold_s:
+                insort(probe.input_times, clock.now)  # entrada injetada
+                monitor.mark_injected(idle_s)
+                activities.append(clock.now)
+            next_activity += interval_s
+        if clock.now >= next_sample:
+            next_sample = clock.now + monitor.sample()
+    return events, activities
+
+
+def test_injected_input_is_not_user_activity():
+    events, activities = run_keepalive([])
+    assert [state for _, state in events] == ["idle"]
+    assert activities == [60 * n for n in range(1, 11)]
+
+
+def test_user_input_after_injection_still_counts():
+    events, activities = run_keepalive([310.0, 330.0], duration_s=480)
+    assert [state for _, state in events] == ["idle", "active", "idle"]
+    assert events[1][0] == 310
+    assert 360 not in activities
+    assert 420 in activities
@@ -0,0 +1,50 @@
+import ctypes
+import random
+import sys
+
+import pytest
+
+from input_injector import (
+    INPUT,
+    KEY,
+    SAFE_TOGGLE_KEYS,
+    NullInjector,
+    RecordingInjector,
+    activity_sequence,
+    default_injector,
+)
+
+
+@pytest.mark.parametrize("width, height", [(1920, 1080), (1366, 768), (3840, 2160), (800, 600)])
+def test_activity_sequence_invariants(width, height):
+    rng = random.Random(0)
+    injector = RecordingInjector((width, height))
+    safe_zone = min(width, height) // 20
+    for _ in range(500):
+        events = activity_sequence(width, height, rng)
+        target = events[0]
+        assert abs(target.x - width // 2) <= safe_zone
+        assert abs(target.y - height // 2) <= safe_zone
+        injector.send(events)
+        assert not injector.pressed, "tecla presa"
+        keys = [e.vk for e in events if e.kind == KEY and not e.key_up]
+        assert len(keys) % 2 == 0, "trava não restaurada"
+        assert all(vk in SAFE_TOGGLE_KEYS for vk in keys)
+    assert len(injector.batches) == 500
+
+
+def test_input_struct_size():
+    assert ctypes.sizeof(INPUT) in (28, 40)  # 32 e 64 bits
+
+
+def test_fallback_injector_reports_failure(monkeypatch, caplog):
+    from keepalive_activity import simulate_safe_activity
+
+    monkeypatch.setattr(sys, "platform", "linux")
+    injector = default_injector()
+    assert isinstance(injector, NullInjector)
+    assert "indisponível" in caplog.text
+    assert injector.send(activity_sequence(1920, 1080)) == 0
+    success, _ = simulate_safe_activity(injector)
+    assert not success
+    assert not hasattr(injector, "batches")
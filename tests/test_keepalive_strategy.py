@@ -0,0 +1,41 @@
+from input_injector import RecordingInjector
+from keepalive_strategy import Strategy, StrategyEngine, simulate_hour, strategy_floor
+from system_policy import PolicySnapshot
+
+
+def make_policy(rdp_s, screen_saver_s=900):
+    return PolicySnapshot(screen_saver_s, "default", rdp_s, "policy" if rdp_s else "", {}, 0.0)
+
+
+def test_floor_follows_policy_and_require_input():
+    assert strategy_floor(make_policy(0, 0)) is Strategy.EXECUTION_STATE
+    # Proteção de tela padrão: SetThreadExecutionState não zera a inatividade
+    assert strategy_floor(make_policy(0)) is Strategy.ZERO_MOUSE
+    assert strategy_floor(make_policy(900, 0)) is Strategy.ZERO_MOUSE
+    assert strategy_floor(None) is Strategy.ZERO_MOUSE
+    assert strategy_floor(make_policy(0, 0), require_input=True) is Strategy.ZERO_MOUSE
+
+
+def test_describe_names_strategy_and_floor_reason():
+    engine = StrategyEngine(lambda: make_policy(0, 0), RecordingInjector(), lock=lambda: True)
+    assert "estado de execução" in engine.describe()
+    assert "sem proteção de tela nem limite" in engine.describe()
+    engine.policy_source = lambda: make_policy(0)
+    assert engine.describe().startswith("Keep-alive: mouse 0px")
+    assert "proteção de tela após 900s" in engine.describe()
+    engine.policy_source = lambda: make_policy(0, 0)
+    engine.require_input = True
+    assert engine.describe().startswith("Keep-alive: mouse 0px")
+    assert "exigida nas configurações" in engine.describe()
+
+
+def test_escalates_until_input_resets_idle():
+    engine = simulate_hour(make_policy(900), lambda batch: any(e.kind == "key" for e in batch), hours=2)
+    assert engine.level is Strategy.F15_KEY
+    assert engine.events_per_hour() < 6 * 60
+
+
+def test_default_policy_injects_input():
+    engine = simulate_hour(make_policy(0), lambda batch: True)
+    assert engine.level is Strategy.ZERO_MOUSE
+    assert engine.events == 60
@@ -0,0 +1,48 @@
+import pytest
+
+from log_routing import FILTERED_KEYWORDS, IMPORTANT_KEYWORDS, ROUTES, LogCategory, Route, route_for
+
+
+def legacy_filter_log_message(message):
+    """Regra antiga de filter_log_message (referência)"""
+    for keyword in IMPORTANT_KEYWORDS:
+        if keyword in message:
+            return True
+    for keyword in FILTERED_KEYWORDS:
+        if keyword in message:
+            return False
+    return True
+
+
+# Decisões atuais do log principal (mensagem, categoria explícita, vai ao principal)
+PINNED_ROUTES = [
+    ("Configurações Salvas", LogCategory.SETTINGS, True),
+    ("Net: RDP:Off", LogCategory.CONNECTIVITY, False),
+    ("Net: RDP:Off | GW:1ms | BR:17ms", LogCategory.CONNECTIVITY, False),
+    ("Net: RDP:Local | GW:1ms", LogCategory.CONNECTIVITY, False),
+    ("Net: RDP:.42 | GW:3ms | BR:20ms | S42:5ms", LogCategory.CONNECTIVITY, False),
+    ("Iniciado agendamento", LogCategory.SCHEDULE, True),
+    ("Serviço parado - Fora do horário de agendamento", LogCategory.SCHEDULE, True),
+    ("Serviço Parado", LogCategory.SERVICE, True),
+    ("Usuário Ativo (inatividade: 12.3s < 60s)", LogCategory.USER_ACTIVE, True),
+    ("Simulação Executada", LogCategory.ACTIVITY, True),
+    ("Próxima Atividade: 20:19:18 (59.5s)", LogCategory.NEXT_ACTIVITY, True),
+    ("ERRO: Erro na simulação: falha", LogCategory.ERROR, True),
+    ("Keep Alive RDP Connection iniciado", None, True),
+    ("Mensagem qualquer", None, True),
+]
+
+
+@pytest.mark.parametrize("message, category, expected_main", PINNED_ROUTES)
+def test_pinned_routes_match_legacy_rule(message, category, expected_main):
+    assert legacy_filter_log_message(message) == expected_main
+    assert route_for(message).main == expected_main
+    assert route_for(message, category).main == expected_main
+
+
+def test_every_category_reaches_full_log():
+    # Como antes: tudo vai ao log completo; só a conectividade e a partida ficam fora do principal
+    assert set(ROUTES) == set(LogCategory)
+    assert ROUTES[LogCategory.ERROR] == Route(main=True, full=True)
+    assert {c for c, r in ROUTES.items() if not r.main} == {LogCategory.STARTUP, LogCategory.CONNECTIVITY}
+    assert all(route.full for route in ROUTES.values())
@@ -0,0 +1,113 @@
+from activity_scheduler import FakeClock
+from network_info import (
+    NetworkTopology,
+    detectar_conexoes_rdp,
+    parse_ipconfig,
+    parse_route_print,
+    shorten_interface_name,
+)
+from socket_table import FakeSocketTable, parse_netstat_output, take_rdp_snapshot
+
+ROUTE_PRINT = """
+===========================================================================
+Rotas IPv4 ativas:
+Destino de rede       Máscara           Gateway           Interface   Custo
+          0.0.0.0          0.0.0.0      192.168.0.1     192.168.0.20     25
+        127.0.0.0        255.0.0.0         On-link         127.0.0.1    331
+"""
+
+IPCONFIG = """
+Configuração de IP do Windows
+
+Adaptador Ethernet vEthernet (Default Switch):
+
+   Endereço IPv4. . . . . . . .  . . . . . . . : 172.20.0.1
+
+Adaptador de Rede sem Fio Wi-Fi:
+
+   Endereço IPv4. . . . . . . .  . . . . . . . : 192.168.0.20
+"""
+
+
+def test_parse_route_print():
+    assert parse_route_print(ROUTE_PRINT) == ("192.168.0.1", "192.168.0.20")
+    assert parse_route_print("") is None
+
+
+def test_parse_ipconfig():
+    assert parse_ipconfig(IPCONFIG, "192.168.0.20") == "Rede sem Fio Wi-Fi"
+    assert parse_ipconfig(IPCONFIG, "172.20.0.1") == "vEthernet (Default Switch)"
+    assert parse_ipconfig(IPCONFIG, "10.9.9.9") is None
+
+
+def test_shorten_interface_name():
+    assert shorten_interface_name("Wi-Fi") == "Wi-Fi"
+    assert shorten_interface_name("vEthernet (Default Switch)") == "vEth(Defaul..)"
+    assert shorten_interface_name("VMware Network Adapter VMnet8") == "VMnet8"
+
+
+class CountingReader:
+    def __init__(self, value=("192.168.0.1", "192.168.0.20", "Wi-Fi")):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+def test_topology_cache_hits_and_ttl():
+    clock = FakeClock()
+    reader = CountingReader()
+    topology = NetworkTopology(reader, ttl=300, clock=clock, local_ips_reader=set)
+    for _ in range(10):
+        assert topology.get() == reader.value
+    assert reader.calls == 1
+    clock.advance(300)
+    topology.get()
+    assert reader.calls == 2
+    assert topology.stats()["hits"] == 9
+
+
+def test_topology_invalidates_once_per_unknown_local_ip():
+    reader = CountingReader()
+    topology = NetworkTopology(reader, clock=FakeClock(), local_ips_reader=set)
+    topology.get()
+    assert not topology.observe_local_ips(["192.168.0.20", "127.0.0.1"])
+    assert topology.observe_local_ips(["10.8.0.2"])
+    topology.get()
+    assert reader.calls == 2
+    # Mesmo fora dos adaptadores, o IP já visto não relê de novo
+    assert not topology.observe_local_ips(["10.8.0.2"])
+
+
+def test_topology_knows_every_adapter_ip():
+    reader = CountingReader()
+    adapters = {"192.168.0.20", "10.8.0.2", "172.20.0.1"}
+    topology = NetworkTopology(reader, clock=FakeClock(), local_ips_reader=lambda: adapters)
+    topology.get()
+    for _ in range(100):
+        assert not topology.observe_local_ips(["10.8.0.2", "172.20.0.1"])
+        topology.get()
+    assert reader.calls == 1
+    assert topology.stats()["hit_rate"] == 0.99  # 1 leitura em 101 consultas
+
+
+NETSTAT_RDP = """
+  Proto  Endereço local         Endereço externo       Estado
+  TCP    0.0.0.0:3389           0.0.0.0:0              LISTENING
+  TCP    10.0.0.5:3389          10.0.0.100:50000       ESTABLISHED
+  TCP    10.0.0.5:3389          10.0.0.101:50001       ESTABLISHED
+  TCP    192.168.0.20:50123     10.0.0.7:3389          ESTABLISHED
+"""
+
+
+def test_rdp_sessions_report_local_endpoint_like_baseline():
+    # Regra antiga: linhas com ":3389" e ESTABLISHED, último octeto do endereço local (2ª coluna)
+    table = FakeSocketTable(parse_netstat_output(NETSTAT_RDP))
+    snapshot = take_rdp_snapshot(table, ports=(3389,))
+    tem_rdp, lista, principal = detectar_conexoes_rdp(snapshot)
+    assert tem_rdp
+    assert lista == ["RDP-5", "RDP-20"]
+    assert principal == "RDP-5"
+    assert detectar_conexoes_rdp(take_rdp_snapshot(FakeSocketTable([]))) == (False, [], "Nenhuma")
@@ -0,0 +1,140 @@
+import asyncio
+import socket
+import struct
+import time
+
+from activity_scheduler import FakeClock
+from ping_engine import (
+    ICMP_ECHO_REPLY,
+    SWEEP_BEST,
+    SWEEP_FIRST,
+    FakeResponderBackend,
+    LatencyProber,
+    TargetSweep,
+    TcpConnectBackend,
+    _icmp_checksum,
+    build_echo_request,
+    parse_echo_reply,
+)
+
+DELAYS = {"192.0.2.1": None, "192.0.2.2": 0.030, "192.0.2.3": 0.012}
+TARGETS = (("192.0.2.1", "Fora"), ("192.0.2.2", "Lento"), ("192.0.2.3", "Rápido"))
+
+
+def make_sweep(mode, clock=None):
+    prober = LatencyProber(backends=[FakeResponderBackend(DELAYS)])
+    return TargetSweep(TARGETS, mode, prober=prober, clock=clock or FakeClock())
+
+
+def test_echo_request_checksum_and_reply_parse():
+    packet = build_echo_request(0x1234, 7)
+    assert _icmp_checksum(packet) == 0
+    reply = struct.pack("!BBHHH", ICMP_ECHO_REPLY, 0, 0, 0x1234, 7) + b"keepalive"
+    ip_header = bytes([0x45]) + bytes(19)
+    assert parse_echo_reply(reply, has_ip_header=False) == (0x1234, 7)
+    assert parse_echo_reply(ip_header + reply, has_ip_header=True) == (0x1234, 7)
+    assert parse_echo_reply(packet, has_ip_header=False) is None  # Echo Request, não Reply
+
+
+def test_tcp_backend_measures_handshake():
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    try:
+        backend = TcpConnectBackend(listener.getsockname()[1])
+        assert asyncio.run(backend.probe("127.0.0.1", 1.0)) is not None
+    finally:
+        listener.close()
+
+
+def test_prober_falls_back_to_next_backend():
+    prober = LatencyProber(backends=[FakeResponderBackend({}), FakeResponderBackend({"192.0.2.9": 0.01})])
+    assert prober.ping("192.0.2.9", timeout=0.2) > 0
+
+
+def test_first_mode_returns_first_reachable():
+    result = make_sweep(SWEEP_FIRST).run(timeout=0.5)
+    assert result.host == "192.0.2.3"
+    assert result.latency_ms > 0
+
+
+def test_best_mode_probes_all_and_demotes_dead_target():
+    clock = FakeClock()
+    sweep = make_sweep(SWEEP_BEST, clock)
+    for _ in range(3):
+        result = sweep.run(timeout=0.2)
+        assert result.host == "192.0.2.3"
+        assert set(result.results) == {host for host, _ in TARGETS}
+    assert "192.0.2.1" not in [t.host for t in sweep.active_targets()]
+    clock.advance(sweep.demote_seconds)
+    assert "192.0.2.1" in [t.host for t in sweep.active_targets()]
+
+
+def test_ewma_and_jitter():
+    sweep = make_sweep(SWEEP_BEST)
+    target = sweep.targets[1]
+    for latency in (10, 20, 10, 20):
+        sweep._record(target, latency)
+    assert 10 < target.ewma_ms < 20
+    assert target.jitter_ms > 0
+
+
+def test_cascade_shares_one_deadline():
+    prober = LatencyProber(backends=[FakeResponderBackend({}), FakeResponderBackend({})])
+    start = time.perf_counter()
+    assert prober.ping("192.0.2.9", timeout=0.4) == -1
+    assert time.perf_counter() - start < 0.55
+
+
+def test_sweep_gets_tcp_fallback_for_host_without_icmp():
+    icmp = FakeResponderBackend({"192.0.2.3": 0.012})
+    tcp = FakeResponderBackend({"192.0.2.2": 0.030, "192.0.2.3": 0.012})
+    prober = LatencyProber(backends=[icmp, tcp])
+    sweep = TargetSweep((("192.0.2.2", "Sem ICMP"),), SWEEP_BEST, prober=prober, clock=FakeClock())
+    result = sweep.run(timeout=0.5)
+    assert result.host == "192.0.2.2"
+    assert result.latency_ms > 0
+
+
+def test_dead_target_finishes_inside_sweep_budget():
+    prober = LatencyProber(backends=[FakeResponderBackend(DELAYS), FakeResponderBackend(DELAYS)])
+    sweep = TargetSweep(TARGETS, SWEEP_BEST, prober=prober, clock=FakeClock())
+    result = sweep.run(timeout=0.6)
+    assert result.results["192.0.2.1"] == -1
+    assert sweep.targets[0].failures == 1
+
+
+def test_first_mode_records_losers_and_demotes_dead_target():
+    sweep = make_sweep(SWEEP_FIRST)
+    for _ in range(sweep.demote_after):
+        assert sweep.run(timeout=0.2).host == "192.0.2.3"
+    deadline = time.monotonic() + 2
+    while sweep._background and time.monotonic() < deadline:
+        time.sleep(0.02)
+    dead, slow, _ = sweep.targets
+    assert dead.failures == sweep.demote_after
+    assert "192.0.2.1" not in [t.host for t in sweep.active_targets()]
+    assert slow.successes == sweep.demote_after
+
+
+class ImmediateProber:
+    """Responde sem esperar: todas as sondas terminam na mesma iteração do loop"""
+
+    def __init__(self, latencies):
+        self.latencies = latencies
+
+    async def probe(self, host, timeout):
+        return self.latencies[host]
+
+
+def test_first_mode_records_probes_finished_with_the_winner():
+    targets = (("192.0.2.3", "Rápido"), ("192.0.2.1", "Fora"))
+    prober = ImmediateProber({"192.0.2.3": 12, "192.0.2.1": -1})
+    sweep = TargetSweep(targets, SWEEP_FIRST, prober=prober, clock=FakeClock())
+    for _ in range(sweep.demote_after):
+        result = asyncio.run(sweep.sweep(timeout=0.2))
+        assert result.host == "192.0.2.3"
+        assert result.results == {"192.0.2.3": 12, "192.0.2.1": -1}
+    assert not sweep._background
+    assert sweep.targets[1].failures == sweep.demote_after
+    assert [t.host for t in sweep.active_targets()] == ["192.0.2.3"]
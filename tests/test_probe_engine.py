@@ -0,0 +1,64 @@
+import threading
+import time
+
+import probe_engine
+from activity_scheduler import FakeClock
+from network_info import NetworkTopology
+from ping_engine import SweepResult
+from socket_table import RdpSnapshot, TcpConnection
+
+STEP_S = 0.15
+
+
+def slow(value):
+    def call(*args, **kwargs):
+        time.sleep(STEP_S)
+        return value
+
+    return call
+
+
+class FakeSweep:
+    def run(self, timeout=2):
+        time.sleep(STEP_S)
+        return SweepResult(17, "UOL", "uol.com.br", 1.0, {})
+
+    def report_lines(self):
+        return []
+
+
+def run_cycle(monkeypatch, snapshot, topology):
+    monkeypatch.setattr(probe_engine, "get_default_sweep", FakeSweep)
+    monkeypatch.setattr(probe_engine, "take_rdp_snapshot", slow(snapshot))
+    monkeypatch.setattr(probe_engine, "detectar_conexoes_rdp", slow((True, ["10.0.0.42"], "RDP-42")))
+    monkeypatch.setattr(probe_engine, "get_network_info", lambda: (time.sleep(STEP_S), topology.get())[1])
+    monkeypatch.setattr(probe_engine, "get_topology", lambda: topology)
+    monkeypatch.setattr(probe_engine, "ping_host", slow(3))
+    results = []
+    done = threading.Event()
+    engine = probe_engine.ConnectivityProbeEngine(lambda snap: (results.append(snap), done.set()))
+    start = time.perf_counter()
+    assert engine.submit_cycle()
+    assert done.wait(5)
+    elapsed = time.perf_counter() - start
+    engine.shutdown()
+    return results[0], elapsed
+
+
+def test_cycle_runs_independent_steps_in_parallel(monkeypatch):
+    snapshot = RdpSnapshot((TcpConnection("10.0.0.5", 3389, "10.0.0.42", 50000, "ESTABLISHED"),), 0.0)
+    topology = NetworkTopology(lambda: ("10.0.0.1", "10.0.0.5", "Ethernet"), clock=FakeClock(), local_ips_reader=set)
+    result, elapsed = run_cycle(monkeypatch, snapshot, topology)
+    assert (result.ping_gw, result.ping_brasil, result.ping_sistema) == (3, 17, 3)
+    assert result.conexao_principal == "RDP-42"
+    # Em série seriam 5 passos (tabela, sessões, rede, gateway, sistema); em paralelo, 3
+    assert elapsed < 4 * STEP_S
+
+
+def test_cycle_rereads_topology_for_unknown_local_ip(monkeypatch):
+    snapshot = RdpSnapshot((TcpConnection("10.8.0.2", 3389, "10.0.0.42", 50000, "ESTABLISHED"),), 0.0)
+    topology = NetworkTopology(lambda: ("10.0.0.1", "10.0.0.5", "Ethernet"), clock=FakeClock(), local_ips_reader=set)
+    topology.get()
+    run_cycle(monkeypatch, snapshot, topology)
+    assert topology.invalidations == 1
+    assert topology.misses == 2
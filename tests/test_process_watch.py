@@ -0,0 +1,53 @@
+from process_watch import ProcessWatch, SyntheticProcess, SyntheticProcessTable, legacy_find
+
+TEAMS_EXE = r"C:\Users\u\AppData\Local\Microsoft\Teams\ms-teams.exe"
+
+
+def make_watch(size=300):
+    table = SyntheticProcessTable(size)
+    return table, ProcessWatch("ms-teams.exe", r"\Microsoft\Teams", ps=table)
+
+
+def test_first_lookup_reads_exe_only_of_candidates():
+    table, watch = make_watch()
+    assert watch.find().pid == table.target_pid
+    assert table.reads.get("exe") == 1
+    assert "cmdline" not in table.reads
+
+
+def test_cached_pid_skips_scan():
+    _, watch = make_watch()
+    watch.find()
+    watch.find()
+    assert (watch.scans, watch.hits) == (1, 1)
+
+
+def test_restarted_process_is_found_again():
+    table, watch = make_watch()
+    watch.find()
+    table.kill(table.target_pid)
+    new_pid = table.add("ms-teams.exe", TEAMS_EXE)
+    assert watch.find().pid == new_pid
+    assert watch.scans == 2
+
+
+def test_reused_pid_is_not_accepted():
+    table, watch = make_watch()
+    watch.find()
+    pid = table.target_pid
+    table.kill(pid)
+    table.processes[pid] = SyntheticProcess(table, pid, "chrome.exe", "chrome.exe", 1.0, False)
+    assert watch.find() is None
+    assert watch.pid is None
+
+
+def test_same_name_outside_expected_folder_is_ignored():
+    table, watch = make_watch()
+    table.kill(table.target_pid)
+    table.add("ms-teams.exe", r"C:\Temp\ms-teams.exe")
+    assert watch.find() is None
+
+
+def test_legacy_find_matches():
+    table = SyntheticProcessTable(300)
+    assert legacy_find(table).pid == table.target_pid
@@ -0,0 +1,51 @@
+from refresh_cadence import RefreshCadence, simulate_wakeups
+
+STABLE = ("gw", "ip", True, ("RDP-42",), True, True, True)
+
+
+def intervals(cadence, signatures):
+    out = []
+    for signature in signatures:
+        cadence.observe(signature)
+        out.append(cadence.next_interval())
+    return out
+
+
+def test_visible_backoff_on_stable_signature():
+    cadence = RefreshCadence()
+    assert cadence.next_interval() == 5  # primeiro ciclo: instável
+    assert intervals(cadence, [STABLE] * 6) == [5, 15, 30, 60, 60, 60]
+
+
+def test_change_or_failure_resets_to_fast():
+    cadence = RefreshCadence()
+    intervals(cadence, [STABLE] * 4)
+    assert cadence.next_interval() == 60
+    cadence.observe(STABLE[:2] + (False, (), True, True, True))
+    assert cadence.next_interval() == 5
+    intervals(cadence, [STABLE] * 4)
+    cadence.observe(STABLE, failed=True)
+    assert cadence.unstable
+    assert cadence.next_interval() == 5
+
+
+def test_hidden_window_backs_off_to_higher_ceiling():
+    cadence = RefreshCadence()
+    cadence.set_running(True)
+    assert not cadence.set_visible(False)
+    assert intervals(cadence, [STABLE] * 7) == [15, 30, 60, 120, 240, 240, 240]
+    assert cadence.set_visible(True)  # voltou a aparecer: atualiza já
+    assert cadence.next_interval() == 60
+
+
+def test_stopped_service_with_hidden_window_pauses():
+    cadence = RefreshCadence()
+    cadence.set_visible(False)
+    assert cadence.next_interval() is None
+    assert "pausado" in cadence.describe()
+    cadence.set_running(True)
+    assert cadence.next_interval() == 15
+    cadence.set_running(False)
+    cadence.set_visible(True)
+    assert cadence.next_interval() == 5
+    assert simulate_wakeups(visible=False, running=False) == (0, 0)
@@ -0,0 +1,41 @@
+from socket_table import (
+    FakeSocketTable,
+    TcpConnection,
+    parse_netstat_output,
+    parse_rdp_ports,
+    take_rdp_snapshot,
+)
+
+WINDOWS_NETSTAT = """
+Conexões ativas
+
+  Proto  Endereço local         Endereço externo       Estado
+  TCP    0.0.0.0:3389           0.0.0.0:0              LISTENING
+  TCP    10.0.0.5:3389          10.0.0.100:50000       ESTABLISHED
+  TCP    10.0.0.5:49700         172.16.0.1:443         TIME_WAIT
+  UDP    0.0.0.0:3389           *:*
+"""
+
+
+def test_parse_netstat_output():
+    rows = list(parse_netstat_output(WINDOWS_NETSTAT))
+    assert rows[1] == TcpConnection("10.0.0.5", 3389, "10.0.0.100", 50000, "ESTABLISHED")
+    assert [r.status for r in rows] == ["LISTENING", "ESTABLISHED", "TIME_WAIT"]
+
+
+def test_snapshot_filters_established_rdp():
+    table = FakeSocketTable.generate(total=10000, rdp_sessions=3)
+    snapshot = take_rdp_snapshot(table, ports=(3389,))
+    assert len(snapshot.connections) == 3
+    assert snapshot.local_ips == ["10.0.0.5"]
+    assert len({c.remote_ip for c in snapshot.connections}) == 3
+
+
+def test_custom_rdp_port():
+    table = FakeSocketTable.generate(total=500, rdp_sessions=2, rdp_port=3390)
+    assert not take_rdp_snapshot(table, ports=(3389,)).connections
+    assert len(take_rdp_snapshot(table, ports=parse_rdp_ports("3389; 3390")).connections) == 2
+
+
+def test_parse_rdp_ports_falls_back_to_default():
+    assert parse_rdp_ports("abc, 70000") == (3389,)
@@ -0,0 +1,35 @@
+import pytest
+
+from system_policy import (
+    DESKTOP_KEY,
+    RDP_POLICY_KEYS,
+    RecordedPolicyReader,
+    compute_user_timeout,
+    read_policy_snapshot,
+)
+
+# Casos gravados: (políticas, timeout esperado com mínimo 30 e padrão 60)
+RECORDED_CASES = [
+    ({}, 120),  # sem SPI nem registro: padrão de 900s → 1/5 = 180 → limite 120
+    ({"spi": 0}, 60),  # proteção desativada, sem RDP: padrão
+    ({"spi": 600}, 120),
+    ({"spi": 300}, 60),
+    ({"spi": 60}, 30),
+    ({"spi": None, DESKTOP_KEY: {"ScreenSaveTimeOut": b"300\0"}}, 60),
+    ({"spi": 0, RDP_POLICY_KEYS[2]: {"MaxIdleTime": 240000}}, 60),
+    (
+        {
+            "spi": 900,
+            RDP_POLICY_KEYS[0]: {"MaxIdleTime": 0, "MaxDisconnectionTime": 600000},
+            RDP_POLICY_KEYS[2]: {"MaxIdleTime": 120000},
+        },
+        90,
+    ),
+    ({"spi": 900, RDP_POLICY_KEYS[1]: {"MaxSessionTime": 3600000}}, 90),
+]
+
+
+@pytest.mark.parametrize("recorded, expected", RECORDED_CASES)
+def test_recorded_cases(recorded, expected):
+    snapshot = read_policy_snapshot(RecordedPolicyReader(recorded))
+    assert compute_user_timeout(snapshot, 30, 60) == expected
@@ -0,0 +1,144 @@
+import asyncio
+import os
+import threading
+import time
+
+from teams_ipc import (
+    DISCOVERY_CACHE_FILENAME,
+    ConnectionState,
+    LoopCalls,
+    PortDiscovery,
+    TeamsConnection,
+    TeamsIpcError,
+    stub_server,
+)
+
+
+async def _plain_listener():
+    """Servidor TCP que não fala WebSocket (não deve ser escolhido)"""
+
+    async def handler(reader, writer):
+        writer.close()
+
+    return await asyncio.start_server(handler, "127.0.0.1", 0)
+
+
+def _port_range(port, span=200):
+    """Faixa de `span` portas em volta de `port`"""
+    low = max(1, port - span // 2)
+    return range(low, low + span)
+
+
+def test_connection_multiplexes_and_reconnects():
+    async def scenario():
+        states = []
+        server = await stub_server(delay_for=lambda m: m["params"].get("delay", 0))
+        port = server.sockets[0].getsockname()[1]
+        connection = TeamsConnection(
+            f"ws://127.0.0.1:{port}",
+            on_state=lambda state, detail: states.append(state),
+            heartbeat_s=0.2,
+            heartbeat_timeout_s=0.5,
+            backoff_min_s=0.05,
+            backoff_max_s=0.2,
+        )
+        assert await connection.wait_connected(2)
+
+        # Respostas fora de ordem chegam à requisição certa
+        delays = [0.3, 0.1, 0.2, 0.0]
+        results = await asyncio.gather(
+            *(connection.request("echo", {"n": n, "delay": delay}) for n, delay in enumerate(delays))
+        )
+        assert [r["result"]["n"] for r in results] == list(range(len(delays)))
+
+        try:
+            await connection.request("echo", {"delay": 1.0}, timeout=0.1)
+            raise AssertionError("timeout não disparou")
+        except TeamsIpcError:
+            pass
+
+        await asyncio.sleep(0.5)
+        assert connection.last_rtt_ms is not None, "heartbeat sem pong"
+
+        # Servidor cai e volta na mesma porta: reconecta sozinho
+        server.close()
+        await server.wait_closed()
+        await asyncio.sleep(0.3)
+        server = await stub_server(port)
+        assert await connection.wait_connected(3), connection.stats()
+        assert (await connection.request("echo", {"n": 9}))["result"]["n"] == 9
+
+        await connection.close()
+        server.close()
+        await server.wait_closed()
+        assert connection.reconnects >= 1
+        assert states[-1] is ConnectionState.CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_port_discovery_scans_caches_and_skips_plain_tcp(tmp_path):
+    async def scenario():
+        plain = await _plain_listener()
+        server = await stub_server()
+        plain_port = plain.sockets[0].getsockname()[1]
+        ws_port = server.sockets[0].getsockname()[1]
+        cache = os.path.join(tmp_path, "sub", DISCOVERY_CACHE_FILENAME)
+        discovery = PortDiscovery(_port_range(ws_port), concurrency=16, cache_path=cache)
+        assert await discovery.discover(preferred=[plain_port]) == ws_port
+        assert discovery.last_source == "varredura"
+        # A porta sem WebSocket passa no connect TCP e falha no handshake
+        assert 2 <= discovery.handshakes <= discovery.tcp_checks
+
+        # Nova instância lê a porta do disco e não varre
+        cached = PortDiscovery(discovery.ports, cache_path=cache)
+        assert cached.last_port == ws_port
+        assert await cached.discover() == ws_port
+        assert cached.tcp_checks == 1
+
+        # Porta do cache morreu: volta a varrer e não devolve porta sem WebSocket
+        server.close()
+        await server.wait_closed()
+        assert await cached.discover(preferred=[plain_port]) is None
+        plain.close()
+        await plain.wait_closed()
+
+    asyncio.run(scenario())
+
+
+def test_loop_calls_from_another_thread():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    calls = LoopCalls(loop)
+    results = {}
+    finished = threading.Event()
+
+    def collect(name):
+        def on_result(outcome, value):
+            results[name] = (outcome, value)
+            if len(results) == 3:
+                finished.set()
+
+        return on_result
+
+    start = time.perf_counter()
+    calls.submit("rápida", asyncio.sleep(0.01, "pronto"), 1.0, collect("rápida"))
+    calls.submit("lenta", asyncio.sleep(5), 0.05, collect("lenta"))
+    calls.submit("pendente", asyncio.sleep(5), 10.0, collect("pendente"))
+    submit_ms = (time.perf_counter() - start) * 1000
+    time.sleep(0.2)
+    calls.cancel_all()
+    finished.wait(2)
+    try:
+        assert submit_ms < 50, "submit bloqueou"
+        assert results["rápida"] == ("ok", "pronto")
+        assert results["lenta"][0] == "timeout"
+        assert results["pendente"][0] == "cancelada"
+        assert not calls.pending()
+        assert calls.metrics.stats()["lenta"]["timeout"] == 1
+    finally:
+        # Deixa o loop processar os cancelamentos antes de parar
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0.01), loop).result(1)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(1)
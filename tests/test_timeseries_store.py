@@ -0,0 +1,89 @@
+import math
+import random
+
+import pytest
+
+from timeseries_store import RingBuffer, TimeSeriesStore
+
+T0 = 1_699_999_200.0  # múltiplo de 1 h: janelas alinhadas
+
+
+def test_ring_buffer_overwrites_oldest_past_capacity():
+    ring = RingBuffer(5, "d")
+    for value in range(8):
+        ring.append(value)
+    assert ring.count == 5
+    assert ring.values() == [3, 4, 5, 6, 7]
+    assert ring.values(1, 4) == [4, 5, 6]
+    # Índices lógicos atravessando o fim do array físico
+    assert ring.physical_range(1, 4) == ((4, 5), (0, 2))
+
+
+def test_ring_buffer_bisect_across_wrap_point():
+    ring = RingBuffer(6, "d")
+    for value in range(10, 19):
+        ring.append(value)
+    assert ring.values() == [13, 14, 15, 16, 17, 18]
+    assert [ring.bisect(v) for v in (0, 13, 15, 15.5, 16, 18, 99)] == [0, 0, 2, 3, 3, 5, 6]
+    assert [ring.bisect(v, right=True) for v in (0, 13, 15, 18, 99)] == [0, 1, 3, 6, 6]
+
+
+def test_raw_query_after_wrap_returns_only_range():
+    store = TimeSeriesStore(raw_capacity=10, tiers=((60, 4),))
+    for index in range(25):
+        store.record(T0 + index * 5, index, -1, None, 1)
+    timestamps, values = store.query("gateway_ms")
+    assert timestamps == [T0 + index * 5 for index in range(15, 25)]
+    assert values == list(range(15, 25))
+    # Fim inclusivo mesmo com horários na casa de 1e9 (1e-9 some no arredondamento)
+    timestamps, values = store.query("gateway_ms", T0 + 18 * 5, T0 + 21 * 5)
+    assert values == [18, 19, 20, 21]
+    assert all(math.isnan(v) for v in store.query("external_ms")[1])
+
+
+def test_out_of_order_sample_is_rejected():
+    store = TimeSeriesStore(raw_capacity=4, tiers=((60, 2),))
+    assert store.record(T0 + 10, 1, 1, 1, 1)
+    assert not store.record(T0, 2, 2, 2, 2)
+    assert store.query("gateway_ms")[1] == [1]
+
+
+def brute_force_rollups(samples, width_s):
+    buckets = {}
+    for ts, value in samples:
+        buckets.setdefault(ts - ts % width_s, []).append(value)
+    rows = []
+    for start, values in sorted(buckets.items()):
+        ordered = sorted(values)
+        p95 = ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+        rows.append((start, ordered[0], sum(ordered) / len(ordered), ordered[-1], p95, len(ordered)))
+    return rows
+
+
+def test_rollups_match_brute_force_and_keep_fixed_capacity():
+    rng = random.Random(1)
+    store = TimeSeriesStore(raw_capacity=50, tiers=((60, 8), (900, 4)))
+    samples = [(T0 + index * 5, float(rng.randint(1, 200))) for index in range(12 * 120)]
+    for ts, value in samples:
+        store.record(ts, value, value, value, 1)
+
+    for width_s, capacity in ((60, 8), (900, 4)):
+        expected = brute_force_rollups(samples, width_s)
+        rollups = store.rollups("gateway_ms", width_s)
+        # Fechadas: só as `capacity` mais recentes; a janela aberta vem no fim
+        assert len(rollups) == capacity + 1
+        for rollup, row in zip(rollups, expected[-(capacity + 1):]):
+            assert rollup.start == row[0]
+            assert (rollup.minimum, rollup.maximum, rollup.p95, rollup.count) == (row[1], row[3], row[4], row[5])
+            assert rollup.average == pytest.approx(row[2], rel=1e-6)
+
+
+def test_rollup_range_query_across_wrap_and_missing_values():
+    store = TimeSeriesStore(raw_capacity=10, tiers=((60, 3),))
+    for index in range(6 * 12):
+        store.record(T0 + index * 5, -1 if index % 2 else 10.0, 1, 1, 1)
+    closed = store.tiers[60].query("gateway_ms", include_open=False)
+    assert [r.start for r in closed] == [T0 + 120, T0 + 180, T0 + 240]
+    assert all((r.minimum, r.maximum, r.count) == (10.0, 10.0, 12) for r in closed)
+    assert [r.start for r in store.rollups("gateway_ms", 60, T0 + 180, T0 + 300)] == [T0 + 180, T0 + 240, T0 + 300]
+    assert store.latest("gateway_ms").count == 12
@@ -0,0 +1,63 @@
+from uia_locator import (
+    ElementLocator,
+    FakeControl,
+    bfs_find,
+    fake_desktop,
+    follow_path,
+    is_avatar_button,
+    legacy_find,
+    teams_windows,
+)
+
+
+def make_locator():
+    root, teams, avatar, counter = fake_desktop()
+    return root, teams, avatar, counter, ElementLocator(lambda: teams_windows(root), is_avatar_button)
+
+
+def test_first_lookup_walks_then_hits_cache():
+    root, _, avatar, _, locator = make_locator()
+    assert locator.locate() is avatar
+    assert locator.walks == 1
+    assert locator.locate() is avatar
+    assert locator.hits == 1
+    assert legacy_find(root) is avatar
+
+
+def test_recreated_in_place_follows_path():
+    _, teams, avatar, counter, locator = make_locator()
+    locator.locate()
+    parent = follow_path(teams, locator.path[:-1])
+    replacement = FakeControl(avatar._name, "Button", counter=counter)
+    avatar.alive = False
+    parent.children[locator.path[-1]] = replacement
+    assert locator.locate() is replacement
+    assert (locator.path_hits, locator.walks) == (1, 1)
+
+
+def test_moved_element_triggers_full_walk():
+    _, teams, avatar, counter, locator = make_locator()
+    locator.locate()
+    parent = follow_path(teams, locator.path[:-1])
+    parent.children[locator.path[-1]] = FakeControl("Item", "Pane", counter=counter)
+    avatar.alive = False
+    moved = FakeControl(avatar._name, "Button", counter=counter)
+    teams.children[0].children.append(moved)
+    assert locator.locate() is moved
+    assert locator.walks == 2
+
+
+def test_node_budget_stops_search():
+    _, teams, _, _, _ = make_locator()
+    found, _, visited = bfs_find(teams, is_avatar_button, node_budget=5)
+    assert found is None
+    assert visited == 5
+
+
+def test_missing_window_clears_cache():
+    _, teams, avatar, _, locator = make_locator()
+    locator.locate()
+    teams._name = "Outra janela"
+    avatar.alive = False
+    assert locator.locate() is None
+    assert locator.element is None
@@ -0,0 +1,51 @@
+import pytest
+
+from view_model import ViewModel
+
+
+class FakeCombo:
+    """Combo em memória com a interface usada por set_items"""
+
+    def __init__(self, items=()):
+        self.items = list(items)
+        self.operations = 0
+
+    def count(self):
+        return len(self.items)
+
+    def itemText(self, index):  # noqa: N802 (mesmo nome do Qt)
+        return self.items[index]
+
+    def insertItem(self, index, text):  # noqa: N802
+        self.operations += 1
+        self.items.insert(index, text)
+
+    def removeItem(self, index):  # noqa: N802
+        self.operations += 1
+        del self.items[index]
+
+
+COMBO_CASES = [
+    ([], ["Local", "Sistema .42"]),
+    (["Local", "Sistema .42"], ["Local", "Sistema .42"]),
+    (["Local", "Sistema .42"], ["Local", "Sistema .42", "Sistema .7"]),
+    (["Local", "Sistema .42", "Sistema .7"], ["Local", "Sistema .7"]),
+    (["Local", "Sistema .7"], ["Sistema .9", "Local"]),
+    (["A", "B", "C"], ["C", "B", "A"]),
+    (["A", "B"], []),
+]
+
+
+@pytest.mark.parametrize("before, after", COMBO_CASES)
+def test_set_items(before, after):
+    combo = FakeCombo(before)
+    ViewModel().set_items(combo, after)
+    assert combo.items == after
+
+
+def test_set_items_unchanged_skips_qt():
+    combo = FakeCombo(["Local", "Sistema .42"])
+    view = ViewModel()
+    view.set_items(combo, ["Local", "Sistema .42"])
+    view.set_items(combo, ["Local", "Sistema .42"])
+    assert combo.operations == 0
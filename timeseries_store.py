@@ -0,0 +1,292 @@
+"""
+Série temporal de conectividade em memória
+
+Latência do gateway, do alvo externo e do sistema RDP, mais a quantidade de
+sessões RDP, guardadas em buffers circulares compactos (array 'f'/'d'; numpy
+fica fora dos executáveis). Cada amostra também alimenta agregados de 1 min,
+15 min e 1 h (mín/média/máx/p95), cada nível com capacidade fixa: a memória
+não cresce em semanas de uso. Consultas por intervalo usam busca binária
+nos horários.
+
+    python -m pytest tests/test_timeseries_store.py
+    python timeseries_store.py --bench [dias]
+"""
+
+import array
+import bisect
+import csv
+import math
+import sys
+import time
+from datetime import datetime
+from typing import NamedTuple
+
+SERIES = ("gateway_ms", "external_ms", "peer_ms", "rdp_sessions")
+RAW_CAPACITY = 17280  # 24h a cada 5s
+ROLLUP_TIERS = (
+    (60, 7 * 24 * 60),  # 1 min por 7 dias
+    (900, 30 * 24 * 4),  # 15 min por 30 dias
+    (3600, 365 * 24),  # 1 h por 1 ano
+)
+NAN = float("nan")
+
+
+class Rollup(NamedTuple):
+    """Agregado de uma série em uma janela"""
+
+    start: float
+    minimum: float
+    average: float
+    maximum: float
+    p95: float
+    count: int
+
+
+class RingBuffer:
+    """Buffer circular de tamanho fixo sobre array"""
+
+    def __init__(self, capacity, typecode="f"):
+        self.capacity = capacity
+        self.data = array.array(typecode, [0]) * capacity
+        self.head = 0  # próxima posição de escrita
+        self.count = 0
+
+    def append(self, value):
+        self.data[self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def segments(self):
+        """Trechos (início, fim) do mais antigo ao mais novo"""
+        if self.count < self.capacity:
+            return ((0, self.count),)
+        return ((self.head, self.capacity), (0, self.head))
+
+    def physical_range(self, logical_start, logical_end):
+        """Converte índices lógicos [a, b) em fatias físicas"""
+        offset = self.head if self.count == self.capacity else 0
+        start = (offset + logical_start) % self.capacity
+        length = logical_end - logical_start
+        if length <= 0:
+            return ()
+        if start + length <= self.capacity:
+            return ((start, start + length),)
+        return ((start, self.capacity), (0, start + length - self.capacity))
+
+    def values(self, logical_start=0, logical_end=None):
+        end = self.count if logical_end is None else logical_end
+        out = []
+        for a, b in self.physical_range(logical_start, end):
+            out.extend(self.data[a:b])
+        return out
+
+    def bisect(self, value, right=False):
+        """Índice lógico do primeiro elemento >= value (> value se right) em dados ordenados"""
+        search = bisect.bisect_right if right else bisect.bisect_left
+        logical = 0
+        for a, b in self.segments():
+            index = search(self.data, value, a, b)
+            if index < b:
+                return logical + index - a
+            logical += b - a
+        return logical
+
+    def nbytes(self):
+        return self.data.itemsize * self.capacity
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return NAN
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class RollupTier:
+    """Agregados de largura fixa (ex.: 60s) com capacidade fixa"""
+
+    def __init__(self, width_s, capacity, series=SERIES):
+        self.width_s = width_s
+        self.series = series
+        self.starts = RingBuffer(capacity, "d")
+        self.columns = {
+            name: {
+                field: RingBuffer(capacity, "f")
+                for field in ("minimum", "average", "maximum", "p95")
+            }
+            for name in series
+        }
+        self.counts = RingBuffer(capacity, "I")
+        self._open_start = None
+        self._pending = {name: [] for name in series}
+        self._pending_count = 0
+
+    def add(self, ts, values):
+        bucket = ts - ts % self.width_s
+        if self._open_start is not None and bucket != self._open_start:
+            self.close()
+        self._open_start = bucket
+        self._pending_count += 1
+        for name, value in zip(self.series, values):
+            if not math.isnan(value):
+                self._pending[name].append(value)
+
+    def _summarize(self, values):
+        if not values:
+            return NAN, NAN, NAN, NAN
+        ordered = sorted(values)
+        return ordered[0], sum(ordered) / len(ordered), ordered[-1], _percentile(ordered, 0.95)
+
+    def close(self):
+        """Fecha a janela aberta e grava o agregado"""
+        if self._open_start is None:
+            return
+        self.starts.append(self._open_start)
+        self.counts.append(self._pending_count)
+        for name in self.series:
+            summary = self._summarize(self._pending[name])
+            for field, value in zip(("minimum", "average", "maximum", "p95"), summary):
+                self.columns[name][field].append(value)
+            self._pending[name] = []
+        self._pending_count = 0
+        self._open_start = None
+
+    def open_rollup(self, name):
+        """Agregado parcial da janela ainda aberta (ou None)"""
+        if self._open_start is None:
+            return None
+        return Rollup(self._open_start, *self._summarize(self._pending[name]), self._pending_count)
+
+    def query(self, name, start=None, end=None, include_open=True):
+        """Agregados com start <= início da janela <= end"""
+        first = self.starts.bisect(start) if start is not None else 0
+        last = self.starts.bisect(end, right=True) if end is not None else self.starts.count
+        starts = self.starts.values(first, last)
+        columns = self.columns[name]
+        fields = [columns[f].values(first, last) for f in ("minimum", "average", "maximum", "p95")]
+        counts = self.counts.values(first, last)
+        rollups = [Rollup(s, *row, c) for s, *row, c in zip(starts, *fields, counts)]
+        pending = self.open_rollup(name) if include_open else None
+        if pending and (start is None or pending.start >= start) and (end is None or pending.start <= end):
+            rollups.append(pending)
+        return rollups
+
+    def nbytes(self):
+        total = self.starts.nbytes() + self.counts.nbytes()
+        for fields in self.columns.values():
+            total += sum(ring.nbytes() for ring in fields.values())
+        return total
+
+
+class TimeSeriesStore:
+    """Amostras brutas recentes + agregados de 1 min, 15 min e 1 h"""
+
+    def __init__(self, raw_capacity=RAW_CAPACITY, tiers=ROLLUP_TIERS, series=SERIES):
+        self.series = series
+        self.timestamps = RingBuffer(raw_capacity, "d")
+        self.raw = {name: RingBuffer(raw_capacity, "f") for name in series}
+        self.tiers = {width: RollupTier(width, capacity, series) for width, capacity in tiers}
+        self.samples = 0
+
+    def record(self, ts, *values):
+        """Registra uma amostra (latências <= 0 viram NaN = sem resposta)"""
+        if self.timestamps.count and ts < self.timestamps.data[self.timestamps.head - 1]:
+            return False  # relógio voltou: mantém a ordem para a busca binária
+        values = [NAN if v is None or v < 0 else float(v) for v in values]
+        self.timestamps.append(ts)
+        for name, value in zip(self.series, values):
+            self.raw[name].append(value)
+        for tier in self.tiers.values():
+            tier.add(ts, values)
+        self.samples += 1
+        return True
+
+    def record_snapshot(self, snapshot, ts=None):
+        """Registra um ConnectivitySnapshot"""
+        peer = snapshot.ping_sistema if snapshot.sistema_nome else NAN
+        return self.record(
+            time.time() if ts is None else ts,
+            snapshot.ping_gw if snapshot.ping_gw > 0 else NAN,
+            snapshot.ping_brasil if snapshot.ping_brasil > 0 else NAN,
+            peer if peer and peer > 0 else NAN,
+            len(snapshot.lista_rdp) if snapshot.tem_rdp else 0,
+        )
+
+    def query(self, name, start=None, end=None):
+        """Amostras brutas de uma série: (horários, valores)"""
+        first = self.timestamps.bisect(start) if start is not None else 0
+        last = self.timestamps.bisect(end, right=True) if end is not None else self.timestamps.count
+        return self.timestamps.values(first, last), self.raw[name].values(first, last)
+
+    def recent_rows(self, seconds, names=SERIES[:3]):
+        """Linhas (horário, valores...) dos últimos `seconds`; NaN vira None"""
+        if not self.timestamps.count:
+            return []
+        end = self.timestamps.data[self.timestamps.head - 1]
+        timestamps, _ = self.query(self.series[0], end - seconds, end)
+        columns = [self.query(name, end - seconds, end)[1] for name in names]
+        return [
+            (ts, *(None if math.isnan(v) else v for v in row))
+            for ts, *row in zip(timestamps, *columns)
+        ]
+
+    def rollups(self, name, width_s=60, start=None, end=None):
+        """Agregados (Rollup) de uma série na largura pedida"""
+        return self.tiers[width_s].query(name, start, end)
+
+    def latest(self, name, width_s=60):
+        """Agregado da janela corrente"""
+        return self.tiers[width_s].open_rollup(name)
+
+    def nbytes(self):
+        """Memória reservada pelos buffers (fixa, independente do uptime)"""
+        total = self.timestamps.nbytes() + sum(r.nbytes() for r in self.raw.values())
+        return total + sum(t.nbytes() for t in self.tiers.values())
+
+    def export_csv(self, filename, start=None, end=None):
+        """Exporta as amostras brutas do intervalo em CSV"""
+        timestamps, _ = self.query(self.series[0], start, end)
+        columns = [self.query(name, start, end)[1] for name in self.series]
+        with open(filename, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(("timestamp",) + self.series)
+            for ts, *row in zip(timestamps, *columns):
+                stamp = datetime.fromtimestamp(ts).isoformat(timespec="seconds")
+                writer.writerow([stamp] + ["" if math.isnan(v) else round(v, 1) for v in row])
+        return len(timestamps)
+
+
+def benchmark(days=28, interval_s=15):
+    """Simula `days` dias de amostras a cada `interval_s`"""
+    import random
+
+    rng = random.Random(0)
+    store = TimeSeriesStore()
+    total = int(days * 86400 / interval_s)
+    t0 = 1_700_000_000.0
+    start = time.perf_counter()
+    for index in range(total):
+        gateway = rng.gauss(3, 1) if rng.random() > 0.01 else -1
+        store.record(t0 + index * interval_s, gateway, rng.gauss(20, 5), rng.gauss(6, 2), 1)
+    elapsed = time.perf_counter() - start
+    print(f"{total} amostras ({days} dias): {elapsed / total * 1e6:.1f} us/amostra")
+    print(f"memória fixa: {store.nbytes() / 1024:.0f} KiB")
+
+    end_ts = t0 + (total - 1) * interval_s
+    for label, func in (
+        ("brutas última hora", lambda: store.query("gateway_ms", end_ts - 3600, end_ts)),
+        ("1min último dia", lambda: store.rollups("gateway_ms", 60, end_ts - 86400, end_ts)),
+        ("1h tudo", lambda: store.rollups("gateway_ms", 3600)),
+    ):
+        start = time.perf_counter()
+        result = func()
+        elapsed = (time.perf_counter() - start) * 1000
+        size = len(result[0]) if isinstance(result, tuple) else len(result)
+        print(f"consulta {label:<20} {size:6d} pontos em {elapsed:.2f} ms")
+    print(f"janela atual 15min: {store.latest('gateway_ms', 900)}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 28)
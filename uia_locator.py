@@ -0,0 +1,308 @@
+"""
+Localizador de elementos de UI Automation com cache
+
+ElementLocator guarda o elemento encontrado, seu runtime ID e o caminho
+(índices dos filhos) a partir da janela. A próxima chamada confere o
+próprio elemento (uma leitura de propriedade); se ele sumiu, refaz só o
+caminho; a busca completa (janelas + árvore) fica para quando as duas
+falham. A busca na árvore é em largura, para no primeiro elemento
+compatível e respeita um limite de nós visitados.
+
+Sem dependência de uiautomation: recebe funções que listam as janelas e
+reconhecem o elemento, e os testes usam uma árvore falsa.
+
+    python -m pytest tests/test_uia_locator.py
+    python uia_locator.py --bench [n]
+"""
+
+import random
+import sys
+import time
+from collections import deque
+
+UIA_MAX_DEPTH = 3  # mesma profundidade da busca recursiva anterior
+UIA_NODE_BUDGET = 400  # nós visitados por janela antes de desistir
+
+# Frases do nome do botão do avatar (com o status)
+AVATAR_PHRASES = (
+    "status displayed as",
+    "status exibido como",
+    "com status exibido como",
+    "profile picture",
+    "foto de perfil",
+    "your avatar",
+    "seu avatar",
+)
+
+
+def is_avatar_button(element):
+    """Botão do avatar do Teams (nome com frase de status)"""
+    try:
+        if element.ControlTypeName != "Button" or not element.Name:
+            return False
+        name_lower = element.Name.lower()
+    except Exception:
+        return False
+    return any(phrase in name_lower for phrase in AVATAR_PHRASES)
+
+
+def runtime_id(element):
+    """Runtime ID do elemento (tupla) ou None"""
+    try:
+        value = element.GetRuntimeId()
+        return tuple(value) if value else None
+    except Exception:
+        return None
+
+
+def bfs_find(root, predicate, max_depth=UIA_MAX_DEPTH, node_budget=UIA_NODE_BUDGET):
+    """Busca em largura: (elemento, caminho de índices, nós visitados); elemento None se não achou"""
+    queue = deque([(root, ())])
+    visited = 0
+    while queue and visited < node_budget:
+        element, path = queue.popleft()
+        visited += 1
+        if predicate(element):
+            return element, path, visited
+        if len(path) >= max_depth:
+            continue
+        try:
+            children = element.GetChildren()
+        except Exception:
+            continue
+        queue.extend((child, path + (index,)) for index, child in enumerate(children))
+    return None, None, visited
+
+
+def follow_path(root, path):
+    """Elemento no caminho de índices a partir de root, ou None"""
+    element = root
+    try:
+        for index in path:
+            children = element.GetChildren()
+            if index >= len(children):
+                return None
+            element = children[index]
+    except Exception:
+        return None
+    return element
+
+
+class ElementLocator:
+    """Acha um elemento em uma das janelas e lembra onde ele estava"""
+
+    def __init__(self, find_windows, predicate, max_depth=UIA_MAX_DEPTH, node_budget=UIA_NODE_BUDGET):
+        self.find_windows = find_windows  # () -> janelas candidatas
+        self.predicate = predicate
+        self.max_depth = max_depth
+        self.node_budget = node_budget
+        self.window = None
+        self.element = None
+        self.element_id = None
+        self.path = None
+        self.calls = 0
+        self.hits = 0
+        self.path_hits = 0
+        self.walks = 0
+        self.nodes = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+
+    def forget(self):
+        self.window = self.element = self.element_id = self.path = None
+
+    def _cached(self):
+        """Elemento em cache, se ainda válido (mesmo runtime ID e ainda compatível)"""
+        if self.element is None:
+            return None
+        if self.predicate(self.element) and runtime_id(self.element) == self.element_id:
+            return self.element
+        return None
+
+    def _by_path(self):
+        """Refaz o caminho guardado a partir da janela em cache"""
+        if self.window is None or self.path is None:
+            return None
+        element = follow_path(self.window, self.path)
+        if element is not None and self.predicate(element):
+            return element
+        return None
+
+    def _walk(self):
+        """Busca completa: janelas candidatas e árvore de cada uma"""
+        self.walks += 1
+        try:
+            windows = self.find_windows()
+        except Exception as e:
+            print(f"[DEBUG] Erro ao listar janelas: {e}")
+            return None
+        for window in windows:
+            element, path, visited = bfs_find(window, self.predicate, self.max_depth, self.node_budget)
+            self.nodes += visited
+            if element is not None:
+                self.window, self.path = window, path
+                return element
+        return None
+
+    def locate(self):
+        """Elemento ou None"""
+        start = time.perf_counter()
+        self.calls += 1
+        element = self._cached()
+        if element is not None:
+            self.hits += 1
+        else:
+            element = self._by_path()
+            if element is not None:
+                self.path_hits += 1
+            else:
+                element = self._walk()
+            if element is None:
+                self.forget()
+            else:
+                self.element, self.element_id = element, runtime_id(element)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.last_ms = elapsed_ms
+        return element
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "hits": self.hits,
+            "path_hits": self.path_hits,
+            "walks": self.walks,
+            "hit_rate": round((self.hits + self.path_hits) / self.calls, 3) if self.calls else 0.0,
+            "nodes": self.nodes,
+            "avg_ms": round(self.total_ms / self.calls, 2) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "last_ms": round(self.last_ms, 2),
+        }
+
+    def summary(self):
+        stats = self.stats()
+        return (
+            f"acertos={stats['hit_rate']:.0%} (cache={stats['hits']} caminho={stats['path_hits']}"
+            f" busca={stats['walks']}) nós={stats['nodes']} avg={stats['avg_ms']}ms max={stats['max_ms']}ms"
+        )
+
+
+# Árvore falsa para testes/--bench: cada chamada ao UIA custa FAKE_CALL_US
+FAKE_CALL_US = 50
+
+
+class FakeControl:
+    """Control com a interface usada de uiautomation (Name, ControlTypeName, GetChildren, GetRuntimeId)"""
+
+    _next_id = 1
+
+    def __init__(self, name="", control_type="Pane", children=None, counter=None):
+        self._name = name
+        self.ControlTypeName = control_type
+        self.children = children or []
+        self.counter = counter if counter is not None else {}
+        self.alive = True
+        self.rid = (42, FakeControl._next_id)
+        FakeControl._next_id += 1
+
+    def _call(self, what):
+        self.counter[what] = self.counter.get(what, 0) + 1
+        end = time.perf_counter() + FAKE_CALL_US / 1e6
+        while time.perf_counter() < end:
+            pass
+        if not self.alive:
+            raise RuntimeError("elemento não existe mais")
+
+    @property
+    def Name(self):  # noqa: N802 (mesmo nome de uiautomation)
+        self._call("Name")
+        return self._name
+
+    def GetChildren(self):  # noqa: N802
+        self._call("GetChildren")
+        return list(self.children)
+
+    def GetRuntimeId(self):  # noqa: N802
+        self._call("GetRuntimeId")
+        return list(self.rid)
+
+
+def fake_desktop(windows=30, branching=6, avatar_at=(2, 4, 1), seed=0):
+    """Desktop falso: (raiz, janela do Teams, avatar, contador de chamadas)"""
+    rng = random.Random(seed)
+    counter = {}
+
+    def subtree(depth, path):
+        if depth == UIA_MAX_DEPTH:
+            return []
+        nodes = []
+        for index in range(branching):
+            child_path = path + (index,)
+            if child_path == avatar_at:
+                node = FakeControl("Foto de perfil, com status exibido como Disponível", "Button", counter=counter)
+            else:
+                control_type = rng.choice(("Button", "Pane", "Text", "Group"))
+                node = FakeControl(f"Item {child_path}", control_type, subtree(depth + 1, child_path), counter)
+            nodes.append(node)
+        return nodes
+
+    teams = FakeControl("Chat | Microsoft Teams", "Window", subtree(0, ()), counter)
+    others = [FakeControl(f"Janela {i}", "Window", counter=counter) for i in range(windows - 1)]
+    root = FakeControl("Desktop", "Pane", others[: windows // 2] + [teams] + others[windows // 2 :], counter)
+    return root, teams, follow_path(teams, avatar_at), counter
+
+
+def teams_windows(root):
+    """Janelas de topo com "Microsoft Teams" no nome"""
+    return [w for w in root.GetChildren() if w.Name and "microsoft teams" in w.Name.lower()]
+
+
+def legacy_find(root):
+    """Busca anterior: todas as janelas + recursão em profundidade até 3 níveis, a cada chamada"""
+
+    def search(element, depth=0):
+        if depth > UIA_MAX_DEPTH:
+            return None
+        if is_avatar_button(element):
+            return element
+        for child in element.GetChildren():
+            result = search(child, depth + 1)
+            if result:
+                return result
+        return None
+
+    for window in teams_windows(root):
+        result = search(window)
+        if result:
+            return result
+    return None
+
+
+def benchmark(calls=60):
+    """Busca anterior x ElementLocator em chamadas seguidas (monitoramento a cada 5s)"""
+    root, teams, avatar, counter = fake_desktop()
+    print(f"Desktop falso: 30 janelas, Teams com {6 + 36 + 216} elementos, {FAKE_CALL_US}us por chamada UIA")
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        legacy_find(root)
+    legacy_ms = (time.perf_counter() - start) * 1000 / calls
+    legacy_calls = sum(counter.values()) / calls
+    counter.clear()
+
+    locator = ElementLocator(lambda: teams_windows(root), is_avatar_button)
+    start = time.perf_counter()
+    for _ in range(calls):
+        locator.locate()
+    locator_ms = (time.perf_counter() - start) * 1000 / calls
+    locator_calls = sum(counter.values()) / calls
+    print(f"  anterior        {legacy_ms:8.2f} ms/chamada  {legacy_calls:7.1f} chamadas UIA")
+    print(f"  ElementLocator  {locator_ms:8.2f} ms/chamada  {locator_calls:7.1f} chamadas UIA")
+    print(f"  {locator.summary()}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 60)
@@ -0,0 +1,85 @@
+"""
+Atualização de widgets por diferença
+
+ViewModel guarda o último estado aplicado a cada widget (texto, dica,
+visibilidade, itens de combo) e só chama o Qt quando o valor muda: setText
+em rich text refaz o layout do QLabel mesmo com o mesmo conteúdo. O combo
+é atualizado item a item, preservando a seleção. Os contadores de
+atualizações aplicadas/evitadas mostram a economia.
+
+Funciona com qualquer objeto com a mesma interface (testes sem Qt):
+    python -m pytest tests/test_view_model.py
+"""
+
+
+class ViewModel:
+    """Estado renderizado anterior + aplicação das diferenças"""
+
+    def __init__(self):
+        self._state = {}
+        self.applied = 0
+        self.skipped = 0
+
+    def _changed(self, key, value):
+        if key in self._state and self._state[key] == value:
+            self.skipped += 1
+            return False
+        self._state[key] = value
+        self.applied += 1
+        return True
+
+    def forget(self, widget=None):
+        """Descarta o estado (ex.: widget recriado); sem argumento, tudo"""
+        if widget is None:
+            self._state.clear()
+        else:
+            for key in [k for k in self._state if k[0] == id(widget)]:
+                del self._state[key]
+
+    def set_text(self, widget, text):
+        if self._changed((id(widget), "text"), text):
+            widget.setText(text)
+
+    def set_tooltip(self, widget, text):
+        if self._changed((id(widget), "tooltip"), text):
+            widget.setToolTip(text)
+
+    def set_visible(self, widget, visible):
+        if self._changed((id(widget), "visible"), bool(visible)):
+            widget.setVisible(bool(visible))
+
+    def set_items(self, combo, items):
+        """Sincroniza os itens do combo com o mínimo de inserções/remoções"""
+        items = list(items)
+        if not self._changed((id(combo), "items"), tuple(items)):
+            return
+        index = 0
+        for item in items:
+            # Remove itens que não existem mais até achar o atual
+            while index < combo.count():
+                current = combo.itemText(index)
+                if current == item or current in items[index:]:
+                    break
+                combo.removeItem(index)
+            if index < combo.count() and combo.itemText(index) == item:
+                index += 1
+                continue
+            combo.insertItem(index, item)
+            index += 1
+        while combo.count() > len(items):
+            combo.removeItem(combo.count() - 1)
+
+    def stats(self):
+        total = self.applied + self.skipped
+        return {
+            "applied": self.applied,
+            "skipped": self.skipped,
+            "skip_rate": round(self.skipped / total, 3) if total else 0.0,
+        }
+
+    def summary(self):
+        stats = self.stats()
+        return (
+            f"widgets: aplicadas={stats['applied']} evitadas={stats['skipped']} "
+            f"({stats['skip_rate'] * 100:.0f}%)"
+        )